@@ -1,25 +1,54 @@
-from .common import Common
-from .dependency_injection import DependencyInjectorServiceProvider
-from .engine import Engine, PipelineFactory, UseCaseInvoker
-from .exceptions import (DependencyConstructionError, DuplicateServiceError,
-                         PipeConfigurationError)
-from .outputs import (AuthorisationResult, IAuthenticationOutputPort,
-                      IAuthorisationOutputPort, IOutputPort,
-                      IValidationOutputPort, ValidationResult)
-from .pipeline import (AuthenticationVerifier, AuthorisationEnforcer,
-                       EntityExistenceChecker, InputPort, InputPortValidator,
-                       InputTypeValidator, Interactor, IPipe,
-                       PersistenceRuleValidator, PipeConfiguration,
-                       PipeConfigurationOption, RequiredInputValidator)
-from .services import IPipelineFactory, IServiceProvider, IUseCaseInvoker
-from .utils import AttributeChangeTracker
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    from .batching import (BatchedInvocation, BatchPipe, InputPortBatch,
+                           MicroBatchDispatcher)
+    from .common import Common
+    from .context import InvocationContext, invocation_properties
+    from .dependency_injection import DependencyInjectorServiceProvider
+    from .engine import Engine, PipelineFactory, UseCaseInvoker
+    from .exceptions import (DependencyConstructionError, DuplicateServiceError,
+                             PipeConfigurationError, ServiceUnavailableError)
+    from .invokers import (CachingUseCaseInvoker, InvocationCache,
+                           InvocationPriority, InvocationRecording,
+                           PrioritySchedulingUseCaseInvoker,
+                           SingleFlightUseCaseInvoker, invocation_priority)
+    from .jobs import JobWorker, QueuedJob, SqliteJobQueue
+    from .metrics import (IMetricsRecorder, LatencyWindow, PipeStatistics,
+                          TokenBucket)
+    from .outputs import (AuthorisationResult, IAuthenticationOutputPort,
+                          IAuthorisationOutputPort, IOutputPort,
+                          IServiceUnavailableOutputPort, IValidationOutputPort,
+                          ValidationResult)
+    from .pipeline import (AuthenticationVerifier, AuthorisationEnforcer,
+                           EntityExistenceChecker, InputPort, InputPortValidator,
+                           InputTypeValidator, Interactor, IPipe,
+                           PersistenceRuleValidator, PipeConfiguration,
+                           PipeConfigurationOption, RequiredInputValidator,
+                           SlottedInputPort, SynchronousPipe)
+    from .resilience import (AdaptiveConcurrencyLimiter, CircuitBreaker,
+                             CircuitBreakingUseCaseInvoker, CircuitState,
+                             DegradingUseCaseInvoker)
+    from .services import IPipelineFactory, IServiceProvider, IUseCaseInvoker
+    from .utils import AttributeChangeTracker
+    from .validation import ValidationPlan
+    from .workers import PreforkUseCaseInvoker, SyncUseCaseInvoker
 
 __all__ = [
+    "AdaptiveConcurrencyLimiter",
     "AttributeChangeTracker",
     "AuthenticationVerifier",
     "AuthorisationEnforcer",
     "AuthorisationResult",
+    "BatchPipe",
+    "BatchedInvocation",
+    "CachingUseCaseInvoker",
+    "CircuitBreaker",
+    "CircuitBreakingUseCaseInvoker",
+    "CircuitState",
     "Common",
+    "DegradingUseCaseInvoker",
     "DependencyConstructionError",
     "DependencyInjectorServiceProvider",
     "DuplicateServiceError",
@@ -27,22 +56,131 @@ __all__ = [
     "EntityExistenceChecker",
     "IAuthenticationOutputPort",
     "IAuthorisationOutputPort",
+    "IMetricsRecorder",
     "IOutputPort",
     "IPipe",
     "IPipelineFactory",
     "IServiceProvider",
+    "IServiceUnavailableOutputPort",
     "IUseCaseInvoker",
     "IValidationOutputPort",
     "InputPort",
+    "InputPortBatch",
     "InputPortValidator",
     "InputTypeValidator",
     "Interactor",
+    "InvocationCache",
+    "InvocationContext",
+    "InvocationPriority",
+    "InvocationRecording",
+    "JobWorker",
+    "LatencyWindow",
+    "MicroBatchDispatcher",
     "PersistenceRuleValidator",
     "PipeConfiguration",
     "PipeConfigurationError",
     "PipeConfigurationOption",
+    "PipeStatistics",
     "PipelineFactory",
+    "PreforkUseCaseInvoker",
+    "PrioritySchedulingUseCaseInvoker",
+    "QueuedJob",
     "RequiredInputValidator",
+    "ServiceUnavailableError",
+    "SingleFlightUseCaseInvoker",
+    "SlottedInputPort",
+    "SqliteJobQueue",
+    "SyncUseCaseInvoker",
+    "SynchronousPipe",
+    "TokenBucket",
     "UseCaseInvoker",
+    "ValidationPlan",
     "ValidationResult",
+    "invocation_priority",
+    "invocation_properties",
     ]
+
+_LAZY_ATTRIBUTES: Dict[str, str] = {
+    "AdaptiveConcurrencyLimiter": ".resilience",
+    "AttributeChangeTracker": ".utils",
+    "AuthenticationVerifier": ".pipeline",
+    "AuthorisationEnforcer": ".pipeline",
+    "AuthorisationResult": ".outputs",
+    "BatchPipe": ".batching",
+    "BatchedInvocation": ".batching",
+    "CachingUseCaseInvoker": ".invokers",
+    "CircuitBreaker": ".resilience",
+    "CircuitBreakingUseCaseInvoker": ".resilience",
+    "CircuitState": ".resilience",
+    "Common": ".common",
+    "DegradingUseCaseInvoker": ".resilience",
+    "DependencyConstructionError": ".exceptions",
+    "DependencyInjectorServiceProvider": ".dependency_injection",
+    "DuplicateServiceError": ".exceptions",
+    "Engine": ".engine",
+    "EntityExistenceChecker": ".pipeline",
+    "IAuthenticationOutputPort": ".outputs",
+    "IAuthorisationOutputPort": ".outputs",
+    "IMetricsRecorder": ".metrics",
+    "IOutputPort": ".outputs",
+    "IPipe": ".pipeline",
+    "IPipelineFactory": ".services",
+    "IServiceProvider": ".services",
+    "IServiceUnavailableOutputPort": ".outputs",
+    "IUseCaseInvoker": ".services",
+    "IValidationOutputPort": ".outputs",
+    "InputPort": ".pipeline",
+    "InputPortBatch": ".batching",
+    "InputPortValidator": ".pipeline",
+    "InputTypeValidator": ".pipeline",
+    "Interactor": ".pipeline",
+    "InvocationCache": ".invokers",
+    "InvocationContext": ".context",
+    "InvocationPriority": ".invokers",
+    "InvocationRecording": ".invokers",
+    "JobWorker": ".jobs",
+    "LatencyWindow": ".metrics",
+    "MicroBatchDispatcher": ".batching",
+    "PersistenceRuleValidator": ".pipeline",
+    "PipeConfiguration": ".pipeline",
+    "PipeConfigurationError": ".exceptions",
+    "PipeConfigurationOption": ".pipeline",
+    "PipeStatistics": ".metrics",
+    "PipelineFactory": ".engine",
+    "PreforkUseCaseInvoker": ".workers",
+    "PrioritySchedulingUseCaseInvoker": ".invokers",
+    "QueuedJob": ".jobs",
+    "RequiredInputValidator": ".pipeline",
+    "ServiceUnavailableError": ".exceptions",
+    "SingleFlightUseCaseInvoker": ".invokers",
+    "SlottedInputPort": ".pipeline",
+    "SqliteJobQueue": ".jobs",
+    "SyncUseCaseInvoker": ".workers",
+    "SynchronousPipe": ".pipeline",
+    "TokenBucket": ".metrics",
+    "UseCaseInvoker": ".engine",
+    "ValidationPlan": ".validation",
+    "ValidationResult": ".outputs",
+    "invocation_priority": ".invokers",
+    "invocation_properties": ".context",
+}
+'''
+Maps each public name of Clapy to the submodule that defines it. Submodules are only imported when
+one of their names is first accessed, so `import clapy` does not pay for optional dependencies
+(such as `dependency_injector`) that the consumer never uses.
+'''
+
+
+def __getattr__(name: str) -> Any:
+    _ModuleName = _LAZY_ATTRIBUTES.get(name)
+
+    if _ModuleName is None:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+    _Attribute = getattr(importlib.import_module(_ModuleName, __name__), name)
+    globals()[name] = _Attribute
+    return _Attribute
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
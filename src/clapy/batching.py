@@ -0,0 +1,256 @@
+import asyncio
+import threading
+import weakref
+from abc import abstractmethod
+from typing import (Any, Dict, Iterable, Iterator, List, Mapping, Optional,
+                    Sequence, Set, Tuple, Type)
+
+from .outputs import IOutputPort
+from .pipeline import InputPort, IPipe
+from .validation import MISSING
+
+__all__ = ["BatchedInvocation", "BatchPipe", "InputPortBatch", "MicroBatchDispatcher"]
+
+
+class InputPortBatch:
+    '''
+    A columnar batch of input port values, used in place of many separate input ports for bulk
+    operations. Each column holds the values of one input port attribute, one value per row, and can
+    be a list, `array.array` or NumPy array. Rows are only materialised into input ports on request.
+
+    Attributes:
+        input_port_type (Type[InputPort]): The input port type of each row in the batch.
+        columns (Dict[str, Sequence[Any]]): The values of each attribute, keyed by attribute name.
+        A missing column leaves the attribute unset for every row, and a `MISSING` value leaves it
+        unset for that row.
+    '''
+
+    __slots__ = ("input_port_type", "columns", "_row_count")
+
+    MISSING = MISSING
+    '''Marks a row of a column as having no value for the attribute.'''
+
+    def __init__(self, input_port_type: Type[InputPort], columns: Mapping[str, Sequence[Any]]) -> None:
+        _ColumnLengths = {len(_Column) for _Column in columns.values()}
+
+        if len(_ColumnLengths) > 1:
+            raise ValueError(f"All columns of an {InputPortBatch.__name__} must have the same length.")
+
+        self.input_port_type = input_port_type
+        self.columns: Dict[str, Sequence[Any]] = dict(columns)
+        self._row_count = _ColumnLengths.pop() if _ColumnLengths else 0
+
+    def __len__(self) -> int:
+        return self._row_count
+
+    def get_row(self, index: int) -> InputPort:
+        '''
+        Summary
+        -------
+        Materialises a row of the batch into an input port. NumPy scalars are converted to their
+        equivalent Python values.
+
+        Parameters
+        ----------
+        `index` The index of the row to materialise.
+
+        Returns
+        -------
+        A new input port holding the values of the row.
+
+        '''
+        _InputPort = self.input_port_type()
+
+        for _AttrName, _Column in self.columns.items():
+            _Value = _Column[index]
+            if _Value is MISSING:
+                continue
+            if type(_Value).__module__ == "numpy" and hasattr(_Value, "item"):
+                _Value = _Value.item()
+            setattr(_InputPort, _AttrName, _Value)
+
+        return _InputPort
+
+    def iter_rows(self, indices: Optional[Iterable[int]] = None) -> Iterator[InputPort]:
+        '''
+        Summary
+        -------
+        Lazily materialises rows of the batch into input ports, one at a time.
+
+        Parameters
+        ----------
+        `indices` The indices of the rows to materialise. Defaults to every row.
+
+        Returns
+        -------
+        An iterator of input ports, one for each requested row.
+
+        '''
+        for _Index in range(self._row_count) if indices is None else indices:
+            yield self.get_row(_Index)
+
+
+class BatchedInvocation:
+    '''
+    An invocation waiting on a batch pipe, collected into a batch with other concurrent invocations.
+
+    Attributes:
+        pipe (BatchPipe): The pipe of the invocation. Set `has_failures` on it to fail the invocation.
+        input_port (InputPort): The input port of the invocation.
+        output_port (IOutputPort): The output port of the invocation.
+    '''
+
+    __slots__ = ("pipe", "input_port", "output_port")
+
+    def __init__(self, pipe: 'BatchPipe', input_port: InputPort, output_port: IOutputPort) -> None:
+        self.pipe = pipe
+        self.input_port = input_port
+        self.output_port = output_port
+
+
+class BatchPipe(IPipe):
+    '''
+    A pipe whose work is merged across concurrent invocations of the same use case, such as
+    looking up every requested entity in a single query. Invocations that reach the pipe within
+    `batch_window` of each other are collected, `execute_batch_async` is called once for all of
+    them, and then each invocation continues along its own pipeline.
+
+    Subclasses declare `execute_async` with the use case's input port type, so the use case can be
+    found when the registry is constructed, and delegate to `super().execute_async`.
+
+    Example
+    -------
+    class ProductExistenceChecker(EntityExistenceChecker, BatchPipe):\n
+        async def execute_async(self, input_port: GetProductInputPort, output_port: IGetProductOutputPort) -> None:\n
+            await super().execute_async(input_port, output_port)
+    '''
+
+    batch_window: float = 0.002
+    '''The number of seconds to wait for more invocations after the first one of a batch arrives.'''
+
+    max_batch_size: int = 100
+    '''The maximum number of invocations in a batch. A full batch is executed without waiting.'''
+
+    async def execute_async(self, input_port: InputPort, output_port: IOutputPort) -> None:
+        await MicroBatchDispatcher.for_pipe_type(type(self)).dispatch_async(BatchedInvocation(self, input_port, output_port))
+
+    @abstractmethod
+    async def execute_batch_async(self, invocations: List[BatchedInvocation]) -> None:
+        '''
+        Summary
+        -------
+        Defines the behaviour of the pipe when executed for a batch of invocations. Outputs are
+        presented to the output port of each invocation, and failures are reported by setting
+        `has_failures` on the pipe of each failed invocation.
+
+        Parameters
+        ----------
+        `invocations` The invocations in the batch, in the order they arrived
+
+        '''
+        pass
+
+
+class MicroBatchDispatcher:
+    '''
+    Collects the invocations of a batch pipe type that arrive on an event loop, and executes them as
+    batches. A batch is executed once its window has elapsed or it is full, whichever is first.
+    Each event loop has its own dispatchers, so invocations on different threads are never batched
+    together.
+    '''
+
+    _Dispatchers: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[type, MicroBatchDispatcher]]' = weakref.WeakKeyDictionary()
+
+    _DispatchersLock = threading.Lock()
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, batch_window: float, max_batch_size: int) -> None:
+        self._loop = loop
+        self._batch_window = batch_window
+        self._max_batch_size = max_batch_size
+        self._pending: List[Tuple[BatchedInvocation, 'asyncio.Future[None]']] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: Set['asyncio.Task[None]'] = set()
+
+    @classmethod
+    def for_pipe_type(cls, pipe_type: Type[BatchPipe]) -> 'MicroBatchDispatcher':
+        '''
+        Summary
+        -------
+        Gets the dispatcher of a batch pipe type on the running event loop, creating it on first use.
+
+        Parameters
+        ----------
+        `pipe_type` The batch pipe type to get the dispatcher for.
+
+        Returns
+        -------
+        The dispatcher of the pipe type on the running event loop.
+
+        '''
+        _Loop = asyncio.get_running_loop()
+        _LoopDispatchers = cls._Dispatchers.get(_Loop)
+
+        if _LoopDispatchers is None:
+            with cls._DispatchersLock:
+                _LoopDispatchers = cls._Dispatchers.setdefault(_Loop, {})
+
+        try:
+            return _LoopDispatchers[pipe_type]
+        except KeyError:
+            _Dispatcher = cls(_Loop, pipe_type.batch_window, pipe_type.max_batch_size)
+            _LoopDispatchers[pipe_type] = _Dispatcher
+            return _Dispatcher
+
+    async def dispatch_async(self, invocation: BatchedInvocation) -> None:
+        '''
+        Summary
+        -------
+        Adds an invocation to the pending batch, and waits for the batch to be executed.
+
+        Parameters
+        ----------
+        `invocation` The invocation to add to the batch.
+
+        Exceptions
+        ----------
+        Raises the exception raised by `execute_batch_async`, if any.
+
+        '''
+        _Future: 'asyncio.Future[None]' = self._loop.create_future()
+        self._pending.append((invocation, _Future))
+
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(self._batch_window, self._flush)
+
+        await _Future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        _Batch = [(_Invocation, _Future) for _Invocation, _Future in self._pending if not _Future.cancelled()]
+        self._pending = []
+
+        if _Batch:
+            _BatchTask = self._loop.create_task(self._execute_batch_async(_Batch))
+            self._batch_tasks.add(_BatchTask)
+            _BatchTask.add_done_callback(self._batch_tasks.discard)
+
+    async def _execute_batch_async(self, batch: List[Tuple[BatchedInvocation, 'asyncio.Future[None]']]) -> None:
+        try:
+            await batch[0][0].pipe.execute_batch_async([_Invocation for _Invocation, _ in batch])
+        except asyncio.CancelledError:
+            for _, _Future in batch:
+                _Future.cancel()
+            raise
+        except Exception as ex:
+            for _, _Future in batch:
+                if not _Future.done():
+                    _Future.set_exception(ex)
+        else:
+            for _, _Future in batch:
+                if not _Future.done():
+                    _Future.set_result(None)
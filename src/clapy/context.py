@@ -0,0 +1,175 @@
+import asyncio
+import contextlib
+import contextvars
+from typing import (Any, Awaitable, Callable, Dict, Hashable, Iterator, List,
+                    Mapping, Optional, TypeVar)
+
+from .pipeline import InputPort
+
+__all__ = ["InvocationContext", "invocation_properties"]
+
+T = TypeVar("T")
+
+
+class InvocationContext:
+    '''
+    The state of a single use case invocation, shared by every pipe of its pipeline. The context of
+    the running invocation can be retrieved from anywhere within it, including from tasks created
+    by its pipes, with `InvocationContext.current()`.
+
+    Attributes:
+        input_port (InputPort): The input port of the invocation.
+        properties (Mapping[str, Any]): The properties of the caller of the invocation, set with
+        `invocation_properties`.
+
+    Example
+    -------
+    class GetProductExistenceChecker(EntityExistenceChecker):\n
+        async def execute_async(self, input_port: GetProductInputPort, output_port: IGetProductOutputPort) -> None:\n
+            _Product = await InvocationContext.current().memo_async(\n
+                ("product", input_port.product_id), lambda: self._repository.get_async(input_port.product_id))
+    '''
+
+    __slots__ = ("input_port", "properties", "_memo", "_cleanup_callbacks", "_token")
+
+    def __init__(self, input_port: InputPort) -> None:
+        self.input_port = input_port
+        self.properties = _InvocationProperties.get()
+        self._memo: Dict[Hashable, 'asyncio.Future[Any]'] = {}
+        self._cleanup_callbacks: List[Callable[[], Awaitable[None]]] = []
+        self._token: Optional[contextvars.Token] = None
+
+    @staticmethod
+    def current() -> 'InvocationContext':
+        '''
+        Summary
+        -------
+        Gets the context of the running invocation.
+
+        Exceptions
+        ----------
+        Raises a `LookupError` if called outside of a use case invocation.
+
+        Returns
+        -------
+        The context of the running invocation.
+
+        '''
+        return _InvocationContext.get()
+
+    async def __aenter__(self) -> 'InvocationContext':
+        self._token = _InvocationContext.set(self)
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        _InvocationContext.reset(self._token) # type: ignore
+        await self.close_async()
+
+    async def memo_async(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        '''
+        Summary
+        -------
+        Gets a value memoised for the invocation, such as an entity loaded by one pipe and reused by
+        later pipes. The first caller for a key creates the value with its factory, and concurrent
+        callers for the same key wait for it rather than creating it again. A factory that raises an
+        exception is not memoised, so a later caller will create the value again.
+
+        Parameters
+        ----------
+        `key` The key of the value within the invocation.\n
+        `factory` Creates the value if it has not been memoised.
+
+        Exceptions
+        ----------
+        Raises the exception raised by the factory, if any.
+
+        Returns
+        -------
+        The memoised value.
+
+        '''
+        _Future = self._memo.get(key)
+
+        if _Future is None:
+            _Future = asyncio.ensure_future(factory())
+            self._memo[key] = _Future
+            _Future.add_done_callback(lambda _: self._forget_failure(key, _Future)) # type: ignore
+
+        return await asyncio.shield(_Future)
+
+    def add_cleanup(self, callback: Callable[[], Awaitable[None]]) -> None:
+        '''
+        Summary
+        -------
+        Adds a callback to release a resource once the invocation has ended, whether it completed,
+        raised an exception or was cancelled. Callbacks are called in reverse order.
+
+        Parameters
+        ----------
+        `callback` Creates the awaitable that releases the resource.
+
+        '''
+        self._cleanup_callbacks.append(callback)
+
+    async def close_async(self) -> None:
+        '''
+        Summary
+        -------
+        Cancels the memoised values still being created, then calls the cleanup callbacks in reverse
+        order. Every callback is called even if an earlier callback raises an exception, after which
+        the first exception raised is reraised.
+
+        '''
+        for _Future in self._memo.values():
+            _Future.cancel()
+        self._memo.clear()
+
+        _Exception: Optional[Exception] = None
+        _CleanupCallbacks, self._cleanup_callbacks = self._cleanup_callbacks, []
+
+        for _Callback in reversed(_CleanupCallbacks):
+            try:
+                await _Callback()
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                _Exception = _Exception or ex
+
+        if _Exception is not None:
+            raise _Exception
+
+    def _forget_failure(self, key: Hashable, future: 'asyncio.Future[Any]') -> None:
+        if (future.cancelled() or future.exception() is not None) and self._memo.get(key) is future:
+            del self._memo[key]
+
+
+_InvocationContext: 'contextvars.ContextVar[InvocationContext]' = contextvars.ContextVar("clapy_invocation_context")
+
+_InvocationProperties: 'contextvars.ContextVar[Mapping[str, Any]]' = contextvars.ContextVar(
+    "clapy_invocation_properties", default={})
+
+
+@contextlib.contextmanager
+def invocation_properties(**properties: Any) -> Iterator[None]:
+    '''
+    Summary
+    -------
+    Sets properties of the caller on the contexts of the use case invocations made within the
+    context, including those made by tasks created within it. Properties set by an enclosing
+    context are kept unless overridden.
+
+    Parameters
+    ----------
+    `properties` The properties of the caller, such as whether it is a trusted internal caller.
+
+    Example
+    -------
+    with invocation_properties(is_internal=True):\n
+        await _UseCaseInvoker.invoke_usecase_async(_InputPort, _Presenter, _PipelineConfiguration)
+
+    '''
+    _Token = _InvocationProperties.set({**_InvocationProperties.get(), **properties})
+    try:
+        yield
+    finally:
+        _InvocationProperties.reset(_Token)
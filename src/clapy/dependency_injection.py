@@ -18,10 +18,15 @@ class DependencyInjectorServiceProvider(IServiceProvider):
     Clapy's default service provider implementation for using Clapy with dependency_injector. Uses
     the DeclarativeContainer from dependency_injector.
 
+    Services should be registered before use cases are invoked. If `thread_safe` is true, services
+    registered with `providers.Singleton` are registered with `providers.ThreadSafeSingleton`
+    instead, so a singleton resolved from several threads at once is only constructed once.
+
     '''
 
-    def __init__(self):
+    def __init__(self, thread_safe: bool = False):
         self._container = containers.DeclarativeContainer()
+        self._thread_safe = thread_safe
 
     def get_service(self, service: type) -> object:
         '''
@@ -94,6 +99,9 @@ class DependencyInjectorServiceProvider(IServiceProvider):
         if hasattr(self._container, _DependencyName):
             raise DuplicateServiceError(f"An already registered service is conflicting with {interface_type or concrete_type}.")
 
+        if self._thread_safe and provider_method is providers.Singleton:
+            provider_method = providers.ThreadSafeSingleton
+
         _ConstructorDependencies = [_Param for _Param in inspect.signature(concrete_type.__init__).parameters.values() # type: ignore
                                     if _Param.annotation != inspect.Parameter.empty
                                     and self._has_service(_Param.annotation)]
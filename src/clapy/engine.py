@@ -1,24 +1,73 @@
+import asyncio
+import copy
 import inspect
-from typing import Dict, List, Type, cast
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Type, cast
 
+from .batching import InputPortBatch
 from .common import Common
+from .context import InvocationContext
 from .exceptions import PipeConfigurationError
-from .outputs import IOutputPort
+from .invokers import InvocationRecording
+from .metrics import (IMetricsRecorder, LatencyWindow, PipeStatistics,
+                      TokenBucket)
+from .outputs import IOutputPort, IValidationOutputPort, ValidationResult
 from .pipeline import (InputPort, IPipe, PipeConfiguration,
-                       PipeConfigurationOption)
+                       PipeConfigurationOption, SynchronousPipe)
 from .services import IPipelineFactory, IServiceProvider, IUseCaseInvoker
+from .validation import ValidationPlan
 
 __all__ = ["PipelineFactory", "UseCaseInvoker", "Engine"]
 
 
+class _PlannedPipeline:
+    '''
+    The ordered pipe types of a use case and pipeline configuration. Predicates are not part of a
+    plan, as they may differ between configurations that share one. Instead, the index of the pipe
+    configuration holding each predicated pipe's predicate is planned.
+    '''
+
+    __slots__ = ("pipe_types", "reorderable_groups", "predicate_indexes", "ordered_at")
+
+    def __init__(
+            self,
+            pipe_types: List[type],
+            reorderable_groups: List[Tuple[int, int]],
+            predicate_indexes: Dict[type, int]) -> None:
+        self.pipe_types = pipe_types
+        self.reorderable_groups = reorderable_groups
+        self.predicate_indexes = predicate_indexes
+        self.ordered_at = 0
+
+
 class PipelineFactory(IPipelineFactory):
-    '''Responsible for creating the pipeline for the use case invoker to execute.'''
+    '''
+    Responsible for creating the pipeline for the use case invoker to execute. Can be shared by
+    invokers running on several threads and event loops, as its cache of pipeline plans is
+    copy-on-write and a plan's pipe types are replaced rather than modified when it is reordered.
+    '''
+
+    reorder_interval: int = 1000
+    '''The number of pipe statistics observations between reorders of a pipeline plan.'''
 
-    def __init__(self, service_provider: IServiceProvider, usecase_registry: Dict[str, List[str]]):
+    def __init__(
+            self,
+            service_provider: IServiceProvider,
+            usecase_registry: Dict[str, List[str]],
+            pipe_statistics: Optional[PipeStatistics] = None):
         if not service_provider or not usecase_registry:
             raise ValueError(f"Constructor parameters cannot be 'None' for {PipelineFactory.__name__}.")
         self._service_provider = service_provider
         self._usecase_registry = usecase_registry
+        self._pipe_statistics = pipe_statistics
+        self._pipeline_plans: Dict[Tuple[str, Tuple[tuple, ...]], _PlannedPipeline] = {}
+        self._pipeline_plans_lock = threading.Lock()
+
+    @property
+    def pipe_statistics(self) -> Optional[PipeStatistics]:
+        '''The statistics that order-independent pipes are reordered by, if provided.'''
+        return self._pipe_statistics
 
     async def create_pipeline_async(
             self,
@@ -28,7 +77,15 @@ class PipelineFactory(IPipelineFactory):
         Summary
         -------
         Creates a sorted list of IPipe objects based on the use case input port and pipeline
-        configuration provided.
+        configuration provided. The pipe types of each use case and configuration are planned on
+        first use, so later calls only have to resolve the pipes from the service provider.
+
+        If pipe statistics are provided, adjacent order-independent pipes are periodically reordered
+        in the background by their rank, so that cheap pipes that often fail run first.
+
+        Pipes configured with a predicate are only resolved if their predicate returns true for the
+        input port and the current `InvocationContext`. Predicates are not checked when the input port
+        is a use case's input port type, such as for a batch, so every pipe is resolved.
 
         Parameters
         ----------
@@ -44,42 +101,162 @@ class PipelineFactory(IPipelineFactory):
         The pipeline consisting of the use case pipes ordered by their priority.
 
         '''
-        _UsecaseKey = input_port.__module__
+        _PipelinePlan = self._get_pipeline_plan(input_port.__module__, pipeline_configuration, input_port)
+
+        if (_PipelinePlan.reorderable_groups and self._pipe_statistics is not None
+                and self._pipe_statistics.observation_count - _PipelinePlan.ordered_at >= self.reorder_interval):
+            _PipelinePlan.ordered_at = self._pipe_statistics.observation_count
+            asyncio.get_running_loop().call_soon(self._reorder_pipeline_plan, _PipelinePlan)
+
+        _PredicateIndexes = _PipelinePlan.predicate_indexes
+
+        if not _PredicateIndexes or isinstance(input_port, type):
+            return [cast(Type[IPipe], self._service_provider.get_service(_PipeType)) for _PipeType in _PipelinePlan.pipe_types]
+
+        try:
+            _Context = InvocationContext.current()
+        except LookupError:
+            _Context = InvocationContext(input_port)
+
+        return [cast(Type[IPipe], self._service_provider.get_service(_PipeType))
+                for _PipeType in _PipelinePlan.pipe_types
+                if _PipeType not in _PredicateIndexes
+                or pipeline_configuration[_PredicateIndexes[_PipeType]].predicate(input_port, _Context)] # type: ignore
+
+    def warm_up(self, pipeline_configurations: Iterable[List[PipeConfiguration]]) -> None:
+        '''
+        Summary
+        -------
+        Plans the pipeline of every registered use case for each of the pipeline configurations, and
+        compiles the validation plan of each use case's input port, ahead of the first invocation.
+        Useful before forking worker processes, so that every worker inherits the plans.
+
+        Parameters
+        ----------
+        `pipeline_configurations` The pipeline configurations that use cases will be invoked with.
+
+        '''
+        _PipelineConfigurations = list(pipeline_configurations)
+
+        for _UsecaseKey in self._usecase_registry:
+            ValidationPlan.for_input_port(Common.import_class_by_namespace(_UsecaseKey))
+
+            for _PipelineConfiguration in _PipelineConfigurations:
+                self._get_pipeline_plan(_UsecaseKey, _PipelineConfiguration, _UsecaseKey)
+
+    def _get_pipeline_plan(
+            self,
+            usecase_key: str,
+            pipeline_configuration: List[PipeConfiguration],
+            usecase: object) -> _PlannedPipeline:
+        '''
+        Summary
+        -------
+        Gets the ordered pipe types to resolve for a use case and pipeline configuration, planning
+        and caching them on first use.
+
+        '''
+        _PlanKey = (usecase_key, tuple((_PipeConfig.type, _PipeConfig.option, _PipeConfig.is_order_independent,
+                                        _PipeConfig.predicate is not None)
+                                       for _PipeConfig in pipeline_configuration))
+
+        try:
+            return self._pipeline_plans[_PlanKey]
+        except KeyError:
+            pass
 
-        if _UsecaseKey not in self._usecase_registry.keys():
-            raise KeyError(f"Could not find '{input_port}' in the pipeline registry.")
+        if usecase_key not in self._usecase_registry.keys():
+            raise KeyError(f"Could not find '{usecase}' in the pipeline registry.")
 
-        _PipeServices = [cast(Type[IPipe], self._service_provider.get_service(Common.import_class_by_namespace(_Namespace)))
-                         for _Namespace in self._usecase_registry[_UsecaseKey]]
+        _PipeTypes = [Common.import_class_by_namespace(_Namespace) for _Namespace in self._usecase_registry[usecase_key]]
 
-        _FilteredPipes = [_Pipe for _Pipe in _PipeServices
-                          if any(issubclass(type(_Pipe), _PipeConfig.type)
+        _FilteredPipes = [_Pipe for _Pipe in _PipeTypes
+                          if any(issubclass(_Pipe, _PipeConfig.type)
                                  for _PipeConfig in pipeline_configuration
                                  if _PipeConfig.option == PipeConfigurationOption.DEFAULT)]
 
         _SortedPipes = sorted(_FilteredPipes, key=lambda _Pipe:
                               pipeline_configuration.index(next(_PipeConfig
                                                                 for _PipeConfig in pipeline_configuration
-                                                                if issubclass(type(_Pipe), _PipeConfig.type))))
+                                                                if issubclass(_Pipe, _PipeConfig.type))))
 
-        _PipesToInsert = [(self._service_provider.get_service(_ExtraPipe.type), _Index)
+        _PipesToInsert = [(_ExtraPipe.type, _Index)
                           for _Index, _ExtraPipe in enumerate(pipeline_configuration)
-                          if not any(issubclass(type(_Pipe), _ExtraPipe.type) for _Pipe in _PipeServices)
+                          if not any(issubclass(_Pipe, _ExtraPipe.type) for _Pipe in _PipeTypes)
                           and _ExtraPipe.option == PipeConfigurationOption.INSERT]
 
-        for _PipeService, _Priority in _PipesToInsert:
-            Engine._insert_pipe(cast(Type[IPipe],_PipeService), _Priority, _SortedPipes, pipeline_configuration)
+        for _PipeType, _Priority in _PipesToInsert:
+            Engine._insert_pipe(_PipeType, _Priority, _SortedPipes, pipeline_configuration)
+
+        _ReorderableGroups: List[Tuple[int, int]] = []
+        _GroupStart = None
+        for _Index, _Pipe in enumerate(_SortedPipes + [None]):
+            _IsOrderIndependent = _Pipe is not None and next(_PipeConfig.is_order_independent
+                                                             for _PipeConfig in pipeline_configuration
+                                                             if issubclass(_Pipe, _PipeConfig.type))
+            if _IsOrderIndependent and _GroupStart is None:
+                _GroupStart = _Index
+            elif not _IsOrderIndependent and _GroupStart is not None:
+                if _Index - _GroupStart > 1:
+                    _ReorderableGroups.append((_GroupStart, _Index))
+                _GroupStart = None
+
+        _PredicateIndexes = {}
+        for _Pipe in _SortedPipes:
+            _Index = next(_Index for _Index, _PipeConfig in enumerate(pipeline_configuration) if issubclass(_Pipe, _PipeConfig.type))
+            if pipeline_configuration[_Index].predicate is not None:
+                _PredicateIndexes[_Pipe] = _Index
+
+        _PipelinePlan = _PlannedPipeline(_SortedPipes, _ReorderableGroups, _PredicateIndexes)
+
+        with self._pipeline_plans_lock:
+            if _PlanKey not in self._pipeline_plans:
+                self._pipeline_plans = {**self._pipeline_plans, _PlanKey: _PipelinePlan}
+            return self._pipeline_plans[_PlanKey]
+
+    def _reorder_pipeline_plan(self, pipeline_plan: _PlannedPipeline) -> None:
+        '''
+        Summary
+        -------
+        Sorts each group of adjacent order-independent pipes in a plan by their rank, keeping the
+        planned order of a group until every pipe in it has been ranked. The plan's pipe types are
+        replaced rather than modified, so pipelines being created are unaffected.
 
-        return _SortedPipes
+        '''
+        _PipeStatistics = cast(PipeStatistics, self._pipe_statistics)
+        _PipeTypes = list(pipeline_plan.pipe_types)
+
+        for _GroupStart, _GroupEnd in pipeline_plan.reorderable_groups:
+            _Ranks = [_PipeStatistics.get_rank(_PipeType) for _PipeType in _PipeTypes[_GroupStart:_GroupEnd]]
+
+            if None not in _Ranks:
+                _RankedPipes = sorted(zip(_Ranks, _PipeTypes[_GroupStart:_GroupEnd]), key=lambda _RankedPipe: _RankedPipe[0])
+                _PipeTypes[_GroupStart:_GroupEnd] = [_PipeType for _, _PipeType in _RankedPipes]
+
+        pipeline_plan.pipe_types = _PipeTypes
 
 
 class UseCaseInvoker(IUseCaseInvoker):
     '''The main engine of Clapy. Handles the invocation of use case pipelines.'''
 
-    def __init__(self, pipeline_factory: IPipelineFactory):
+    def __init__(
+            self,
+            pipeline_factory: IPipelineFactory,
+            max_hedges_per_second: float = 10.0,
+            pipe_statistics: Optional[PipeStatistics] = None,
+            metrics_recorder: Optional[IMetricsRecorder] = None):
         if not pipeline_factory:
             raise ValueError(f"Constructor parameters cannot be 'None' for {UseCaseInvoker.__name__}.")
+        if isinstance(pipeline_factory, PipelineFactory):
+            if pipe_statistics is not None and pipe_statistics is not pipeline_factory.pipe_statistics:
+                raise ValueError(f"The pipe statistics of a {UseCaseInvoker.__name__} must be those of its "
+                                 f"{PipelineFactory.__name__}, as pipes are only reordered by the factory.")
+            pipe_statistics = pipeline_factory.pipe_statistics
         self._pipeline_factory = pipeline_factory
+        self._hedge_budget = TokenBucket(max_hedges_per_second)
+        self._pipe_latencies: Dict[type, LatencyWindow] = {}
+        self._pipe_statistics = pipe_statistics
+        self._metrics_recorder = metrics_recorder
 
     async def invoke_usecase_async(
             self,
@@ -92,6 +269,15 @@ class UseCaseInvoker(IUseCaseInvoker):
         Performs the invocation of a use case with the provided input and output ports. Will stop
         the pipeline if the pipeline's pipes are exhausted, or on pipe failure unless configured to ignore.
 
+        Each invocation has its own `InvocationContext`, which is current while its pipeline is
+        created and executed and is closed once the invocation ends.
+
+        If the invocation is cancelled, the cancellation is raised in the pipe being executed and
+        later pipes are not executed. Pipes that were executed are always cleaned up. If a metrics
+        recorder is provided, the outcome and duration of each invocation are reported to it as
+        "clapy.invocation" and "clapy.invocation_duration", tagged with the use case and an outcome
+        of "success", "failure", "error" or "cancelled".
+
         Parameters
         ----------
         `input_port` The input port of the use case to be invoked\n
@@ -105,33 +291,284 @@ class UseCaseInvoker(IUseCaseInvoker):
         pipe configurations.
 
         '''
-        _Pipeline = await self._pipeline_factory.create_pipeline_async(input_port, pipeline_configuration)
+        if self._metrics_recorder is None:
+            async with InvocationContext(input_port):
+                _Pipeline = await self._pipeline_factory.create_pipeline_async(input_port, pipeline_configuration)
+                return await self._execute_pipeline_async(_Pipeline, input_port, output_port, pipeline_configuration)
+
+        _StartedAt = time.perf_counter()
+        _Outcome = "error"
+
+        try:
+            async with InvocationContext(input_port):
+                _Pipeline = await self._pipeline_factory.create_pipeline_async(input_port, pipeline_configuration)
+                _Result = await self._execute_pipeline_async(_Pipeline, input_port, output_port, pipeline_configuration)
+            _Outcome = "success" if _Result else "failure"
+            return _Result
+        except asyncio.CancelledError:
+            _Outcome = "cancelled"
+            raise
+        finally:
+            _Tags = {"usecase": input_port.__module__, "outcome": _Outcome}
+            self._metrics_recorder.increment("clapy.invocation", _Tags)
+            self._metrics_recorder.observe("clapy.invocation_duration", time.perf_counter() - _StartedAt, _Tags)
+
+    async def invoke_batch_async(
+            self,
+            batch: InputPortBatch,
+            output_port: IOutputPort,
+            pipeline_configuration: List[PipeConfiguration]) -> List[bool]:
+        '''
+        Summary
+        -------
+        Performs the invocation of a use case for every row of a columnar batch. Validators at the
+        start of the pipeline that support batches (such as the `RequiredInputValidator` and
+        `InputTypeValidator`) and are not configured with a predicate validate the whole batch a column at a time, and rows are then processed
+        in order. Validation failures are presented for each failing row without materialising it,
+        and only the rows that are still to be processed are materialised, one at a time, for the
+        rest of the pipeline. The pipes that validated the whole batch are left out of the pipeline
+        configuration of each row, so they are not resolved again.
 
-        _PipelineHasNoFailures = True
-        while len(_Pipeline) > 0:
+        Parameters
+        ----------
+        `batch` The columnar batch of input port values of the use case to be invoked\n
+        `output_port` The output port of the use case to be invoked, shared by every row\n
+        `pipeline_configuration` The configuration used to determine priority and inclusion of
+        use case pipes.
 
-            _Pipe = _Pipeline.pop(0)
+        Returns
+        -------
+        For each row of the batch, true if pipes exhausted and no pipe failures occurred.
 
-            _ShouldIgnoreFailures = next(pipe_config.should_ignore_failures
-                                         for pipe_config in pipeline_configuration
-                                         if issubclass(type(_Pipe), pipe_config.type))
+        '''
+        _UsecaseInputPort = cast(InputPort, batch.input_port_type)
+        _Pipeline = await self._pipeline_factory.create_pipeline_async(_UsecaseInputPort, pipeline_configuration)
 
-            if _PipelineHasNoFailures or _ShouldIgnoreFailures:
+        _BatchValidations: List[Tuple[PipeConfiguration, List[Optional[ValidationResult]]]] = []
+        _BatchValidatedPipeTypes: Set[type] = set()
+        if issubclass(type(output_port), IValidationOutputPort):
+            for _Pipe in _Pipeline:
                 _Configuration = next(pipe_config for pipe_config in pipeline_configuration
-                                    if issubclass(type(_Pipe), pipe_config.type))
+                                      if issubclass(type(_Pipe), pipe_config.type))
+                _ValidateBatch = getattr(_Pipe, "validate_batch", None)
+
+                if (_ValidateBatch is None or _Configuration.pre_action or _Configuration.post_action # type: ignore
+                        or _Configuration.predicate is not None):
+                    break
+
+                _BatchValidations.append((_Configuration, _ValidateBatch(batch)))
+                _BatchValidatedPipeTypes.add(type(_Pipe))
+
+        _RowPipelineConfiguration = [pipe_config for pipe_config in pipeline_configuration
+                                     if all(pipe_config is not _Configuration
+                                            for _Configuration, _ in _BatchValidations)
+                                     or any(type(_Pipe) not in _BatchValidatedPipeTypes
+                                            and issubclass(type(_Pipe), pipe_config.type)
+                                            for _Pipe in _Pipeline)]
+        _RemainingPipesIgnoreFailures = any(pipe_config.should_ignore_failures
+                                            for pipe_config in _RowPipelineConfiguration)
+
+        _Results = []
+        for _Row in range(len(batch)):
+            _RowHasNoFailures = True
 
-                if _Configuration.pre_action: # type: ignore
-                    await _Configuration.pre_action # type: ignore
+            for _Configuration, _ValidationResults in _BatchValidations:
+                _ValidationResult = _ValidationResults[_Row]
 
-                await _Pipe.execute_async(input_port, output_port) # type: ignore
+                if (_RowHasNoFailures or _Configuration.should_ignore_failures) and _ValidationResult is not None:
+                    _RowHasNoFailures = False
+                    await cast(IValidationOutputPort, output_port).present_validation_failure_async(_ValidationResult)
 
-                if _Configuration.post_action: # type: ignore
-                    await _Configuration.post_action # type: ignore
+            if _RowHasNoFailures or _RemainingPipesIgnoreFailures:
+                _InputPort = batch.get_row(_Row)
+                async with InvocationContext(_InputPort):
+                    _RowPipeline = await self._pipeline_factory.create_pipeline_async(_InputPort, _RowPipelineConfiguration)
+                    _RowHasNoFailures = await self._execute_pipeline_async(
+                        [_Pipe for _Pipe in _RowPipeline if type(_Pipe) not in _BatchValidatedPipeTypes],
+                        _InputPort, output_port, pipeline_configuration, _RowHasNoFailures)
 
-                _PipelineHasNoFailures = (not _Pipe.has_failures and _PipelineHasNoFailures)
+            _Results.append(_RowHasNoFailures)
+
+        return _Results
+
+    async def _execute_pipeline_async(
+            self,
+            pipeline: List[Type[IPipe]],
+            input_port: InputPort,
+            output_port: IOutputPort,
+            pipeline_configuration: List[PipeConfiguration],
+            pipeline_has_no_failures: bool = True) -> bool:
+        '''
+        Summary
+        -------
+        Executes the pipes of a pipeline in order. Will stop the pipeline if the pipeline's pipes
+        are exhausted, or on pipe failure unless configured to ignore. Synchronous pipes are called
+        directly, without creating a coroutine, unless they override `execute_async`.
+
+        Returns
+        -------
+        True if pipes exhausted and no pipe failures occurred.
+
+        '''
+        _Pipeline = pipeline
+        _PipelineHasNoFailures = pipeline_has_no_failures
+        _PipesToCleanUp: List[IPipe] = []
+
+        try:
+            while len(_Pipeline) > 0:
+
+                _Pipe = _Pipeline.pop(0)
+
+                _ShouldIgnoreFailures = next(pipe_config.should_ignore_failures
+                                             for pipe_config in pipeline_configuration
+                                             if issubclass(type(_Pipe), pipe_config.type))
+
+                if _PipelineHasNoFailures or _ShouldIgnoreFailures:
+                    _Configuration = next(pipe_config for pipe_config in pipeline_configuration
+                                        if issubclass(type(_Pipe), pipe_config.type))
+
+                    if _Configuration.pre_action: # type: ignore
+                        await _Configuration.pre_action # type: ignore
+
+                    if type(_Pipe).cleanup_async is not IPipe.cleanup_async:
+                        _PipesToCleanUp.append(cast(IPipe, _Pipe))
+
+                    _IsMeasured = _Configuration.is_order_independent and self._pipe_statistics is not None
+                    if _IsMeasured:
+                        _StartedAt = time.perf_counter()
+
+                    if _Configuration.hedge_percentile is not None:
+                        await self._execute_hedged_pipe_async(
+                            cast(IPipe, _Pipe), _Configuration.hedge_percentile, input_port, output_port)
+                    elif type(_Pipe).execute_async is SynchronousPipe.execute_async:
+                        _Awaitable = cast(SynchronousPipe, _Pipe).execute(input_port, output_port)
+                        if _Awaitable is not None:
+                            await _Awaitable
+                    else:
+                        await _Pipe.execute_async(input_port, output_port) # type: ignore
+
+                    if _IsMeasured:
+                        cast(PipeStatistics, self._pipe_statistics).record(
+                            type(_Pipe), time.perf_counter() - _StartedAt, _Pipe.has_failures)
+
+                    if _Configuration.post_action: # type: ignore
+                        await _Configuration.post_action # type: ignore
+
+                    _PipelineHasNoFailures = (not _Pipe.has_failures and _PipelineHasNoFailures)
+        finally:
+            if _PipesToCleanUp:
+                await self._clean_up_pipes_async(_PipesToCleanUp, input_port, output_port)
 
         return _PipelineHasNoFailures
 
+    async def _clean_up_pipes_async(self, pipes: List[IPipe], input_port: InputPort, output_port: IOutputPort) -> None:
+        '''
+        Summary
+        -------
+        Cleans up executed pipes in reverse order. Every pipe is cleaned up even if an earlier
+        clean up raises an exception, after which the first exception raised is reraised.
+
+        '''
+        _Exception: Optional[Exception] = None
+
+        for _Pipe in reversed(pipes):
+            try:
+                await _Pipe.cleanup_async(input_port, output_port)
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                _Exception = _Exception or ex
+
+        if _Exception is not None:
+            raise _Exception
+
+    async def _execute_hedged_pipe_async(
+            self,
+            pipe: IPipe,
+            hedge_percentile: float,
+            input_port: InputPort,
+            output_port: IOutputPort) -> None:
+        '''
+        Summary
+        -------
+        Executes an idempotent pipe, starting a second attempt on a copy of the pipe if the first
+        has not finished within the hedge percentile of the pipe's recent execution times, and the
+        hedging budget allows it. The outputs and failures of the first attempt to finish without
+        an exception are kept, and the other attempt is cancelled and awaited. An attempt that
+        finishes cancelled counts as a failed attempt. Outputs are held until an attempt has
+        finished, so the output port calls of a hedged pipe return `None`. The latency
+        recorded for the pipe runs from the start of the first attempt, as a hedge finishing quickly
+        says nothing about how long the first attempt would have taken.
+
+        Exceptions
+        ----------
+        Raises a `PipeConfigurationError` if the pipe is not idempotent.\n
+        Raises the exception of a failed attempt if every attempt raises an exception, or an
+        `asyncio.CancelledError` if every attempt is cancelled.
+
+        '''
+        if not pipe.is_idempotent:
+            raise PipeConfigurationError(f"The pipe '{type(pipe).__name__}' must be idempotent to be hedged.")
+
+        _Latencies = self._pipe_latencies.get(type(pipe))
+        if _Latencies is None:
+            _Latencies = self._pipe_latencies.setdefault(type(pipe), LatencyWindow())
+
+        _HedgeDelay = _Latencies.percentile(hedge_percentile)
+        _StartedAt = time.monotonic()
+
+        if _HedgeDelay is None:
+            await pipe.execute_async(input_port, output_port)
+            _Latencies.add(time.monotonic() - _StartedAt)
+            return
+
+        _HedgePipe = copy.copy(pipe)
+        _Attempts: Dict['asyncio.Task[None]', Tuple[IPipe, InvocationRecording]] = {}
+
+        def start_attempt(attempt_pipe: IPipe) -> 'asyncio.Task[None]':
+            _RecordingOutputPort, _Recording = InvocationRecording.record(output_port, forward=False)
+            _Task = asyncio.ensure_future(attempt_pipe.execute_async(input_port, _RecordingOutputPort))
+            _Attempts[_Task] = (attempt_pipe, _Recording)
+            return _Task
+
+        _Pending: Set['asyncio.Task[None]'] = {start_attempt(pipe)}
+        _FailedAttempts: List['asyncio.Task[None]'] = []
+
+        try:
+            _Done, _Pending = await asyncio.wait(_Pending, timeout=_HedgeDelay)
+
+            if not _Done and self._hedge_budget.try_acquire():
+                _Pending.add(start_attempt(_HedgePipe))
+
+            while True:
+                if not _Done:
+                    _Done, _Pending = await asyncio.wait(_Pending, return_when=asyncio.FIRST_COMPLETED)
+
+                _FailedAttempts.extend(_Task for _Task in _Done if _Task.cancelled() or _Task.exception() is not None)
+                _Winner = next((_Task for _Task in _Done if not _Task.cancelled() and _Task.exception() is None), None)
+
+                if _Winner is not None or not _Pending:
+                    break
+                _Done = set()
+
+            _FinishedAt = time.monotonic()
+        finally:
+            for _Task in _Pending:
+                _Task.cancel()
+            if _Pending:
+                await asyncio.gather(*_Pending, return_exceptions=True)
+
+        if _Winner is None:
+            _FailedAttempt = next((_Task for _Task in _FailedAttempts if not _Task.cancelled()), None)
+            if _FailedAttempt is None:
+                raise asyncio.CancelledError()
+            raise cast(BaseException, _FailedAttempt.exception())
+
+        _WinnerPipe, _Recording = _Attempts[_Winner]
+        _Latencies.add(_FinishedAt - _StartedAt)
+        pipe.has_failures = _WinnerPipe.has_failures
+        await _Recording.replay_async(output_port)
+
 
 class Engine:
     '''Helper methods for constructing the use case registry and use case pipelines.'''
@@ -234,7 +671,7 @@ class Engine:
         _PipesFromConfig = [pipe_config.type for pipe_config in pipeline_configuration]
 
         for _ExistingPipe in pipeline:
-            _ExistingPipeIdx = _PipesFromConfig.index(next(_Pipe for _Pipe in _PipesFromConfig if issubclass(type(_ExistingPipe), _Pipe)))
+            _ExistingPipeIdx = _PipesFromConfig.index(next(_Pipe for _Pipe in _PipesFromConfig if issubclass(_ExistingPipe, _Pipe)))
 
             if _ExistingPipeIdx < new_pipe_priority and (_LeftPipeIndex is None or _ExistingPipeIdx > _LeftPipeIndex):
                 _LeftPipeIndex = pipeline.index(_ExistingPipe)
@@ -1,7 +1,8 @@
 __all__ = [
     "DependencyConstructionError",
     "DuplicateServiceError",
-    "PipeConfigurationError"]
+    "PipeConfigurationError",
+    "ServiceUnavailableError"]
 
 
 class DependencyConstructionError(Exception):
@@ -17,3 +18,8 @@ class DuplicateServiceError(Exception):
 class PipeConfigurationError(Exception):
     def __init__(self, message: str):
         super().__init__(message)
+
+
+class ServiceUnavailableError(Exception):
+    def __init__(self, message: str):
+        super().__init__(message)
@@ -0,0 +1,582 @@
+import asyncio
+import collections
+import contextlib
+import contextvars
+import functools
+import threading
+import time
+from enum import Enum
+from typing import (Any, Callable, Deque, Dict, Hashable, Iterable, Iterator,
+                    List, Mapping, Optional, Set, Tuple, Type)
+
+from .outputs import IOutputPort
+from .pipeline import InputPort, PipeConfiguration
+from .services import IUseCaseInvoker
+from .validation import MISSING, ValidationPlan
+
+__all__ = [
+    "CachingUseCaseInvoker",
+    "InvocationCache",
+    "InvocationPriority",
+    "InvocationRecording",
+    "PrioritySchedulingUseCaseInvoker",
+    "SingleFlightUseCaseInvoker",
+    "invocation_priority"
+    ]
+
+
+class InvocationRecording:
+    '''
+    The output port calls made by a use case invocation, which can be replayed to another output port.
+
+    Attributes:
+        calls (List[Tuple[str, Tuple[Any, ...], Dict[str, Any]]]): The method name, positional
+        arguments and keyword arguments of each asynchronous output port method called, in order.
+        result (bool): The result of the invocation.
+    '''
+
+    __slots__ = ("calls", "result")
+
+    def __init__(self) -> None:
+        self.calls: List[Tuple[str, Tuple[Any, ...], Dict[str, Any]]] = []
+        self.result = False
+
+    async def replay_async(self, output_port: IOutputPort) -> bool:
+        '''
+        Summary
+        -------
+        Replays the recorded output port calls to an output port, in the order they were made.
+
+        Parameters
+        ----------
+        `output_port` The output port to replay the calls to.
+
+        Returns
+        -------
+        The result of the recorded invocation.
+
+        '''
+        for _MethodName, _Args, _Kwargs in self.calls:
+            await getattr(output_port, _MethodName)(*_Args, **_Kwargs)
+        return self.result
+
+    @staticmethod
+    def record(output_port: IOutputPort, forward: bool = True) -> Tuple[IOutputPort, 'InvocationRecording']:
+        '''
+        Summary
+        -------
+        Wraps an output port so that its asynchronous method calls are recorded as they are
+        forwarded to it. The wrapper is an instance of a subclass of the output port's type, so
+        checks such as `issubclass(type(output_port), IValidationOutputPort)` are unaffected.
+
+        Parameters
+        ----------
+        `output_port` The output port to record calls to.\n
+        `forward` If false, asynchronous method calls are only recorded, and not forwarded to the
+        output port until the recording is replayed to it.
+
+        Returns
+        -------
+        The recording output port to invoke the use case with, and the recording it writes to.
+
+        '''
+        _Recording = InvocationRecording()
+        _RecordingOutputPort = object.__new__(_get_recording_type(type(output_port)))
+        object.__setattr__(_RecordingOutputPort, "_recorded_output_port", output_port)
+        object.__setattr__(_RecordingOutputPort, "_recording", _Recording)
+        object.__setattr__(_RecordingOutputPort, "_forward", forward)
+        return _RecordingOutputPort, _Recording
+
+
+class _RecordingOutputPort:
+
+    __slots__ = ()
+
+    def __getattribute__(self, name: str) -> Any:
+        _OutputPort = object.__getattribute__(self, "_recorded_output_port")
+        _Attribute = getattr(_OutputPort, name)
+
+        if name.startswith("__") or not asyncio.iscoroutinefunction(_Attribute):
+            return _Attribute
+
+        _Calls = object.__getattribute__(self, "_recording").calls
+        _Forward = object.__getattribute__(self, "_forward")
+
+        async def record_call(*args: Any, **kwargs: Any) -> Any:
+            _Calls.append((name, args, kwargs))
+            return await _Attribute(*args, **kwargs) if _Forward else None
+
+        return record_call
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(object.__getattribute__(self, "_recorded_output_port"), name, value)
+
+
+_RecordingTypes: Dict[type, type] = {}
+
+
+def _get_recording_type(output_port_type: type) -> type:
+    try:
+        return _RecordingTypes[output_port_type]
+    except KeyError:
+        return _RecordingTypes.setdefault(
+            output_port_type, type(f"Recording{output_port_type.__name__}", (_RecordingOutputPort, output_port_type), {}))
+
+
+class InvocationCache:
+    '''
+    A bounded store of invocation recordings. Entries expire after an optional time to live, and the
+    least recently used entry is evicted once the cache is full. Safe to share between threads.
+
+    Attributes:
+        max_size (int): The maximum number of recordings held.
+        time_to_live (Optional[float]): The number of seconds a recording is held for, or `None` to
+        hold recordings until they are evicted or invalidated.
+    '''
+
+    def __init__(
+            self,
+            max_size: int = 1024,
+            time_to_live: Optional[float] = None,
+            clock: Callable[[], float] = time.monotonic) -> None:
+        if max_size < 1:
+            raise ValueError(f"The max size of an {InvocationCache.__name__} must be at least 1.")
+        self.max_size = max_size
+        self.time_to_live = time_to_live
+        self._clock = clock
+        self._entries: 'collections.OrderedDict[Tuple[str, Hashable], Tuple[float, InvocationRecording]]' = collections.OrderedDict()
+        self._usecase_keys: Dict[str, Set[Tuple[str, Hashable]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, usecase_key: str, key: Hashable) -> Optional[InvocationRecording]:
+        '''
+        Summary
+        -------
+        Gets an unexpired recording, marking it as the most recently used.
+
+        Parameters
+        ----------
+        `usecase_key` The key of the use case the recording belongs to.\n
+        `key` The key of the invocation within the use case.
+
+        Returns
+        -------
+        The recording, or `None` if there is no unexpired recording for the key.
+
+        '''
+        _EntryKey = (usecase_key, key)
+
+        with self._lock:
+            _Entry = self._entries.get(_EntryKey)
+
+            if _Entry is None:
+                return None
+
+            if _Entry[0] <= self._clock():
+                self._remove(_EntryKey)
+                return None
+
+            self._entries.move_to_end(_EntryKey)
+            return _Entry[1]
+
+    def set(self, usecase_key: str, key: Hashable, recording: InvocationRecording) -> None:
+        '''
+        Summary
+        -------
+        Stores a recording, evicting the least recently used recording if the cache is full.
+
+        Parameters
+        ----------
+        `usecase_key` The key of the use case the recording belongs to.\n
+        `key` The key of the invocation within the use case.\n
+        `recording` The recording to store.
+
+        '''
+        _EntryKey = (usecase_key, key)
+        _ExpiresAt = float("inf") if self.time_to_live is None else self._clock() + self.time_to_live
+
+        with self._lock:
+            self._entries[_EntryKey] = (_ExpiresAt, recording)
+            self._entries.move_to_end(_EntryKey)
+            self._usecase_keys.setdefault(usecase_key, set()).add(_EntryKey)
+
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, usecase_key: Optional[str] = None) -> None:
+        '''
+        Summary
+        -------
+        Removes the recordings of a use case, such as after a command has changed its data.
+
+        Parameters
+        ----------
+        `usecase_key` The key of the use case to remove recordings for, which is the module of its
+        input port (e.g. `GreetInputPort.__module__`). Removes every recording if not provided.
+
+        '''
+        with self._lock:
+            if usecase_key is None:
+                self._entries.clear()
+                self._usecase_keys.clear()
+                return
+
+            for _EntryKey in self._usecase_keys.pop(usecase_key, ()):
+                self._entries.pop(_EntryKey, None)
+
+    def _remove(self, entry_key: Tuple[str, Hashable]) -> None:
+        del self._entries[entry_key]
+        _UsecaseEntryKeys = self._usecase_keys[entry_key[0]]
+        _UsecaseEntryKeys.discard(entry_key)
+        if not _UsecaseEntryKeys:
+            del self._usecase_keys[entry_key[0]]
+
+
+class CachingUseCaseInvoker(IUseCaseInvoker):
+    '''
+    A use case invoker that caches the outputs of read-only use cases. The output port calls made
+    by a successful invocation are recorded, and replayed to the output port of later invocations
+    with equal inputs and pipeline configuration, without executing the pipeline.
+
+    Only asynchronous output port methods are recorded, and recorded arguments are shared between
+    every output port they are replayed to. Failed invocations and invocations with input values
+    that cannot be frozen into a hashable key are not cached.
+    '''
+
+    def __init__(
+            self,
+            usecase_invoker: IUseCaseInvoker,
+            cache: InvocationCache,
+            cached_input_port_types: Iterable[Type[InputPort]]):
+        if not usecase_invoker or cache is None:
+            raise ValueError(f"Constructor parameters cannot be 'None' for {CachingUseCaseInvoker.__name__}.")
+        self._usecase_invoker = usecase_invoker
+        self._cache = cache
+        self._cached_input_port_types = frozenset(cached_input_port_types)
+
+    async def invoke_usecase_async(
+            self,
+            input_port: InputPort,
+            output_port: IOutputPort,
+            pipeline_configuration: List[PipeConfiguration]) -> bool:
+        '''
+        Summary
+        -------
+        Replays the recorded outputs of an equal earlier invocation if one is cached, otherwise
+        performs the invocation of the use case, recording its outputs if it is cached.
+
+        Parameters
+        ----------
+        `input_port` The input port of the use case to be invoked\n
+        `output_port` The output port of the use case to be invoked\n
+        `pipeline_configuration` The configuration used to determine priority and inclusion of
+        use case pipes.
+
+        Returns
+        -------
+        True if pipes exhausted and no pipe failures occurred.
+
+        '''
+        _InvocationKey = (_create_invocation_key(input_port, pipeline_configuration)
+                          if type(input_port) in self._cached_input_port_types else None)
+
+        if _InvocationKey is None:
+            return await self._usecase_invoker.invoke_usecase_async(input_port, output_port, pipeline_configuration)
+
+        _UsecaseKey = input_port.__module__
+        _Recording = self._cache.get(_UsecaseKey, _InvocationKey)
+
+        if _Recording is not None:
+            return await _Recording.replay_async(output_port)
+
+        _RecordingOutputPort, _Recording = InvocationRecording.record(output_port)
+        _Recording.result = await self._usecase_invoker.invoke_usecase_async(
+            input_port, _RecordingOutputPort, pipeline_configuration)
+
+        if _Recording.result:
+            self._cache.set(_UsecaseKey, _InvocationKey, _Recording)
+
+        return _Recording.result
+
+
+class _InFlightInvocation:
+    '''An in-flight invocation shared by every caller with an equal invocation key.'''
+
+    __slots__ = ("task", "recording", "waiter_count")
+
+    def __init__(self, task: 'asyncio.Future[bool]', recording: InvocationRecording) -> None:
+        self.task = task
+        self.recording = recording
+        self.waiter_count = 0
+
+
+class SingleFlightUseCaseInvoker(IUseCaseInvoker):
+    '''
+    A use case invoker that coalesces identical concurrent invocations. While an invocation is in
+    flight, invocations of the same input port type with equal inputs and pipeline configuration
+    wait for it rather than executing the pipeline again. Its output port calls are recorded, then
+    replayed to the output port of every waiting caller once it completes.
+
+    The shared invocation outlives the cancellation of any one caller, and is only cancelled once
+    every caller waiting on it has been cancelled. An exception raised by the shared invocation is
+    raised to every caller waiting on it.
+    '''
+
+    def __init__(
+            self,
+            usecase_invoker: IUseCaseInvoker,
+            coalesced_input_port_types: Iterable[Type[InputPort]]):
+        if not usecase_invoker:
+            raise ValueError(f"Constructor parameters cannot be 'None' for {SingleFlightUseCaseInvoker.__name__}.")
+        self._usecase_invoker = usecase_invoker
+        self._coalesced_input_port_types = frozenset(coalesced_input_port_types)
+        self._flights: Dict[Hashable, _InFlightInvocation] = {}
+
+    async def invoke_usecase_async(
+            self,
+            input_port: InputPort,
+            output_port: IOutputPort,
+            pipeline_configuration: List[PipeConfiguration]) -> bool:
+        '''
+        Summary
+        -------
+        Waits for an equal in-flight invocation if there is one, otherwise performs the invocation
+        of the use case, then replays the outputs of the invocation to the output port.
+
+        Parameters
+        ----------
+        `input_port` The input port of the use case to be invoked\n
+        `output_port` The output port of the use case to be invoked\n
+        `pipeline_configuration` The configuration used to determine priority and inclusion of
+        use case pipes.
+
+        Returns
+        -------
+        True if pipes exhausted and no pipe failures occurred.
+
+        '''
+        _InvocationKey = (_create_invocation_key(input_port, pipeline_configuration)
+                          if type(input_port) in self._coalesced_input_port_types else None)
+
+        if _InvocationKey is None:
+            return await self._usecase_invoker.invoke_usecase_async(input_port, output_port, pipeline_configuration)
+
+        _FlightKey = (asyncio.get_running_loop(), input_port.__module__, _InvocationKey)
+        _Flight = self._flights.get(_FlightKey)
+
+        if _Flight is None:
+            _RecordingOutputPort, _Recording = InvocationRecording.record(output_port, forward=False)
+            _Flight = _InFlightInvocation(asyncio.ensure_future(self._usecase_invoker.invoke_usecase_async(
+                input_port, _RecordingOutputPort, pipeline_configuration)), _Recording)
+            self._flights[_FlightKey] = _Flight
+            _Flight.task.add_done_callback(functools.partial(self._end_flight, _FlightKey, _Flight))
+
+        _Flight.waiter_count += 1
+        try:
+            _Flight.recording.result = await asyncio.shield(_Flight.task)
+        except asyncio.CancelledError:
+            if _Flight.waiter_count == 1 and not _Flight.task.done():
+                _Flight.task.cancel()
+                self._end_flight(_FlightKey, _Flight)
+            raise
+        finally:
+            _Flight.waiter_count -= 1
+
+        return await _Flight.recording.replay_async(output_port)
+
+    def _end_flight(self, flight_key: Hashable, flight: _InFlightInvocation, *_: Any) -> None:
+        if self._flights.get(flight_key) is flight:
+            del self._flights[flight_key]
+
+
+class InvocationPriority(Enum):
+    '''The priority class of a use case invocation, from highest to lowest priority.'''
+
+    INTERACTIVE = "INTERACTIVE"
+    '''Work a user is waiting on, such as a web request. Scheduled before all other work.'''
+
+    NORMAL = "NORMAL"
+    '''Work without a specified priority class. Scheduled after interactive work.'''
+
+    BULK = "BULK"
+    '''Background work such as imports and synchronisations. Scheduled after all other work.'''
+
+
+_InvocationPriority: 'contextvars.ContextVar[InvocationPriority]' = contextvars.ContextVar(
+    "clapy_invocation_priority", default=InvocationPriority.NORMAL)
+
+
+@contextlib.contextmanager
+def invocation_priority(priority: InvocationPriority) -> Iterator[None]:
+    '''
+    Summary
+    -------
+    Sets the priority class of the use case invocations made within the context, including those
+    made by tasks created within it.
+
+    Parameters
+    ----------
+    `priority` The priority class of the invocations.
+
+    Example
+    -------
+    with invocation_priority(InvocationPriority.BULK):\n
+        await asyncio.gather(*_GreetingTasks)
+
+    '''
+    _Token = _InvocationPriority.set(priority)
+    try:
+        yield
+    finally:
+        _InvocationPriority.reset(_Token)
+
+
+class PrioritySchedulingUseCaseInvoker(IUseCaseInvoker):
+    '''
+    A use case invoker that limits the number of concurrent invocations, scheduling waiting
+    invocations by their priority class (see `invocation_priority`). A free slot goes to the
+    longest waiting invocation of the highest priority class that is below its share of the slots,
+    so bulk work cannot crowd out interactive work, but can use slots that would otherwise be idle.
+    '''
+
+    default_priority_shares: Dict[InvocationPriority, float] = {
+        InvocationPriority.INTERACTIVE: 1.0,
+        InvocationPriority.NORMAL: 0.75,
+        InvocationPriority.BULK: 0.25
+    }
+    '''The default maximum share of the concurrency slots each priority class can use at once.'''
+
+    def __init__(
+            self,
+            usecase_invoker: IUseCaseInvoker,
+            max_concurrency: int = 64,
+            priority_shares: Optional[Mapping[InvocationPriority, float]] = None):
+        if not usecase_invoker:
+            raise ValueError(f"Constructor parameters cannot be 'None' for {PrioritySchedulingUseCaseInvoker.__name__}.")
+        if max_concurrency < 1:
+            raise ValueError(f"The max concurrency of a {PrioritySchedulingUseCaseInvoker.__name__} must be at least 1.")
+
+        _PriorityShares = {**self.default_priority_shares, **(priority_shares or {})}
+
+        self._usecase_invoker = usecase_invoker
+        self._max_concurrency = max_concurrency
+        self._slot_limits = {_Priority: max(1, int(max_concurrency * _PriorityShares[_Priority]))
+                             for _Priority in InvocationPriority}
+        self._running_counts = {_Priority: 0 for _Priority in InvocationPriority}
+        self._running_count = 0
+        self._waiters: Dict[InvocationPriority, Deque['asyncio.Future[None]']] = {
+            _Priority: collections.deque() for _Priority in InvocationPriority}
+
+    async def invoke_usecase_async(
+            self,
+            input_port: InputPort,
+            output_port: IOutputPort,
+            pipeline_configuration: List[PipeConfiguration]) -> bool:
+        '''
+        Summary
+        -------
+        Waits for a concurrency slot for the priority class of the invocation, then performs the
+        invocation of the use case.
+
+        Parameters
+        ----------
+        `input_port` The input port of the use case to be invoked\n
+        `output_port` The output port of the use case to be invoked\n
+        `pipeline_configuration` The configuration used to determine priority and inclusion of
+        use case pipes.
+
+        Returns
+        -------
+        True if pipes exhausted and no pipe failures occurred.
+
+        '''
+        _Priority = _InvocationPriority.get()
+        await self._acquire_slot_async(_Priority)
+
+        try:
+            return await self._usecase_invoker.invoke_usecase_async(input_port, output_port, pipeline_configuration)
+        finally:
+            self._release_slot(_Priority)
+
+    async def _acquire_slot_async(self, priority: InvocationPriority) -> None:
+        _Waiter: 'asyncio.Future[None]' = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(_Waiter)
+        self._grant_slots()
+
+        try:
+            await _Waiter
+        except asyncio.CancelledError:
+            if _Waiter.done() and not _Waiter.cancelled():
+                self._release_slot(priority)
+            elif _Waiter in self._waiters[priority]:
+                self._waiters[priority].remove(_Waiter)
+            raise
+
+    def _release_slot(self, priority: InvocationPriority) -> None:
+        self._running_counts[priority] -= 1
+        self._running_count -= 1
+        self._grant_slots()
+
+    def _grant_slots(self) -> None:
+        for _Priority in InvocationPriority:
+            _Waiters = self._waiters[_Priority]
+
+            while (_Waiters
+                   and self._running_count < self._max_concurrency
+                   and self._running_counts[_Priority] < self._slot_limits[_Priority]):
+                _Waiter = _Waiters.popleft()
+                if _Waiter.done():
+                    continue
+
+                _Waiter.set_result(None)
+                self._running_counts[_Priority] += 1
+                self._running_count += 1
+
+
+def _create_invocation_key(input_port: InputPort, pipeline_configuration: List[PipeConfiguration]) -> Optional[Hashable]:
+    '''
+    Summary
+    -------
+    Creates a key that is equal for invocations of the same input port type with equal attribute
+    values and pipeline configuration. Values are frozen recursively, along with their types, so
+    lists, dictionaries, sets and nested input ports can be part of the key.
+
+    Parameters
+    ----------
+    `input_port` The input port of the invocation.\n
+    `pipeline_configuration` The pipeline configuration of the invocation.
+
+    Returns
+    -------
+    A hashable key for the invocation, or `None` if an attribute value cannot be frozen.
+
+    '''
+    try:
+        return (_freeze(input_port), tuple(pipeline_configuration))
+    except TypeError:
+        return None
+
+
+def _freeze(value: Any) -> Hashable:
+    _ValueType = type(value)
+
+    if isinstance(value, InputPort):
+        _AttrNames = set(ValidationPlan.for_input_port(_ValueType).type_hints)
+        _AttrNames.update(getattr(value, "__dict__", ()))
+        return (_ValueType, tuple((_AttrName, _freeze(getattr(value, _AttrName, MISSING)))
+                                  for _AttrName in sorted(_AttrNames)))
+
+    if isinstance(value, dict):
+        return (_ValueType, frozenset((_freeze(_Key), _freeze(_Value)) for _Key, _Value in value.items()))
+
+    if isinstance(value, (set, frozenset)):
+        return (_ValueType, frozenset(map(_freeze, value)))
+
+    if isinstance(value, (list, tuple)):
+        return (_ValueType, tuple(map(_freeze, value)))
+
+    hash(value)
+    return (_ValueType, value)
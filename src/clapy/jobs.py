@@ -0,0 +1,379 @@
+import asyncio
+import importlib
+import json
+import sqlite3
+import threading
+import time
+from typing import (Any, Callable, Dict, Iterable, List, Mapping, NamedTuple,
+                    Optional, Set, Tuple)
+
+from .outputs import IOutputPort
+from .pipeline import InputPort, PipeConfiguration
+from .services import IUseCaseInvoker
+from .validation import ValidationPlan
+
+__all__ = ["JobWorker", "QueuedJob", "SqliteJobQueue"]
+
+
+class QueuedJob(NamedTuple):
+    '''
+    A named tuple representing a use case invocation reserved from a job queue.
+
+    Attributes:
+        id (int): The identifier of the job within its queue.
+        input_port_type (str): The module and qualified name of the input port type, separated by a colon.
+        configuration_name (str): The name of the pipeline configuration to invoke the use case with.
+        payload (str): The attribute values of the input port, as a JSON object.
+        attempts (int): The number of times the job has been reserved, including this time.
+        visible_at (float): The time at which the job becomes visible to other workers again, unless
+        it is completed or failed first.
+    '''
+    id: int
+    input_port_type: str
+    configuration_name: str
+    payload: str
+    attempts: int
+    visible_at: float
+
+    def create_input_port(self) -> InputPort:
+        '''
+        Summary
+        -------
+        Imports the input port type of the job, and constructs an input port from the job's payload.
+
+        Exceptions
+        ----------
+        Raises an `ImportError` or `AttributeError` if the input port type can no longer be found.
+
+        Returns
+        -------
+        The input port of the job.
+
+        '''
+        _ModuleName, _QualifiedName = self.input_port_type.split(":", 1)
+        _InputPortType: Any = importlib.import_module(_ModuleName)
+        for _Name in _QualifiedName.split("."):
+            _InputPortType = getattr(_InputPortType, _Name)
+
+        _InputPort = _InputPortType()
+        for _AttrName, _Value in json.loads(self.payload).items():
+            setattr(_InputPort, _AttrName, _Value)
+
+        return _InputPort
+
+
+class SqliteJobQueue:
+    '''
+    A durable queue of use case invocations, stored in a local SQLite database. Jobs are delivered at
+    least once: a reserved job becomes available again once its visibility timeout elapses, unless
+    it has been completed or failed. Multiple workers and processes can share one database file.
+
+    Attributes:
+        visibility_timeout (float): The number of seconds a reserved job is hidden from other workers.
+        max_attempts (int): The number of times a job is attempted before it is marked as dead.
+        retry_delay (float): The number of seconds before a failed job is retried, doubled for each
+        further attempt.
+        clock (Callable[[], float]): Returns the current time in seconds, used for the visibility
+        timeout and retry delays.
+    '''
+
+    def __init__(
+            self,
+            database_path: str,
+            visibility_timeout: float = 30.0,
+            max_attempts: int = 3,
+            retry_delay: float = 1.0,
+            clock: Callable[[], float] = time.time) -> None:
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(database_path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS clapy_jobs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "input_port_type TEXT NOT NULL, "
+            "configuration_name TEXT NOT NULL, "
+            "payload TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "available_at REAL NOT NULL, "
+            "is_dead INTEGER NOT NULL DEFAULT 0, "
+            "last_error TEXT)")
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS clapy_jobs_available ON clapy_jobs (is_dead, available_at)")
+
+    def close(self) -> None:
+        '''Closes the connection to the database.'''
+        with self._lock:
+            self._connection.close()
+
+    def enqueue(self, input_port: InputPort, configuration_name: str) -> int:
+        '''
+        Summary
+        -------
+        Adds an invocation of a use case to the queue.
+
+        Parameters
+        ----------
+        `input_port` The input port of the use case to invoke. Assigned attribute values must be
+        JSON serialisable.\n
+        `configuration_name` The name of the pipeline configuration to invoke the use case with.
+
+        Exceptions
+        ----------
+        Raises a `TypeError` if an attribute value of the input port is not JSON serialisable.
+
+        Returns
+        -------
+        The identifier of the queued job.
+
+        '''
+        return self.enqueue_many([(input_port, configuration_name)])[0]
+
+    def enqueue_many(self, invocations: Iterable[Tuple[InputPort, str]]) -> List[int]:
+        '''
+        Summary
+        -------
+        Adds invocations of use cases to the queue in a single transaction.
+
+        Parameters
+        ----------
+        `invocations` The input port and pipeline configuration name of each invocation.
+
+        Exceptions
+        ----------
+        Raises a `TypeError` if an attribute value of an input port is not JSON serialisable.
+
+        Returns
+        -------
+        The identifiers of the queued jobs, in order.
+
+        '''
+        _Rows = [(f"{type(_InputPort).__module__}:{type(_InputPort).__qualname__}",
+                  _ConfigurationName,
+                  json.dumps(_get_assigned_values(_InputPort)))
+                 for _InputPort, _ConfigurationName in invocations]
+        _Now = self.clock()
+
+        with self._lock, self._transaction():
+            return [self._connection.execute(
+                        "INSERT INTO clapy_jobs (input_port_type, configuration_name, payload, available_at) "
+                        "VALUES (?, ?, ?, ?)", (*_Row, _Now)).lastrowid
+                    for _Row in _Rows]
+
+    def reserve(self, limit: int) -> List[QueuedJob]:
+        '''
+        Summary
+        -------
+        Reserves the available jobs that have waited longest, hiding them from other workers until
+        their visibility timeout elapses. Jobs whose final attempt was neither completed nor failed
+        within its visibility timeout, such as when the attempt crashed its worker, are marked as
+        dead instead.
+
+        Parameters
+        ----------
+        `limit` The maximum number of jobs to reserve.
+
+        Returns
+        -------
+        The reserved jobs, which may be fewer than the limit.
+
+        '''
+        _Now = self.clock()
+
+        with self._lock, self._transaction():
+            self._connection.execute(
+                "UPDATE clapy_jobs SET is_dead = 1, last_error = ? "
+                "WHERE is_dead = 0 AND available_at <= ? AND attempts >= ?",
+                ("The final attempt did not finish within its visibility timeout.", _Now, self.max_attempts))
+
+            _Jobs = [QueuedJob(*_Row[:4], _Row[4] + 1, _Now + self.visibility_timeout) for _Row in self._connection.execute(
+                "SELECT id, input_port_type, configuration_name, payload, attempts FROM clapy_jobs "
+                "WHERE is_dead = 0 AND available_at <= ? ORDER BY available_at, id LIMIT ?", (_Now, limit))]
+
+            self._connection.executemany(
+                "UPDATE clapy_jobs SET attempts = attempts + 1, available_at = ? WHERE id = ?",
+                [(_Now + self.visibility_timeout, _Job.id) for _Job in _Jobs])
+
+        return _Jobs
+
+    def complete(self, jobs: Iterable[QueuedJob]) -> None:
+        '''
+        Summary
+        -------
+        Removes completed jobs from the queue in a single transaction. A job that has since been
+        reserved again, because its visibility timeout elapsed, is left for its new reservation.
+
+        Parameters
+        ----------
+        `jobs` The completed jobs.
+
+        '''
+        with self._lock, self._transaction():
+            self._connection.executemany(
+                "DELETE FROM clapy_jobs WHERE id = ? AND attempts = ?", [(_Job.id, _Job.attempts) for _Job in jobs])
+
+    def fail(self, job: QueuedJob, error: str) -> None:
+        '''
+        Summary
+        -------
+        Records the failure of a job. The job is retried after an exponential delay, or marked as
+        dead once it has been attempted `max_attempts` times. A job that has since been reserved
+        again, because its visibility timeout elapsed, is left for its new reservation.
+
+        Parameters
+        ----------
+        `job` The failed job.\n
+        `error` A description of the failure.
+
+        '''
+        _RetryAt = self.clock() + self.retry_delay * 2 ** (job.attempts - 1)
+
+        with self._lock, self._transaction():
+            self._connection.execute(
+                "UPDATE clapy_jobs SET is_dead = ?, available_at = ?, last_error = ? WHERE id = ? AND attempts = ?",
+                (int(job.attempts >= self.max_attempts), _RetryAt, error, job.id, job.attempts))
+
+    def count(self, is_dead: bool = False) -> int:
+        '''
+        Summary
+        -------
+        Counts the jobs in the queue, including reserved jobs.
+
+        Parameters
+        ----------
+        `is_dead` If true, counts the jobs that have exhausted their attempts instead.
+
+        Returns
+        -------
+        The number of jobs.
+
+        '''
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM clapy_jobs WHERE is_dead = ?", (int(is_dead),)).fetchone()[0]
+
+    def _transaction(self) -> '_Transaction':
+        return _Transaction(self._connection)
+
+
+class _Transaction:
+    '''Runs a block in an immediate transaction, so that concurrent writers wait rather than conflict.'''
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self._connection = connection
+
+    def __enter__(self) -> None:
+        self._connection.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exception_type: Any, *_: Any) -> None:
+        self._connection.execute("ROLLBACK" if exception_type else "COMMIT")
+
+
+class JobWorker:
+    '''
+    Drains a job queue by invoking the queued use cases, up to a number of jobs at once. Completed
+    jobs are removed from the queue in batches, once `commit_batch_size` jobs have completed or an
+    uncommitted job is within `commit_margin` seconds (by default, a quarter of the queue's
+    visibility timeout) of becoming visible to other workers again. A job completed just before
+    the worker stops abruptly, or too close to its visibility timeout, may be invoked again. Jobs whose invocation raises an exception are retried, while invocations that complete
+    with pipe failures (such as validation failures) are not. The queue is accessed from the event
+    loop's default executor, so that its blocking database work does not stall other invocations.
+    '''
+
+    def __init__(
+            self,
+            job_queue: SqliteJobQueue,
+            usecase_invoker: IUseCaseInvoker,
+            pipeline_configurations: Mapping[str, List[PipeConfiguration]],
+            presenter_factory: Callable[[InputPort], IOutputPort],
+            concurrency: int = 8,
+            commit_batch_size: int = 50,
+            commit_margin: Optional[float] = None,
+            poll_interval: float = 0.5):
+        if not job_queue or not usecase_invoker or pipeline_configurations is None or not presenter_factory:
+            raise ValueError(f"Constructor parameters cannot be 'None' for {JobWorker.__name__}.")
+        self._job_queue = job_queue
+        self._usecase_invoker = usecase_invoker
+        self._pipeline_configurations = pipeline_configurations
+        self._presenter_factory = presenter_factory
+        self._concurrency = concurrency
+        self._commit_batch_size = commit_batch_size
+        self._commit_margin = job_queue.visibility_timeout / 4 if commit_margin is None else commit_margin
+        self._poll_interval = poll_interval
+        self._completed_jobs: List[QueuedJob] = []
+        self._commit_deadline = float("inf")
+        self._is_stopping = False
+
+    async def run_async(self, stop_when_empty: bool = False) -> None:
+        '''
+        Summary
+        -------
+        Reserves and invokes jobs until the worker is stopped, then waits for the invocations in
+        progress to finish.
+
+        Parameters
+        ----------
+        `stop_when_empty` If true, the worker also stops once no jobs are available and no
+        invocations are in progress.
+
+        '''
+        self._is_stopping = False
+        _Loop = asyncio.get_running_loop()
+        _RunningTasks: Set['asyncio.Task[None]'] = set()
+
+        while True:
+            _Capacity = self._concurrency - len(_RunningTasks)
+            _Jobs = await _Loop.run_in_executor(None, self._job_queue.reserve, _Capacity) \
+                if _Capacity > 0 and not self._is_stopping else []
+
+            if (not _Jobs
+                    or len(self._completed_jobs) >= self._commit_batch_size
+                    or self._job_queue.clock() >= self._commit_deadline):
+                await self._commit_completed_jobs_async()
+
+            for _Job in _Jobs:
+                _Task = asyncio.ensure_future(self._invoke_job_async(_Job))
+                _RunningTasks.add(_Task)
+                _Task.add_done_callback(_RunningTasks.discard)
+
+            if not _RunningTasks and (self._is_stopping or (stop_when_empty and not _Jobs)):
+                break
+
+            if _RunningTasks:
+                await asyncio.wait(_RunningTasks, timeout=self._poll_interval, return_when=asyncio.FIRST_COMPLETED)
+            elif not _Jobs:
+                await asyncio.sleep(self._poll_interval)
+
+        await self._commit_completed_jobs_async()
+
+    def stop(self) -> None:
+        '''Stops the worker from reserving more jobs. `run_async` returns once the jobs in progress finish.'''
+        self._is_stopping = True
+
+    async def _invoke_job_async(self, job: QueuedJob) -> None:
+        try:
+            _InputPort = job.create_input_port()
+            await self._usecase_invoker.invoke_usecase_async(
+                _InputPort, self._presenter_factory(_InputPort), self._pipeline_configurations[job.configuration_name])
+        except Exception as ex:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._job_queue.fail, job, f"{type(ex).__name__}: {ex}")
+        else:
+            self._completed_jobs.append(job)
+            self._commit_deadline = min(self._commit_deadline, job.visible_at - self._commit_margin)
+
+    async def _commit_completed_jobs_async(self) -> None:
+        if self._completed_jobs:
+            _CompletedJobs, self._completed_jobs = self._completed_jobs, []
+            self._commit_deadline = float("inf")
+            await asyncio.get_running_loop().run_in_executor(None, self._job_queue.complete, _CompletedJobs)
+
+
+def _get_assigned_values(input_port: InputPort) -> Dict[str, Any]:
+    _AttrNames = set(ValidationPlan.for_input_port(type(input_port)).type_hints)
+    _AttrNames.update(getattr(input_port, "__dict__", ()))
+    return {_AttrName: getattr(input_port, _AttrName)
+            for _AttrName in sorted(_AttrNames) if input_port.has_been_set(_AttrName)}
@@ -0,0 +1,219 @@
+import collections
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Deque, Dict, List, Mapping, Optional
+
+__all__ = ["IMetricsRecorder", "LatencyWindow", "PipeStatistics", "TokenBucket"]
+
+
+class IMetricsRecorder(ABC):
+    '''Receives the metrics reported by Clapy, such as to forward them to a monitoring system.'''
+
+    @abstractmethod
+    def increment(self, name: str, tags: Mapping[str, str]) -> None:
+        '''
+        Summary
+        -------
+        Counts an occurrence of an event.
+
+        Parameters
+        ----------
+        `name` The name of the event (e.g. "clapy.configuration_switch").\n
+        `tags` The dimensions of the event, such as the use case it occurred in.
+
+        '''
+        pass
+
+    @abstractmethod
+    def observe(self, name: str, value: float, tags: Mapping[str, str]) -> None:
+        '''
+        Summary
+        -------
+        Records a measurement, such as a duration in seconds.
+
+        Parameters
+        ----------
+        `name` The name of the measurement.\n
+        `value` The measured value.\n
+        `tags` The dimensions of the measurement, such as the use case it was measured in.
+
+        '''
+        pass
+
+
+class LatencyWindow:
+    '''
+    A rolling window of the most recent latencies of an operation, used to estimate its percentiles.
+    Safe to share between threads.
+
+    Attributes:
+        min_samples (int): The number of latencies to observe before percentiles are estimated.
+    '''
+
+    def __init__(self, size: int = 256, min_samples: int = 20) -> None:
+        if size < 1 or min_samples > size:
+            raise ValueError(f"The size of a {LatencyWindow.__name__} must be at least 1 and at least its min samples.")
+        self.min_samples = min_samples
+        self._latencies: Deque[float] = collections.deque(maxlen=size)
+        self._sorted_latencies: Optional[List[float]] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def add(self, latency: float) -> None:
+        '''
+        Summary
+        -------
+        Adds a latency to the window, dropping the oldest latency if the window is full.
+
+        Parameters
+        ----------
+        `latency` The latency in seconds.
+
+        '''
+        with self._lock:
+            self._latencies.append(latency)
+            self._sorted_latencies = None
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        '''
+        Summary
+        -------
+        Estimates a percentile of the latencies in the window, using the nearest-rank method.
+
+        Parameters
+        ----------
+        `percentile` The percentile to estimate, greater than 0 and at most 100.
+
+        Returns
+        -------
+        The latency in seconds, or `None` if fewer than `min_samples` latencies have been observed.
+
+        '''
+        with self._lock:
+            if len(self._latencies) < self.min_samples or not self._latencies:
+                return None
+
+            if self._sorted_latencies is None:
+                self._sorted_latencies = sorted(self._latencies)
+            _SortedLatencies = self._sorted_latencies
+
+        _Rank = min(max(math.ceil(percentile / 100 * len(_SortedLatencies)), 1), len(_SortedLatencies))
+        return _SortedLatencies[_Rank - 1]
+
+
+class TokenBucket:
+    '''
+    Limits the rate of an operation. Tokens are refilled continuously up to the bucket's capacity,
+    and each operation takes one token. Safe to share between threads.
+
+    Attributes:
+        rate (float): The number of tokens refilled per second.
+        capacity (float): The maximum number of tokens held, which bounds the size of a burst.
+    '''
+
+    def __init__(
+            self,
+            rate: float,
+            capacity: Optional[float] = None,
+            clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.capacity = max(rate, 1.0) if capacity is None else capacity
+        self._clock = clock
+        self._tokens = self.capacity
+        self._refilled_at = clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        '''
+        Summary
+        -------
+        Takes a token from the bucket, if one is available.
+
+        Returns
+        -------
+        True if a token was taken, otherwise false.
+
+        '''
+        with self._lock:
+            _Now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (_Now - self._refilled_at) * self.rate)
+            self._refilled_at = _Now
+
+            if self._tokens < 1:
+                return False
+
+            self._tokens -= 1
+            return True
+
+
+class PipeStatistics:
+    '''
+    The rolling execution time and failure rate of each pipe type, as exponentially weighted moving
+    averages. Used to rank order-independent pipes, so that cheap pipes that often fail run first.
+    Safe to share between threads.
+
+    Attributes:
+        smoothing (float): The weight of each new observation, from 0 to 1.
+        min_observations (int): The number of observations of a pipe type required to rank it.
+        observation_count (int): The total number of observations recorded.
+    '''
+
+    def __init__(self, smoothing: float = 0.05, min_observations: int = 20) -> None:
+        self.smoothing = smoothing
+        self.min_observations = min_observations
+        self.observation_count = 0
+        self._statistics: Dict[type, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, pipe_type: type, duration: float, has_failures: bool) -> None:
+        '''
+        Summary
+        -------
+        Records an execution of a pipe.
+
+        Parameters
+        ----------
+        `pipe_type` The type of the executed pipe.\n
+        `duration` The number of seconds the execution took.\n
+        `has_failures` True if the pipe reported failures.
+
+        '''
+        with self._lock:
+            self.observation_count += 1
+            _Statistics = self._statistics.get(pipe_type)
+
+            if _Statistics is None:
+                self._statistics[pipe_type] = [duration, float(has_failures), 1]
+                return
+
+            _Statistics[0] += self.smoothing * (duration - _Statistics[0])
+            _Statistics[1] += self.smoothing * (has_failures - _Statistics[1])
+            _Statistics[2] += 1
+
+    def get_rank(self, pipe_type: type) -> Optional[float]:
+        '''
+        Summary
+        -------
+        Ranks a pipe type by its expected execution time per failure, so that pipes with lower ranks
+        are expected to stop failing invocations sooner when run first.
+
+        Parameters
+        ----------
+        `pipe_type` The type of the pipe to rank.
+
+        Returns
+        -------
+        The rank of the pipe type, infinite if it has not failed recently, or `None` if it has fewer
+        than `min_observations` observations.
+
+        '''
+        _Statistics = self._statistics.get(pipe_type)
+
+        if _Statistics is None or _Statistics[2] < self.min_observations:
+            return None
+
+        return _Statistics[0] / _Statistics[1] if _Statistics[1] > 0 else math.inf
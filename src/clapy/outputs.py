@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Any, Dict, List, Tuple
 
 __all__ = [
     "AuthorisationResult",
@@ -7,6 +7,7 @@ __all__ = [
     "IOutputPort",
     "IAuthenticationOutputPort",
     "IAuthorisationOutputPort",
+    "IServiceUnavailableOutputPort",
     "IValidationOutputPort"
     ]
 
@@ -22,14 +23,31 @@ class ValidationResult:
     '''
     A validation result from a validator.
 
+    Errors can be added either as messages, or as structured error codes with arguments. Error codes
+    are cheap to add, and are only rendered into messages (using `message_templates`) when `errors`
+    is first read, such as by a presenter.
+
     Attributes:
         errors (Dict[str, List[str]]): A dictionary that maps property names to a list of error
         messages associated with each property.
+        error_codes (List[Tuple[str, str, Dict[str, Any]]]): The property name, error code and
+        arguments of each error added as an error code.
         summary (str): A summary message representing the overall result of the validation.
     '''
 
+    message_templates: Dict[str, str] = {
+        "required": "'{property}' must have a value.",
+        "type_mismatch": "'{mismatch.full_path}' must be of type '{mismatch.expected}'."
+    }
+    '''
+    The `str.format` templates used to render each error code into a message, formatted with the
+    arguments of the error. Can be overridden on a subclass, for example to translate messages.
+    '''
+
     def __init__(self, errors: Dict[str, List[str]] = None, summary: str = None) -> None: # type: ignore
-        self.errors = errors
+        self._errors = errors
+        self._error_codes: List[Tuple[str, str, Dict[str, Any]]] = []
+        self._rendered_error_code_count = 0
         self.summary = summary
 
     def __str__(self) -> str:
@@ -38,6 +56,36 @@ class ValidationResult:
             "summary": self.summary
         }.__str__()
 
+    @property
+    def errors(self) -> Dict[str, List[str]]:
+        if self._rendered_error_code_count < len(self._error_codes):
+            if self._errors is None:
+                self._errors = {}
+
+            for _Property, _Code, _Arguments in self._error_codes[self._rendered_error_code_count:]:
+                _Message = self.message_templates[_Code].format(property=_Property, **_Arguments)
+                self._errors.setdefault(_Property, []).append(_Message)
+
+            self._rendered_error_code_count = len(self._error_codes)
+
+        return self._errors
+
+    @errors.setter
+    def errors(self, errors: Dict[str, List[str]]) -> None:
+        # Assigning replaces every error, including error codes that have not been rendered yet.
+        self._errors = errors
+        self._error_codes = []
+        self._rendered_error_code_count = 0
+
+    @property
+    def error_codes(self) -> List[Tuple[str, str, Dict[str, Any]]]:
+        return self._error_codes
+
+    @property
+    def has_errors(self) -> bool:
+        '''True if any error has been added, without rendering error codes into messages.'''
+        return bool(self._errors) or self._rendered_error_code_count < len(self._error_codes)
+
     @classmethod
     def from_error(cls, input_port, property_name: str, error_message: str) -> 'ValidationResult':
         '''
@@ -78,13 +126,30 @@ class ValidationResult:
             property (str): The property in error.
             error_message (str): The error message to be added against the property.
         '''
-        if self.errors is None:
-            self.errors = {}
+        if self._errors is None:
+            self._errors = {}
 
-        self.errors.setdefault(property, []).append(error_message) # type: ignore
+        self._errors.setdefault(property, []).append(error_message)
+
+    def add_error_code(self, property: str, code: str, **arguments: Any) -> None:
+        '''
+        Adds a structured error to the specified property. The error is only rendered into a message
+        when `errors` is read.
+
+        Parameters:
+            property (str): The property in error.
+            code (str): The error code, which must have a template in `message_templates`.
+            arguments: The arguments to format the message template with.
+        '''
+        self._error_codes.append((property, code, arguments))
 
     def _ensure_property_exist(self, input_port, property_name: str) -> None:
-        if not any(property_name == var.lstrip("_") for var in vars(input_port).keys()):
+        _Attributes = list(getattr(input_port, "__dict__", {}))
+        for _Class in type(input_port).__mro__:
+            _Slots = getattr(_Class, "__slots__", ())
+            _Attributes.extend((_Slots,) if isinstance(_Slots, str) else _Slots)
+
+        if not any(property_name == var.lstrip("_") for var in _Attributes if hasattr(input_port, var)):
             raise KeyError(f"The InputPort '{input_port}' does not contain a property by the name of '{property_name}'.")
 
 
@@ -111,6 +176,15 @@ class IAuthorisationOutputPort(ABC):
         pass
 
 
+class IServiceUnavailableOutputPort(ABC):
+    '''An output port for when the use case may reject invocations to shed load.'''
+
+    @abstractmethod
+    async def present_service_unavailable_async(self, retry_after: float) -> None:
+        '''Presents that the use case is unavailable, and the number of seconds to wait before retrying.'''
+        pass
+
+
 class IValidationOutputPort(ABC):
     '''An output port for when validation is required by the use case.'''
 
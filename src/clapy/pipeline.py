@@ -1,10 +1,19 @@
+import json
+import logging
+import typing
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Coroutine, NamedTuple, Type, cast, get_type_hints
+from typing import (TYPE_CHECKING, Any, Awaitable, Callable, Coroutine, Dict,
+                    List, Mapping, NamedTuple, Optional, Tuple, Type, Union,
+                    cast)
 
-from .common import Common
 from .outputs import IOutputPort, IValidationOutputPort, ValidationResult
-from .utils import AttributeChangeTracker
+from .validation import (MISSING, ValidationPlan, compile_column_checker,
+                         find_missing_rows)
+
+if TYPE_CHECKING:
+    from .batching import InputPortBatch
+    from .context import InvocationContext
 
 __all__ = [
     "InputPort",
@@ -18,15 +27,314 @@ __all__ = [
     "InputTypeValidator",
     "Interactor",
     "PersistenceRuleValidator",
-    "RequiredInputValidator"
+    "RequiredInputValidator",
+    "SlottedInputPort",
+    "SynchronousPipe"
     ]
 
+_Logger = logging.getLogger(__name__)
 
-class InputPort:
-    '''Marks a class as an input port (not an implementation of IPipe). The entry point for all use cases.'''
+class _InputPortBase:
+    '''
+    The behaviour shared by InputPort and SlottedInputPort. Declares no slots and no instance
+    dictionary, so that SlottedInputPort can be constructed without one.
+    '''
+
+    __slots__ = ()
 
     def __init__(self, **kwargs):
-        self.__dict__.update(kwargs)
+        for _AttrName, _Value in kwargs.items():
+            setattr(self, _AttrName, _Value)
+
+    def has_been_set(self, attr_name: str) -> bool:
+        '''
+        Summary
+        -------
+        Checks whether a value has been assigned to an attribute of the input port, as opposed to the
+        attribute being unset or falling back to its default value. Useful for partial updates.
+
+        Parameters
+        ----------
+        `attr_name` The name of the attribute to check.
+
+        Returns
+        -------
+        True if a value has been assigned to the attribute, otherwise false.
+
+        '''
+        return attr_name in getattr(self, "__dict__", ())
+
+    @classmethod
+    def from_mapping(
+            cls,
+            mapping: Mapping[str, Any],
+            fail_fast: bool = False) -> Tuple['InputPort', Optional[ValidationResult]]:
+        '''
+        Summary
+        -------
+        Constructs and validates an input port from a mapping in a single pass, using the compiled
+        validation plan of the input port. Performs the same checks as the `RequiredInputValidator`
+        and `InputTypeValidator`. Only annotated attributes are read from the mapping, other keys
+        are ignored.
+
+        Mappings given for attributes hinted as a nested input port (optionally, or as a list,
+        sequence or variadic tuple of them) are constructed into nested input ports recursively, and
+        their errors are reported under the attribute's path (e.g. `address.street`).
+
+        Parameters
+        ----------
+        `mapping` The values of the input port's attributes, keyed by attribute name.\n
+        `fail_fast` If true, validation stops at the first missing or mismatching attribute.
+
+        Returns
+        -------
+        The constructed input port, and a `ValidationResult` describing any missing or mismatching
+        inputs, or `None` if the inputs are valid.
+
+        '''
+        _InputPort = cls()
+        _ValidationPlan = ValidationPlan.for_input_port(cls)
+        _ValidationResult = ValidationResult()
+
+        for _AttrName, _TypeChecker in _ValidationPlan.type_checkers:
+            _Value = mapping.get(_AttrName, MISSING)
+
+            if _Value is MISSING:
+                if _AttrName in _ValidationPlan.required_fields:
+                    _ValidationResult.add_error_code(_AttrName, "required")
+                    if fail_fast:
+                        break
+                continue
+
+            _NestedInputPort = _ValidationPlan.nested_input_ports.get(_AttrName)
+            if _NestedInputPort is not None and _is_nested_mapping(_Value, _NestedInputPort[1]):
+                _Value = _construct_nested_input_ports(_AttrName, _Value, _NestedInputPort, fail_fast, _ValidationResult)
+                setattr(_InputPort, _AttrName, _Value)
+                if fail_fast and _ValidationResult.has_errors:
+                    break
+                continue
+
+            setattr(_InputPort, _AttrName, _Value)
+
+            _Mismatch = _TypeChecker(_Value)
+            if _Mismatch is not None:
+                _Mismatch.root = _AttrName
+                _ValidationResult.add_error_code(_AttrName, "type_mismatch", mismatch=_Mismatch)
+                if fail_fast:
+                    break
+
+        if not _ValidationResult.has_errors:
+            return _InputPort, None
+
+        _ValidationResult.summary = "Inputs are missing values or mismatching input port's defined attribute types."
+        return _InputPort, _ValidationResult
+
+    @classmethod
+    def from_json(cls, data: Union[str, bytes, bytearray]) -> Tuple['InputPort', Optional[ValidationResult]]:
+        '''
+        Summary
+        -------
+        Decodes a JSON object, then constructs and validates an input port from it in a single pass.
+        See `from_mapping`.
+
+        Parameters
+        ----------
+        `data` A JSON document containing an object of the input port's attribute values.
+
+        Returns
+        -------
+        The constructed input port, and a `ValidationResult` describing any invalid JSON, missing or
+        mismatching inputs, or `None` if the inputs are valid.
+
+        '''
+        try:
+            _Mapping = json.loads(data)
+        except ValueError as ex:
+            return cls(), ValidationResult.from_summary(f"Input is not valid JSON: {ex}.")
+
+        if not isinstance(_Mapping, dict):
+            return cls(), ValidationResult.from_summary("Input must be a JSON object.")
+
+        return cls.from_mapping(_Mapping)
+
+
+class InputPort(_InputPortBase, ABC):
+    '''Marks a class as an input port (not an implementation of IPipe). The entry point for all use cases.'''
+
+
+def _is_nested_mapping(value: Any, sequence_type: Optional[type]) -> bool:
+    if sequence_type is None:
+        return isinstance(value, Mapping)
+    return isinstance(value, (list, tuple)) and all(isinstance(_Item, Mapping) for _Item in value)
+
+
+def _construct_nested_input_ports(
+        attr_name: str,
+        value: Any,
+        nested_input_port: Tuple[type, Optional[type]],
+        fail_fast: bool,
+        validation_result: ValidationResult) -> Any:
+    '''
+    Summary
+    -------
+    Constructs the nested input port, or sequence of nested input ports, of an attribute from
+    mappings, adding their errors to the validation result under the attribute's path.
+
+    '''
+    _InputPortType, _SequenceType = nested_input_port
+
+    if _SequenceType is None:
+        return _construct_nested_input_port(attr_name, value, _InputPortType, fail_fast, validation_result)
+
+    _InputPorts = []
+    for _Index, _Mapping in enumerate(value):
+        _InputPorts.append(_construct_nested_input_port(
+            f"{attr_name}[{_Index}]", _Mapping, _InputPortType, fail_fast, validation_result))
+        if fail_fast and validation_result.has_errors:
+            break
+
+    return _SequenceType(_InputPorts)
+
+
+def _construct_nested_input_port(
+        path: str,
+        mapping: Mapping[str, Any],
+        input_port_type: type,
+        fail_fast: bool,
+        validation_result: ValidationResult) -> InputPort:
+    _InputPort, _NestedValidationResult = cast(Type[InputPort], input_port_type).from_mapping(mapping, fail_fast)
+
+    if _NestedValidationResult is not None:
+        for _Property, _Code, _Arguments in _NestedValidationResult.error_codes:
+            if "mismatch" in _Arguments:
+                _Arguments["mismatch"].root = f"{path}.{_Arguments['mismatch'].root}"
+            validation_result.add_error_code(f"{path}.{_Property}", _Code, **_Arguments)
+
+    return _InputPort
+
+
+def _is_class_variable(annotation: Any) -> bool:
+    if isinstance(annotation, str):
+        return annotation.startswith(("ClassVar", "typing.ClassVar"))
+    return annotation is typing.ClassVar or getattr(annotation, "__origin__", None) is typing.ClassVar
+
+
+def _create_slotted_init(cls: type, fields: Tuple[str, ...], defaults: Dict[str, Any]):
+    '''
+    Summary
+    -------
+    Generates the `__init__` of a SlottedInputPort, where each field is a keyword-only parameter.
+    Fields without a default are only assigned if a value is provided.
+
+    '''
+    _Globals: Dict[str, Any] = {"MISSING": MISSING, "_set_assigned": getattr(cls, "_assigned").__set__}
+    _Parameters = []
+    _Body = ["    _assigned = 0"]
+
+    for _Index, _Field in enumerate(fields):
+        _Globals[f"_set_{_Field}"] = getattr(cls, _Field).__set__
+        _Parameters.append(f"{_Field}=MISSING")
+        _Body.append(f"    if {_Field} is not MISSING:")
+        _Body.append(f"        _set_{_Field}(self, {_Field})")
+        _Body.append(f"        _assigned |= {1 << _Index}")
+
+        if _Field in defaults:
+            _Globals[f"_default_{_Field}"] = defaults[_Field]
+            _Body.append("    else:")
+            _Body.append(f"        _set_{_Field}(self, _default_{_Field})")
+
+    _Body.append("    _set_assigned(self, _assigned)")
+    _Source = f"def __init__(self{', *, ' + ', '.join(_Parameters) if _Parameters else ''}):\n"
+    _Source += "\n".join(_Body)
+
+    _Locals: Dict[str, Any] = {}
+    exec(_Source, _Globals, _Locals) # nosec B102
+    _Init = _Locals["__init__"]
+    _Init.__qualname__ = f"{cls.__qualname__}.__init__"
+    return _Init
+
+
+class _SlottedInputPortMeta(type):
+    '''
+    Generates `__slots__` and a keyword-only `__init__` from the annotations of each class it creates.
+    Default values are moved off the class into `_field_defaults`, as they would otherwise conflict
+    with the generated slots.
+    '''
+
+    def __new__(mcs, name: str, bases: Tuple[type, ...], namespace: Dict[str, Any], **kwargs):
+        _InheritedFields: Tuple[str, ...] = ()
+        _Defaults: Dict[str, Any] = {}
+        for _Base in reversed(bases):
+            _InheritedFields += tuple(_Field for _Field in getattr(_Base, "_fields", ()) if _Field not in _InheritedFields)
+            _Defaults.update(getattr(_Base, "_field_defaults", {}))
+
+        _NewFields = tuple(_Field for _Field, _Annotation in namespace.get("__annotations__", {}).items()
+                           if _Field not in _InheritedFields and not _is_class_variable(_Annotation))
+        _Fields = _InheritedFields + _NewFields
+
+        for _Field in _Fields:
+            if _Field in namespace:
+                _Defaults[_Field] = namespace.pop(_Field)
+
+        namespace["__slots__"] = tuple(namespace.get("__slots__", ())) + _NewFields
+        namespace["_fields"] = _Fields
+        namespace["_field_defaults"] = _Defaults
+        namespace["_field_bits"] = {_Field: 1 << _Index for _Index, _Field in enumerate(_Fields)}
+
+        _Class = super().__new__(mcs, name, bases, namespace, **kwargs)
+        if "__init__" not in namespace:
+            setattr(_Class, "__init__", _create_slotted_init(_Class, _Fields, _Defaults))
+        return _Class
+
+
+class SlottedInputPort(_InputPortBase, metaclass=_SlottedInputPortMeta):
+    '''
+    An opt-in compact InputPort. Annotated attributes are stored in generated `__slots__` rather than a
+    per-instance dictionary, and a keyword-only `__init__` is generated from the annotations.
+
+    As with InputPort, assigning a default value marks an attribute as optional. Attributes without a
+    default are left unset until assigned, so the `RequiredInputValidator` still reports them. Only
+    annotated attributes can be assigned.
+
+    Assigned attributes are tracked in a single bitmap on the instance, so `has_been_set` can tell
+    an attribute that was provided apart from one holding its default value.
+
+    SlottedInputPort shares its behaviour with InputPort through a base without an instance
+    dictionary, and is registered as a virtual subclass of InputPort, so `isinstance` and
+    `issubclass` checks against InputPort still hold.
+
+    Example
+    -------
+    class ExampleInputPort(SlottedInputPort):\n
+        message: str\n
+        retries: int = 3\n
+
+    ExampleInputPort(message="Hello world!")
+    '''
+
+    __slots__ = ("_assigned",)
+
+    _field_bits = {} # type: Dict[str, int]
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        _Bit = self._field_bits.get(name)
+        if _Bit:
+            _ASSIGNED_SLOT.__set__(self, getattr(self, "_assigned", 0) | _Bit)
+
+    def __delattr__(self, name: str) -> None:
+        object.__delattr__(self, name)
+        _Bit = self._field_bits.get(name)
+        if _Bit:
+            _ASSIGNED_SLOT.__set__(self, getattr(self, "_assigned", 0) & ~_Bit)
+
+    def has_been_set(self, attr_name: str) -> bool:
+        return bool(getattr(self, "_assigned", 0) & self._field_bits.get(attr_name, 0))
+
+
+_ASSIGNED_SLOT = cast(Any, SlottedInputPort.__dict__["_assigned"])
+
+InputPort.register(SlottedInputPort)
 
 
 class IPipe(ABC):
@@ -34,6 +342,12 @@ class IPipe(ABC):
 
     has_failures = False
 
+    is_idempotent = False
+    '''
+    If true, the pipe can safely be executed more than once for the same invocation, such as a pipe
+    that only reads data. Required for the pipe to be hedged. Set on a subclass to opt in.
+    '''
+
     @abstractmethod
     async def execute_async(self, input_port: InputPort, output_port: IOutputPort) -> None:
         '''
@@ -49,6 +363,55 @@ class IPipe(ABC):
         '''
         pass
 
+    async def cleanup_async(self, input_port: InputPort, output_port: IOutputPort) -> None:
+        '''
+        Summary
+        -------
+        Releases the resources acquired by the pipe. Optional to override. Called once the pipeline
+        has finished, failed, raised an exception or been cancelled, for each pipe that started
+        executing, in reverse order.
+
+        Parameters
+        ----------
+        `input_port` The input of the use case that was processed\n
+        `output_port` The interface containing methods to output the result of the pipe's execution
+
+        '''
+        pass
+
+
+class SynchronousPipe(IPipe):
+    '''
+    Marks a class as a pipe whose behaviour is a plain method, for pipes that do not wait on I/O
+    (such as validators of the input port). The invoker calls `execute` directly rather than
+    creating and awaiting a coroutine for the pipe. To call the output port, return the awaitable
+    of the call, which the invoker then awaits.
+    '''
+
+    @abstractmethod
+    def execute(self, input_port: InputPort, output_port: IOutputPort) -> Optional[Awaitable[None]]:
+        '''
+        Summary
+        -------
+        Defines the behaviour of the pipe when executed.
+
+        Parameters
+        ----------
+        `input_port` The input of the use case to be processed\n
+        `output_port` The interface containing methods to output the result of the pipe's execution
+
+        Returns
+        -------
+        An awaitable to be awaited before the pipe is complete, such as an output port call, or `None`.
+
+        '''
+        pass
+
+    async def execute_async(self, input_port: InputPort, output_port: IOutputPort) -> None:
+        _Awaitable = self.execute(input_port, output_port)
+        if _Awaitable is not None:
+            await _Awaitable
+
 
 class PipeConfigurationOption(Enum):
     '''Determines the method to be used for adding a pipe when constructing the pipeline.'''
@@ -72,12 +435,24 @@ class PipeConfiguration(NamedTuple):
         regardless of failures. Defaults to `false`.
         pre_action (Coroutine): An optional pre-action to be executed before pipe execution
         post_action (Coroutine): An optional post-action to be executed after pipe execution
+        hedge_percentile (Optional[float]): If set, a second attempt of the pipe is started when the
+        first has not finished within this percentile of the pipe's recent execution times, and the
+        first attempt to finish is kept. Only allowed for idempotent pipes. Defaults to `None`.
+        is_order_independent (bool): If true, the pipe may be reordered among the adjacent
+        order-independent pipes of the pipeline, so that cheap pipes that often fail run first.
+        Defaults to `false`.
+        predicate (Callable[[InputPort, InvocationContext], bool]): An optional check of whether the
+        pipe is included in an invocation, called with its input port and context before the pipe is
+        resolved. Skipped pipes are never constructed. Defaults to `None`, including the pipe.
     '''
     type: Type[IPipe]
     option: PipeConfigurationOption = PipeConfigurationOption.DEFAULT
     should_ignore_failures: bool = False
     pre_action: Coroutine = None # type: ignore
     post_action: Coroutine = None # type: ignore
+    hedge_percentile: Optional[float] = None
+    is_order_independent: bool = False
+    predicate: Optional[Callable[[InputPort, 'InvocationContext'], bool]] = None
 
 
 class AuthenticationVerifier(IPipe):
@@ -101,66 +476,91 @@ class InputPortValidator(IPipe):
     pass
 
 
-class InputTypeValidator(IPipe):
+class InputTypeValidator(SynchronousPipe):
     '''A use case validation pipe. Verifies all attributes on the InputPort have
     been provided a value matching the type hint defined on the attribute.'''
 
-    async def execute_async(self, input_port: InputPort, output_port: IOutputPort) -> None:
-        try:
-            input_port.__annotations__
-        except Exception:
-            return
+    collection_sample_size: Optional[int] = None
+    '''
+    An optional maximum number of elements to check in each sequence. Larger sequences are sampled
+    at an even stride instead of being checked in full. Set on a subclass to opt in.
+    '''
+
+    fail_fast: bool = False
+    '''If true, validation stops at the first mismatching attribute. Set on a subclass to opt in.'''
 
+    def execute(self, input_port: InputPort, output_port: IOutputPort) -> Optional[Awaitable[None]]:
+        _ValidationPlan = ValidationPlan.for_input_port(type(input_port), self.collection_sample_size)
         _ValidationResult = ValidationResult()
 
-        def validate_attribute(attr_value, type_hint):
-            if not hasattr(type_hint, "__origin__"):
-                if (type(attr_value) != type_hint
-                    and not issubclass(type(attr_value), type_hint)
-                    and attr_value is not None):
-                    return f"'{attr_name}' must be of type '{type_hint.__name__}'."
-
-            else:
-                type_origin = type_hint.__origin__
-                type_args = type_hint.__args__
-
-                if not isinstance(attr_value, type_origin):
-                    return f"'{attr_name}', or a sub-value of, must be of type '{type_origin.__name__}'."
-
-                elif Common.is_iterable(attr_value):
-                    if len(set([type(val) for val in attr_value])) != len(type_args):
-                        return f"'{attr_name}' has the wrong number of value types for type '{type_hint}'."
-
-                    for val in attr_value:
-                        if (type(val) not in type_args
-                            and type(val) not in [ta.__origin__ for ta in type_args if hasattr(ta, "__origin__")]
-                            and not any(issubclass(type(val), type_arg) for type_arg in type_args)
-                            and val is not None):
-                            return f"'{val}' of type {type(val)} does not match the " + \
-                            f"type(s) '{', '.join(arg.__name__ for arg in type_args)}' for '{attr_name}'."
-
-                elif type(attr_value) == AttributeChangeTracker:
-                    return validate_attribute(
-                        attr_value._value,
-                        type_args if not hasattr(type_hint, "__origin__") else type_args[0])
-
-        for attr_name, type_hint in get_type_hints(input_port).items():
+        for attr_name, check_attribute in _ValidationPlan.type_checkers:
             try:
                 attr_value = getattr(input_port, attr_name)
             except AttributeError:
                 continue
 
             try:
-                _ErrorMessage = validate_attribute(attr_value, type_hint)
-                if _ErrorMessage:
-                    _ValidationResult.add_error(attr_name, _ErrorMessage)
-            except Exception as e:
-                print(f"[CLAPY ERROR]: Could not validate '{attr_name}' of type '{type_hint}' with value '{attr_value}', see exception: {e}")
+                _Mismatch = check_attribute(attr_value)
+            except Exception:
+                _Logger.exception("Could not validate '%s' of type '%s' with value %r.",
+                                  attr_name, _ValidationPlan.type_hints[attr_name], attr_value)
+                continue
+
+            if _Mismatch is not None:
+                _Mismatch.root = attr_name
+                _ValidationResult.add_error_code(attr_name, "type_mismatch", mismatch=_Mismatch)
+                if self.fail_fast:
+                    break
 
-        if issubclass(type(output_port), IValidationOutputPort) and _ValidationResult.errors:
+        if issubclass(type(output_port), IValidationOutputPort) and _ValidationResult.has_errors:
             self.has_failures = True
             _ValidationResult.summary = "Types of inputs are mismatching input port's defined attribute types."
-            await cast(IValidationOutputPort, output_port).present_validation_failure_async(_ValidationResult)
+            return cast(IValidationOutputPort, output_port).present_validation_failure_async(_ValidationResult)
+
+        return None
+
+    def validate_batch(self, batch: 'InputPortBatch') -> List[Optional[ValidationResult]]:
+        '''
+        Summary
+        -------
+        Validates the types of every row of a columnar batch, a whole column at a time, without
+        materialising the rows. Performs the same checks as `execute`.
+
+        Parameters
+        ----------
+        `batch` The columnar batch of input port values to validate.
+
+        Returns
+        -------
+        A `ValidationResult` for each row with mismatching inputs, or `None` for each valid row.
+
+        '''
+        _ValidationPlan = ValidationPlan.for_input_port(batch.input_port_type, self.collection_sample_size)
+        _ValidationResults: List[Optional[ValidationResult]] = [None] * len(batch)
+
+        for attr_name, type_hint in _ValidationPlan.type_hints.items():
+            _Column = batch.columns.get(attr_name)
+            if _Column is None:
+                continue
+
+            try:
+                _Mismatches = compile_column_checker(type_hint, self.collection_sample_size)(_Column)
+            except Exception:
+                _Logger.exception("Could not validate the '%s' column of type '%s'.", attr_name, type_hint)
+                continue
+
+            for _Row, _Mismatch in _Mismatches:
+                _ValidationResult = _ValidationResults[_Row]
+                if _ValidationResult is None:
+                    _ValidationResult = _ValidationResults[_Row] = ValidationResult(
+                        summary="Types of inputs are mismatching input port's defined attribute types.")
+                elif self.fail_fast:
+                    continue
+
+                _Mismatch.root = attr_name
+                _ValidationResult.add_error_code(attr_name, "type_mismatch", mismatch=_Mismatch)
+
+        return _ValidationResults
 
 
 class Interactor(IPipe):
@@ -174,25 +574,62 @@ class PersistenceRuleValidator(IPipe):
     pass
 
 
-class RequiredInputValidator(IPipe):
+class RequiredInputValidator(SynchronousPipe):
     '''A use case validation pipe. Verifies all attributes on the InputPort have
     been provided a value.'''
 
-    async def execute_async(self, input_port: InputPort, output_port: IOutputPort) -> None:
-        try:
-            input_port.__annotations__
-        except Exception:
-            return
+    fail_fast: bool = False
+    '''If true, validation stops at the first missing attribute. Set on a subclass to opt in.'''
 
+    def execute(self, input_port: InputPort, output_port: IOutputPort) -> Optional[Awaitable[None]]:
+        _ValidationPlan = ValidationPlan.for_input_port(type(input_port))
         _ValidationResult = ValidationResult()
 
-        for attr_name, _ in get_type_hints(input_port).items():
-            try:
-                _ = getattr(input_port, attr_name)
-            except AttributeError:
-                _ValidationResult.add_error(attr_name, f"'{attr_name}' must have a value.")
+        for attr_name in _ValidationPlan.required_fields:
+            if not hasattr(input_port, attr_name):
+                _ValidationResult.add_error_code(attr_name, "required")
+                if self.fail_fast:
+                    break
 
-        if issubclass(type(output_port), IValidationOutputPort) and _ValidationResult.errors:
+        if issubclass(type(output_port), IValidationOutputPort) and _ValidationResult.has_errors:
             self.has_failures = True
             _ValidationResult.summary = "Required inputs are missing values."
-            await cast(IValidationOutputPort, output_port).present_validation_failure_async(_ValidationResult)
+            return cast(IValidationOutputPort, output_port).present_validation_failure_async(_ValidationResult)
+
+        return None
+
+    def validate_batch(self, batch: 'InputPortBatch') -> List[Optional[ValidationResult]]:
+        '''
+        Summary
+        -------
+        Validates that every row of a columnar batch has a value for each required attribute, a
+        whole column at a time, without materialising the rows. A missing column fails every row,
+        and `MISSING` values fail their row.
+
+        Parameters
+        ----------
+        `batch` The columnar batch of input port values to validate.
+
+        Returns
+        -------
+        A `ValidationResult` for each row with missing inputs, or `None` for each valid row.
+
+        '''
+        _ValidationPlan = ValidationPlan.for_input_port(batch.input_port_type)
+        _ValidationResults: List[Optional[ValidationResult]] = [None] * len(batch)
+
+        for attr_name in _ValidationPlan.required_fields:
+            _Column = batch.columns.get(attr_name)
+            _MissingRows = range(len(batch)) if _Column is None else find_missing_rows(_Column)
+
+            for _Row in _MissingRows:
+                _ValidationResult = _ValidationResults[_Row]
+                if _ValidationResult is None:
+                    _ValidationResult = _ValidationResults[_Row] = ValidationResult(
+                        summary="Required inputs are missing values.")
+                elif self.fail_fast:
+                    continue
+
+                _ValidationResult.add_error_code(attr_name, "required")
+
+        return _ValidationResults
@@ -0,0 +1,521 @@
+import asyncio
+import collections
+import time
+from enum import Enum
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from .exceptions import ServiceUnavailableError
+from .metrics import IMetricsRecorder, LatencyWindow
+from .outputs import IOutputPort, IServiceUnavailableOutputPort
+from .pipeline import InputPort, PipeConfiguration
+from .services import IUseCaseInvoker
+
+__all__ = [
+    "AdaptiveConcurrencyLimiter",
+    "CircuitBreaker",
+    "CircuitBreakingUseCaseInvoker",
+    "CircuitState",
+    "DegradingUseCaseInvoker"
+    ]
+
+
+class CircuitState(Enum):
+    '''The state of a circuit breaker.'''
+
+    CLOSED = "CLOSED"
+    '''Invocations are allowed, and their outcomes are monitored.'''
+
+    OPEN = "OPEN"
+    '''Invocations are rejected until the open duration elapses.'''
+
+    HALF_OPEN = "HALF_OPEN"
+    '''A limited number of trial invocations are allowed to decide whether to close the circuit.'''
+
+
+class CircuitBreaker:
+    '''
+    Stops invocations of an unhealthy operation. The outcomes of the most recent calls are monitored,
+    and the circuit opens once the rate of failed or slow calls reaches its threshold. While open,
+    calls are rejected. Once the open duration elapses the circuit becomes half open, and trial
+    calls decide whether it closes again or reopens.
+
+    Attributes:
+        failure_rate_threshold (float): The fraction of failed calls, from 0 to 1, that opens the circuit.
+        slow_call_duration (Optional[float]): The number of seconds after which a call counts as slow,
+        or `None` to not monitor slow calls.
+        slow_call_rate_threshold (float): The fraction of slow calls, from 0 to 1, that opens the circuit.
+        min_calls (int): The number of monitored calls required before the circuit can open.
+        open_duration (float): The number of seconds the circuit stays open before trial calls are allowed.
+        trial_call_count (int): The number of successful trial calls required to close the circuit.
+    '''
+
+    def __init__(
+            self,
+            failure_rate_threshold: float = 0.5,
+            slow_call_duration: Optional[float] = None,
+            slow_call_rate_threshold: float = 0.5,
+            window_size: int = 20,
+            min_calls: int = 10,
+            open_duration: float = 30.0,
+            trial_call_count: int = 1,
+            clock: Callable[[], float] = time.monotonic) -> None:
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.open_duration = open_duration
+        self.trial_call_count = trial_call_count
+        self._clock = clock
+        self._outcomes: Deque[Tuple[bool, bool]] = collections.deque(maxlen=window_size)
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._trial_calls_in_progress = 0
+        self._successful_trial_calls = 0
+        self._generation = 1
+
+    @property
+    def state(self) -> CircuitState:
+        '''The current state of the circuit, becoming half open once the open duration has elapsed.'''
+        if self._state is CircuitState.OPEN and self.retry_after <= 0:
+            self._state = CircuitState.HALF_OPEN
+            self._generation += 1
+            self._trial_calls_in_progress = 0
+            self._successful_trial_calls = 0
+        return self._state
+
+    @property
+    def retry_after(self) -> float:
+        '''The number of seconds until the open circuit allows trial calls, or 0 if it is not open.'''
+        if self._state is not CircuitState.OPEN:
+            return 0.0
+        return max(self._opened_at + self.open_duration - self._clock(), 0.0)
+
+    def try_acquire(self) -> Optional[int]:
+        '''
+        Summary
+        -------
+        Checks whether a call is allowed, counting it as a trial call if the circuit is half open.
+        Every acquired call must be released with the permit returned.
+
+        Returns
+        -------
+        The permit of the call if it is allowed, otherwise `None`. The permit identifies the state
+        of the circuit the call was allowed in.
+
+        '''
+        _State = self.state
+
+        if _State is CircuitState.CLOSED:
+            return self._generation
+
+        if _State is CircuitState.HALF_OPEN and self._trial_calls_in_progress + self._successful_trial_calls < self.trial_call_count:
+            self._trial_calls_in_progress += 1
+            return self._generation
+
+        return None
+
+    def release(self, permit: int, duration: Optional[float], is_failure: bool = False) -> None:
+        '''
+        Summary
+        -------
+        Releases an acquired call, recording its outcome. The outcome is ignored if the circuit has
+        changed state since the call was allowed, so a call allowed while the circuit was closed is
+        never counted as a trial call.
+
+        Parameters
+        ----------
+        `permit` The permit returned by `try_acquire` when the call was allowed.\n
+        `duration` The number of seconds the call took, or `None` if the call was abandoned before
+        it had an outcome, such as when cancelled.\n
+        `is_failure` True if the call failed.
+
+        '''
+        if permit != self._generation:
+            return
+
+        _IsTrialCall = self._state is CircuitState.HALF_OPEN
+        if _IsTrialCall:
+            self._trial_calls_in_progress = max(self._trial_calls_in_progress - 1, 0)
+
+        if duration is None:
+            return
+
+        _IsSlow = self.slow_call_duration is not None and duration >= self.slow_call_duration
+
+        if _IsTrialCall:
+            if is_failure or _IsSlow:
+                self._open()
+            else:
+                self._successful_trial_calls += 1
+                if self._successful_trial_calls >= self.trial_call_count:
+                    self._state = CircuitState.CLOSED
+                    self._generation += 1
+                    self._outcomes.clear()
+            return
+
+        self._outcomes.append((is_failure, _IsSlow))
+        if len(self._outcomes) < self.min_calls:
+            return
+
+        _FailedCallCount = sum(_IsFailure for _IsFailure, _ in self._outcomes)
+        _SlowCallCount = sum(_IsSlowCall for _, _IsSlowCall in self._outcomes)
+
+        if (_FailedCallCount >= self.failure_rate_threshold * len(self._outcomes)
+                or (self.slow_call_duration is not None
+                    and _SlowCallCount >= self.slow_call_rate_threshold * len(self._outcomes))):
+            self._open()
+
+    def _open(self) -> None:
+        self._state = CircuitState.OPEN
+        self._generation += 1
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+
+
+class AdaptiveConcurrencyLimiter:
+    '''
+    Limits the number of concurrent calls of an operation, adapting the limit to how the operation
+    copes with load. The limit grows by about one for each limit's worth of calls that succeed
+    within the target latency, and is multiplied by the backoff ratio when a call fails or is slow.
+    Calls beyond the limit are rejected straight away, rather than queueing.
+
+    Attributes:
+        limit (float): The current concurrency limit.
+        min_limit (int): The lowest the limit can fall to.
+        max_limit (int): The highest the limit can grow to.
+        target_latency (Optional[float]): The number of seconds after which a call counts as slow,
+        or `None` to only back off on failures.
+        backoff_ratio (float): The ratio the limit is multiplied by when backing off.
+        in_flight (int): The number of calls in progress.
+    '''
+
+    def __init__(
+            self,
+            initial_limit: int = 20,
+            min_limit: int = 1,
+            max_limit: int = 200,
+            target_latency: Optional[float] = None,
+            backoff_ratio: float = 0.9) -> None:
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.backoff_ratio = backoff_ratio
+        self.in_flight = 0
+
+    def try_acquire(self) -> bool:
+        '''
+        Summary
+        -------
+        Starts a call if the number of calls in progress is below the limit. Every acquired call
+        must be released.
+
+        Returns
+        -------
+        True if the call is allowed, otherwise false.
+
+        '''
+        if self.in_flight >= int(self.limit):
+            return False
+
+        self.in_flight += 1
+        return True
+
+    def release(self, duration: Optional[float], is_failure: bool = False) -> None:
+        '''
+        Summary
+        -------
+        Releases an acquired call, adapting the limit to its outcome.
+
+        Parameters
+        ----------
+        `duration` The number of seconds the call took, or `None` if the call was abandoned before
+        it had an outcome, such as when cancelled.\n
+        `is_failure` True if the call failed.
+
+        '''
+        self.in_flight -= 1
+
+        if duration is None:
+            return
+
+        if is_failure or (self.target_latency is not None and duration > self.target_latency):
+            self.limit = max(self.limit * self.backoff_ratio, float(self.min_limit))
+        else:
+            self.limit = min(self.limit + 1 / self.limit, float(self.max_limit))
+
+
+class CircuitBreakingUseCaseInvoker(IUseCaseInvoker):
+    '''
+    A use case invoker that protects each use case with its own circuit breaker, and optionally its
+    own adaptive concurrency limiter, so that a slow or failing dependency of one use case does not
+    slow down the others. An invocation rejected by either is not executed, and is presented to
+    the output port's `present_service_unavailable_async` method.
+
+    Invocations that raise an exception count as failures. Invocations that complete with pipe
+    failures (such as validation failures) count as successes, as the use case responded.
+    '''
+
+    def __init__(
+            self,
+            usecase_invoker: IUseCaseInvoker,
+            circuit_breaker_factory: Callable[[], CircuitBreaker] = CircuitBreaker,
+            concurrency_limiter_factory: Optional[Callable[[], AdaptiveConcurrencyLimiter]] = None,
+            clock: Callable[[], float] = time.monotonic):
+        if not usecase_invoker or not circuit_breaker_factory:
+            raise ValueError(f"Constructor parameters cannot be 'None' for {CircuitBreakingUseCaseInvoker.__name__}.")
+        self._usecase_invoker = usecase_invoker
+        self._circuit_breaker_factory = circuit_breaker_factory
+        self._concurrency_limiter_factory = concurrency_limiter_factory
+        self._clock = clock
+        self._circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self._concurrency_limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+
+    def get_circuit_breaker(self, usecase_key: str) -> CircuitBreaker:
+        '''
+        Summary
+        -------
+        Gets the circuit breaker of a use case, creating it on first use.
+
+        Parameters
+        ----------
+        `usecase_key` The key of the use case, which is the module of its input port (e.g.
+        `GreetInputPort.__module__`).
+
+        Returns
+        -------
+        The circuit breaker of the use case.
+
+        '''
+        _CircuitBreaker = self._circuit_breakers.get(usecase_key)
+        if _CircuitBreaker is None:
+            _CircuitBreaker = self._circuit_breakers[usecase_key] = self._circuit_breaker_factory()
+        return _CircuitBreaker
+
+    async def invoke_usecase_async(
+            self,
+            input_port: InputPort,
+            output_port: IOutputPort,
+            pipeline_configuration: List[PipeConfiguration]) -> bool:
+        '''
+        Summary
+        -------
+        Performs the invocation of a use case if its circuit is not open and it is below its
+        concurrency limit, otherwise presents that the use case is unavailable.
+
+        Parameters
+        ----------
+        `input_port` The input port of the use case to be invoked\n
+        `output_port` The output port of the use case to be invoked\n
+        `pipeline_configuration` The configuration used to determine priority and inclusion of
+        use case pipes.
+
+        Exceptions
+        ----------
+        Raises a `ServiceUnavailableError` if the invocation is rejected and the output port does
+        not implement `IServiceUnavailableOutputPort`.
+
+        Returns
+        -------
+        True if pipes exhausted and no pipe failures occurred. False if the invocation was rejected.
+
+        '''
+        _UsecaseKey = input_port.__module__
+        _CircuitBreaker = self.get_circuit_breaker(_UsecaseKey)
+        _ConcurrencyLimiter = self._get_concurrency_limiter(_UsecaseKey)
+
+        if _ConcurrencyLimiter is not None and not _ConcurrencyLimiter.try_acquire():
+            return await self._reject_async(input_port, output_port, 0.0)
+
+        _Permit = _CircuitBreaker.try_acquire()
+        if _Permit is None:
+            if _ConcurrencyLimiter is not None:
+                _ConcurrencyLimiter.release(None)
+            return await self._reject_async(input_port, output_port, _CircuitBreaker.retry_after)
+
+        _StartedAt = self._clock()
+        _Outcome: Tuple[Optional[float], bool] = (None, False)
+
+        try:
+            _Result = await self._usecase_invoker.invoke_usecase_async(input_port, output_port, pipeline_configuration)
+            _Outcome = (self._clock() - _StartedAt, False)
+            return _Result
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            _Outcome = (self._clock() - _StartedAt, True)
+            raise
+        finally:
+            _CircuitBreaker.release(_Permit, *_Outcome)
+            if _ConcurrencyLimiter is not None:
+                _ConcurrencyLimiter.release(*_Outcome)
+
+    def _get_concurrency_limiter(self, usecase_key: str) -> Optional[AdaptiveConcurrencyLimiter]:
+        if self._concurrency_limiter_factory is None:
+            return None
+
+        _ConcurrencyLimiter = self._concurrency_limiters.get(usecase_key)
+        if _ConcurrencyLimiter is None:
+            _ConcurrencyLimiter = self._concurrency_limiters[usecase_key] = self._concurrency_limiter_factory()
+        return _ConcurrencyLimiter
+
+    async def _reject_async(self, input_port: InputPort, output_port: IOutputPort, retry_after: float) -> bool:
+        if not isinstance(output_port, IServiceUnavailableOutputPort):
+            raise ServiceUnavailableError(f"The use case of '{type(input_port).__name__}' is unavailable.")
+
+        await output_port.present_service_unavailable_async(retry_after)
+        return False
+
+
+class _LadderState:
+    '''The recent load of a use case invoked through a ladder of pipeline configurations.'''
+
+    __slots__ = ("level", "latencies", "in_flight", "switched_at")
+
+    def __init__(self) -> None:
+        self.level = 0
+        self.latencies = LatencyWindow()
+        self.in_flight = 0
+        self.switched_at = float("-inf")
+
+
+class DegradingUseCaseInvoker(IUseCaseInvoker):
+    '''
+    A use case invoker that switches use cases to lighter pipeline configurations under load, and
+    back again once the load drops. Each ladder is a sequence of pipeline configurations, ordered
+    from the full configuration to the lightest. Invocations made with the first configuration of a
+    ladder are invoked with the configuration of the use case's current level on that ladder.
+
+    A use case moves one level lighter when the latency percentile of its recent invocations
+    exceeds `degrade_latency`, or its invocations in progress exceed `degrade_in_flight`. It moves
+    one level back once every configured signal is below its recovery threshold, which defaults to
+    half of the degrade threshold. The invocations in progress are counted before each invocation
+    starts, so a use case with no other invocations in progress is below any recovery threshold. Use cases stay on a level for at least `min_switch_interval`
+    seconds, so that they do not flap between levels.
+
+    Each switch is reported to the metrics recorder as a "clapy.configuration_switch" event, tagged
+    with the use case and the levels switched from and to. The plans of each configuration are
+    cached by the pipeline factory, so switching does not replan pipelines.
+    '''
+
+    def __init__(
+            self,
+            usecase_invoker: IUseCaseInvoker,
+            configuration_ladders: Sequence[Sequence[List[PipeConfiguration]]],
+            degrade_latency: Optional[float] = None,
+            degrade_in_flight: Optional[int] = None,
+            recover_latency: Optional[float] = None,
+            recover_in_flight: Optional[int] = None,
+            latency_percentile: float = 95,
+            min_switch_interval: float = 5.0,
+            metrics_recorder: Optional[IMetricsRecorder] = None,
+            clock: Callable[[], float] = time.monotonic):
+        if not usecase_invoker or configuration_ladders is None:
+            raise ValueError(f"Constructor parameters cannot be 'None' for {DegradingUseCaseInvoker.__name__}.")
+        if degrade_latency is None and degrade_in_flight is None:
+            raise ValueError(f"A {DegradingUseCaseInvoker.__name__} requires a latency or in flight threshold.")
+        self._usecase_invoker = usecase_invoker
+        self._ladders = {id(_Ladder[0]): list(_Ladder) for _Ladder in configuration_ladders}
+        self._degrade_latency = degrade_latency
+        self._degrade_in_flight = degrade_in_flight
+        self._recover_latency = recover_latency if recover_latency is not None or degrade_latency is None else degrade_latency / 2
+        self._recover_in_flight = recover_in_flight if recover_in_flight is not None or degrade_in_flight is None else degrade_in_flight // 2
+        self._latency_percentile = latency_percentile
+        self._min_switch_interval = min_switch_interval
+        self._metrics_recorder = metrics_recorder
+        self._clock = clock
+        self._usecase_loads: Dict[Tuple[str, int], _LadderState] = {}
+
+    def get_level(self, usecase_key: str, pipeline_configuration: List[PipeConfiguration]) -> int:
+        '''
+        Summary
+        -------
+        Gets the current level of a use case on a ladder, where 0 is the full configuration.
+
+        Parameters
+        ----------
+        `usecase_key` The key of the use case, which is the module of its input port (e.g.
+        `GreetInputPort.__module__`).\n
+        `pipeline_configuration` The first configuration of the ladder.
+
+        Returns
+        -------
+        The index of the configuration the use case is invoked with on the ladder.
+
+        '''
+        _UsecaseLoad = self._usecase_loads.get((usecase_key, id(pipeline_configuration)))
+        return 0 if _UsecaseLoad is None else _UsecaseLoad.level
+
+    async def invoke_usecase_async(
+            self,
+            input_port: InputPort,
+            output_port: IOutputPort,
+            pipeline_configuration: List[PipeConfiguration]) -> bool:
+        '''
+        Summary
+        -------
+        Performs the invocation of a use case with the configuration of its current level, if the
+        pipeline configuration is the first of a ladder, otherwise with the pipeline configuration.
+
+        Parameters
+        ----------
+        `input_port` The input port of the use case to be invoked\n
+        `output_port` The output port of the use case to be invoked\n
+        `pipeline_configuration` The configuration used to determine priority and inclusion of
+        use case pipes.
+
+        Returns
+        -------
+        True if pipes exhausted and no pipe failures occurred.
+
+        '''
+        _Ladder = self._ladders.get(id(pipeline_configuration))
+
+        if _Ladder is None:
+            return await self._usecase_invoker.invoke_usecase_async(input_port, output_port, pipeline_configuration)
+
+        _UsecaseKey = input_port.__module__
+        _UsecaseLoad = self._usecase_loads.get((_UsecaseKey, id(pipeline_configuration)))
+        if _UsecaseLoad is None:
+            _UsecaseLoad = self._usecase_loads[(_UsecaseKey, id(pipeline_configuration))] = _LadderState()
+
+        self._update_level(_UsecaseKey, _UsecaseLoad, len(_Ladder))
+        _UsecaseLoad.in_flight += 1
+        _Level = _UsecaseLoad.level
+        _StartedAt = self._clock()
+
+        try:
+            _Result = await self._usecase_invoker.invoke_usecase_async(input_port, output_port, _Ladder[_Level])
+        finally:
+            _UsecaseLoad.in_flight -= 1
+
+        if _UsecaseLoad.level == _Level:
+            _UsecaseLoad.latencies.add(self._clock() - _StartedAt)
+
+        return _Result
+
+    def _update_level(self, usecase_key: str, usecase_load: _LadderState, level_count: int) -> None:
+        _Now = self._clock()
+        if _Now - usecase_load.switched_at < self._min_switch_interval:
+            return
+
+        _Latency = usecase_load.latencies.percentile(self._latency_percentile)
+        _IsOverloaded = ((self._degrade_latency is not None and _Latency is not None and _Latency > self._degrade_latency)
+                         or (self._degrade_in_flight is not None and usecase_load.in_flight >= self._degrade_in_flight))
+        _IsRecovered = ((self._recover_latency is None or (_Latency is not None and _Latency < self._recover_latency))
+                        and (self._recover_in_flight is None or usecase_load.in_flight < self._recover_in_flight))
+
+        if _IsOverloaded and usecase_load.level < level_count - 1:
+            _NewLevel = usecase_load.level + 1
+        elif _IsRecovered and not _IsOverloaded and usecase_load.level > 0:
+            _NewLevel = usecase_load.level - 1
+        else:
+            return
+
+        if self._metrics_recorder is not None:
+            self._metrics_recorder.increment("clapy.configuration_switch", {
+                "usecase": usecase_key, "from_level": str(usecase_load.level), "to_level": str(_NewLevel)})
+
+        usecase_load.level = _NewLevel
+        usecase_load.latencies = LatencyWindow()
+        usecase_load.switched_at = _Now
@@ -5,6 +5,12 @@ __all__ = ["AttributeChangeTracker"]
 TAttributeValue = TypeVar('TAttributeValue')
 
 class AttributeChangeTracker(Generic[TAttributeValue]):
+    '''
+    Wraps a single input port attribute to track whether a value has been assigned to it. Prefer
+    `InputPort.has_been_set`, which tracks assignments on the input port itself without a wrapper
+    object per attribute.
+    '''
+
     __origin__ = Type['AttributeChangeTracker']
 
     def __init__(self, value: Optional[TAttributeValue] = None, has_been_set: Optional[bool] = False):
@@ -0,0 +1,680 @@
+import array
+import collections.abc
+import threading
+import types
+import typing
+from typing import (Any, Callable, Dict, List, Optional, Sequence, Tuple,
+                    TypeVar, get_type_hints)
+
+from .utils import AttributeChangeTracker
+
+__all__ = [
+    "MISSING",
+    "TypeMismatch",
+    "ValidationPlan",
+    "compile_column_checker",
+    "compile_type_checker",
+    "find_missing_rows"
+    ]
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING: Any = _Missing()
+'''Marks a value as not provided, such as a row of an `InputPortBatch` column that has no value.'''
+
+
+class TypeMismatch:
+    '''
+    Describes a value that does not match its type hint, and where it was found.
+
+    Attributes:
+        expected (str): A description of the type that was expected.
+        value (Any): The offending value.
+        path (List[str]): The path segments from the offending value back up to the checked value,
+        in reverse order (e.g. `['.price', '[3]']`).
+        root (str): The name of the checked value, such as the input port attribute name.
+    '''
+
+    __slots__ = ("expected", "value", "path", "root")
+
+    def __init__(self, expected: str, value: Any) -> None:
+        self.expected = expected
+        self.value = value
+        self.path: List[str] = []
+        self.root = ""
+
+    @property
+    def full_path(self) -> str:
+        '''The full path of the offending value, starting from `root` (e.g. `items[3].price`).'''
+        return self.format_path(self.root)
+
+    def at(self, segment: str) -> 'TypeMismatch':
+        '''Records that the mismatch was found under the specified path segment.'''
+        self.path.append(segment)
+        return self
+
+    def format_path(self, root: str) -> str:
+        '''Renders the full path of the offending value, starting from `root` (e.g. `items[3].price`).'''
+        return root + "".join(reversed(self.path))
+
+    def format_message(self, root: str) -> str:
+        '''Renders a human readable error message for the mismatch, starting from `root`.'''
+        return f"'{self.format_path(root)}' must be of type '{self.expected}'."
+
+
+TypeChecker = Callable[[Any], Optional[TypeMismatch]]
+'''
+A compiled check of a value against a type hint. Returns a `TypeMismatch` if the value, or any
+value nested within it, does not match the type hint, otherwise `None`.
+'''
+
+ColumnChecker = Callable[[Sequence[Any]], List[Tuple[int, TypeMismatch]]]
+'''
+A compiled check of a column of values against a type hint. Returns the row index and `TypeMismatch`
+of each value that does not match the type hint.
+'''
+
+_NoneType = type(None)
+_Literal = getattr(typing, "Literal", None)
+_TypeCheckers: Dict[Tuple[Any, Optional[int]], TypeChecker] = {}
+_ColumnCheckers: Dict[Tuple[Any, Optional[int]], ColumnChecker] = {}
+
+_BUFFER_FORMAT_TYPES: Dict[str, type] = {
+    **{_Code: int for _Code in "bBhHiIlLqQnN"},
+    **{_Code: float for _Code in "efd"},
+    "?": bool,
+    "u": str,
+    "c": bytes}
+'''Maps `array` type codes and `memoryview` formats to the Python type of their elements.'''
+
+_NUMPY_KIND_TYPES: Dict[str, type] = {"b": bool, "i": int, "u": int, "f": float, "c": complex, "U": str, "S": bytes}
+'''Maps NumPy dtype kinds to the Python type their elements are validated as.'''
+
+
+def _accept_any(value: Any) -> Optional[TypeMismatch]:
+    return None
+
+
+class ValidationPlan:
+    '''
+    The compiled validation rules of an InputPort subclass. A plan is built once per input port
+    type and cached, so validators only have to run the checks on each invocation. The cache is
+    copy-on-write, so plans can be read from any thread without locking.
+
+    Attributes:
+        type_hints (Dict[str, Any]): The resolved type hints of the input port.
+        required_fields (Tuple[str, ...]): The names of attributes that have no default value.
+        type_checkers (Tuple[Tuple[str, TypeChecker], ...]): The attribute name and compiled type
+        checker for each type hinted attribute, where `None` is accepted as "no value".
+        collection_sample_size (Optional[int]): The maximum number of elements checked per sequence,
+        or `None` if every element is checked.
+        nested_input_ports (Dict[str, Tuple[type, Optional[type]]]): The nested input port type of
+        each attribute hinted as one (optionally, or as a sequence of them), and the sequence type to
+        construct, or `None` for a single input port.
+    '''
+
+    __slots__ = ("type_hints", "required_fields", "type_checkers", "collection_sample_size", "nested_input_ports")
+
+    _Plans: Dict[Tuple[type, Optional[int]], 'ValidationPlan'] = {}
+
+    _PlansLock = threading.Lock()
+
+    def __init__(self, input_port_type: type, collection_sample_size: Optional[int] = None) -> None:
+        self.collection_sample_size = collection_sample_size
+        self.type_hints: Dict[str, Any] = get_type_hints(input_port_type)
+        self.required_fields: Tuple[str, ...] = tuple(_AttrName for _AttrName in self.type_hints
+                                                      if not _has_default(input_port_type, _AttrName))
+        self.type_checkers: Tuple[Tuple[str, TypeChecker], ...] = tuple(
+            (_AttrName, _compile_attribute_checker(_TypeHint, collection_sample_size))
+            for _AttrName, _TypeHint in self.type_hints.items())
+        self.nested_input_ports: Dict[str, Tuple[type, Optional[type]]] = {
+            _AttrName: _NestedInputPort for _AttrName, _NestedInputPort in (
+                (_AttrName, _find_nested_input_port(_TypeHint)) for _AttrName, _TypeHint in self.type_hints.items())
+            if _NestedInputPort is not None}
+
+    @classmethod
+    def for_input_port(cls, input_port_type: type, collection_sample_size: Optional[int] = None) -> 'ValidationPlan':
+        '''
+        Summary
+        -------
+        Gets the validation plan of an input port type, compiling and caching it on first use.
+
+        Parameters
+        ----------
+        `input_port_type` The InputPort subclass to get the validation plan for.\n
+        `collection_sample_size` An optional maximum number of elements to check for large sequences.
+
+        Returns
+        -------
+        The cached validation plan of the input port type.
+
+        '''
+        _PlanKey = (input_port_type, collection_sample_size)
+
+        try:
+            return cls._Plans[_PlanKey]
+        except KeyError:
+            pass
+
+        _Plan = cls(input_port_type, collection_sample_size)
+
+        with cls._PlansLock:
+            if _PlanKey not in cls._Plans:
+                ValidationPlan._Plans = {**cls._Plans, _PlanKey: _Plan}
+            return cls._Plans[_PlanKey]
+
+
+def compile_type_checker(type_hint: Any, collection_sample_size: Optional[int] = None) -> TypeChecker:
+    '''
+    Summary
+    -------
+    Compiles a type hint into a callable that recursively checks values against it. Supports plain
+    classes, `Any`, `Optional`, `Union`, `Literal`, `List`, `Set`, `Sequence` and other collections,
+    `Dict` and other mappings, fixed and variadic `Tuple`, `Type`, `Callable`, `Annotated`,
+    `AttributeChangeTracker` and nested input ports, in any combination. Checkers are cached per
+    type hint.
+
+    Collections of plain classes are checked in a single pass over the element types. Homogeneous
+    buffers (`array.array`, `bytes`, `bytearray`, `memoryview` and NumPy arrays) are checked by their
+    element type without iterating. NumPy arrays are accepted for abstract collection hints such as
+    `Sequence[float]`.
+
+    Parameters
+    ----------
+    `type_hint` The type hint to compile.\n
+    `collection_sample_size` An optional maximum number of elements to check for sequences that are
+    larger than it. Elements are sampled at an even stride. Defaults to checking every element.
+
+    Returns
+    -------
+    A callable that returns a `TypeMismatch` for an invalid value, otherwise `None`.
+
+    Example
+    -------
+    check = compile_type_checker(Dict[str, List[int]])\n
+    check({"a": [1, "2"]}).format_path("scores")  # Output: "scores['a'][1]"
+
+    '''
+    _CheckerKey = (type_hint, collection_sample_size)
+
+    try:
+        return _TypeCheckers[_CheckerKey]
+    except KeyError:
+        return _TypeCheckers.setdefault(_CheckerKey, _compile_type_checker(type_hint, collection_sample_size))
+    except TypeError:
+        return _compile_type_checker(type_hint, collection_sample_size)
+
+
+def compile_column_checker(type_hint: Any, collection_sample_size: Optional[int] = None) -> ColumnChecker:
+    '''
+    Summary
+    -------
+    Compiles a type hint into a callable that checks a whole column of attribute values at once,
+    such as a column of an `InputPortBatch`. `None` and `MISSING` values are accepted, as they are
+    for input port attributes. Checkers are cached per type hint.
+
+    Columns of a plain class are checked by their dtype or type code when they are homogeneous
+    buffers (NumPy arrays, `array.array` and `memoryview`), otherwise in a single pass over the
+    element types. Each value is only checked individually if that fails, to find the offending rows.
+
+    Parameters
+    ----------
+    `type_hint` The type hint of the attribute the column holds values for.\n
+    `collection_sample_size` An optional maximum number of elements to check within each value.
+    Every row of the column is always checked.
+
+    Returns
+    -------
+    A callable that returns the row index and `TypeMismatch` of each invalid value in a column.
+
+    Example
+    -------
+    check = compile_column_checker(int)\n
+    check(array.array("d", [1.5, 2.5]))  # Output: [(0, <TypeMismatch>), (1, <TypeMismatch>)]
+
+    '''
+    _CheckerKey = (type_hint, collection_sample_size)
+
+    try:
+        return _ColumnCheckers[_CheckerKey]
+    except KeyError:
+        return _ColumnCheckers.setdefault(_CheckerKey, _compile_column_checker(type_hint, collection_sample_size))
+    except TypeError:
+        return _compile_column_checker(type_hint, collection_sample_size)
+
+
+def find_missing_rows(column: Sequence[Any]) -> List[int]:
+    '''
+    Summary
+    -------
+    Finds the rows of a column that have no value. Homogeneous buffers cannot hold `MISSING`, so
+    they are not iterated.
+
+    Parameters
+    ----------
+    `column` The column of attribute values to search.
+
+    Returns
+    -------
+    The index of each row in the column whose value is `MISSING`.
+
+    '''
+    if _get_buffer_element_type(column) is not None:
+        return []
+    return [_Index for _Index, _Value in enumerate(column) if _Value is MISSING]
+
+
+def _describe(type_hint: Any) -> str:
+    if isinstance(type_hint, type):
+        return type_hint.__name__
+    return str(type_hint).replace("typing.", "")
+
+
+def _compile_type_checker(type_hint: Any, sample_size: Optional[int]) -> TypeChecker:
+    if type_hint is Any or type_hint is object or isinstance(type_hint, (str, typing.ForwardRef)):
+        return _accept_any
+
+    if type_hint is None or type_hint is _NoneType:
+        return _compile_class_checker(_NoneType)
+
+    if isinstance(type_hint, TypeVar):
+        if type_hint.__bound__ is not None:
+            return compile_type_checker(type_hint.__bound__, sample_size)
+        if type_hint.__constraints__:
+            return _compile_union_checker(type_hint, type_hint.__constraints__, sample_size)
+        return _accept_any
+
+    if hasattr(type_hint, "__metadata__"):
+        return compile_type_checker(type_hint.__origin__, sample_size)
+
+    _Origin = getattr(type_hint, "__origin__", None)
+    _Args = tuple(getattr(type_hint, "__args__", None) or ())
+
+    if _Origin is typing.Union or type(type_hint).__name__ == "UnionType":
+        return _compile_union_checker(type_hint, _Args, sample_size)
+
+    if _Literal is not None and _Origin is _Literal:
+        return _compile_literal_checker(type_hint, _Args)
+
+    if _Origin is typing.ClassVar or _Origin is getattr(typing, "Final", None):
+        return compile_type_checker(_Args[0], sample_size) if _Args else _accept_any
+
+    if _Origin is None:
+        if isinstance(type_hint, type):
+            return _compile_class_checker(type_hint, sample_size=sample_size)
+        return _accept_any
+
+    if not isinstance(_Origin, type):
+        return _accept_any
+
+    if _Origin is AttributeChangeTracker:
+        return _compile_tracker_checker(type_hint, _Args, sample_size)
+
+    if any(isinstance(_Arg, TypeVar) for _Arg in _Args) or _Origin is collections.abc.Callable:
+        return _compile_class_checker(_Origin, _describe(type_hint))
+
+    if _Origin is type:
+        return _compile_subclass_checker(type_hint, _Args)
+
+    if _Origin is tuple:
+        return _compile_tuple_checker(type_hint, _Args, sample_size)
+
+    if issubclass(_Origin, collections.abc.Mapping) and len(_Args) == 2:
+        return _compile_mapping_checker(type_hint, _Origin, _Args, sample_size)
+
+    if (issubclass(_Origin, collections.abc.Iterable)
+        and not issubclass(_Origin, (collections.abc.Iterator, str, bytes))
+        and len(_Args) == 1):
+        return _compile_collection_checker(type_hint, _Origin, _Args[0], sample_size)
+
+    return _compile_class_checker(_Origin, _describe(type_hint))
+
+
+def _compile_class_checker(
+        cls: type,
+        expected: Optional[str] = None,
+        sample_size: Optional[int] = None) -> TypeChecker:
+    _Expected = expected or _describe(cls)
+
+    if _is_nested_input_port(cls):
+        def check_input_port(value: Any) -> Optional[TypeMismatch]:
+            if not isinstance(value, cls):
+                return TypeMismatch(_Expected, value)
+
+            for _AttrName, _TypeChecker in ValidationPlan.for_input_port(cls, sample_size).type_checkers:
+                try:
+                    _AttrValue = getattr(value, _AttrName)
+                except AttributeError:
+                    continue
+
+                _Mismatch = _TypeChecker(_AttrValue)
+                if _Mismatch is not None:
+                    return _Mismatch.at(f".{_AttrName}")
+
+            return None
+
+        return check_input_port
+
+    def check_class(value: Any) -> Optional[TypeMismatch]:
+        if isinstance(value, cls):
+            return None
+        return TypeMismatch(_Expected, value)
+
+    return check_class
+
+
+def _compile_subclass_checker(type_hint: Any, args: Tuple[Any, ...]) -> TypeChecker:
+    _Expected = _describe(type_hint)
+    _BaseClass = args[0] if args and isinstance(args[0], type) else object
+
+    def check_subclass(value: Any) -> Optional[TypeMismatch]:
+        if isinstance(value, type) and issubclass(value, _BaseClass):
+            return None
+        return TypeMismatch(_Expected, value)
+
+    return check_subclass
+
+
+def _compile_union_checker(type_hint: Any, args: Tuple[Any, ...], sample_size: Optional[int]) -> TypeChecker:
+    _Expected = _describe(type_hint)
+    _Checkers = [compile_type_checker(_Arg, sample_size) for _Arg in args]
+
+    if _accept_any in _Checkers:
+        return _accept_any
+
+    if all(_is_plain_class(_Arg) for _Arg in args):
+        _Classes = tuple(args)
+
+        def check_union_of_classes(value: Any) -> Optional[TypeMismatch]:
+            if isinstance(value, _Classes):
+                return None
+            return TypeMismatch(_Expected, value)
+
+        return check_union_of_classes
+
+    def check_union(value: Any) -> Optional[TypeMismatch]:
+        for _Checker in _Checkers:
+            if _Checker(value) is None:
+                return None
+        return TypeMismatch(_Expected, value)
+
+    return check_union
+
+
+def _compile_literal_checker(type_hint: Any, args: Tuple[Any, ...]) -> TypeChecker:
+    _Expected = _describe(type_hint)
+    _Literals = [(type(_Arg), _Arg) for _Arg in args]
+
+    def check_literal(value: Any) -> Optional[TypeMismatch]:
+        for _LiteralType, _LiteralValue in _Literals:
+            if type(value) is _LiteralType and value == _LiteralValue:
+                return None
+        return TypeMismatch(_Expected, value)
+
+    return check_literal
+
+
+def _compile_tracker_checker(type_hint: Any, args: Tuple[Any, ...], sample_size: Optional[int]) -> TypeChecker:
+    _Expected = _describe(type_hint)
+    _ValueChecker = compile_type_checker(args[0], sample_size) if args else _accept_any
+
+    def check_tracker(value: Any) -> Optional[TypeMismatch]:
+        if type(value) is not AttributeChangeTracker:
+            return TypeMismatch(_Expected, value)
+        if value._value is None:
+            return None
+        return _ValueChecker(value._value)
+
+    return check_tracker
+
+
+def _compile_tuple_checker(type_hint: Any, args: Tuple[Any, ...], sample_size: Optional[int]) -> TypeChecker:
+    _Expected = _describe(type_hint)
+
+    if len(args) == 2 and args[1] is Ellipsis:
+        return _compile_collection_checker(type_hint, tuple, args[0], sample_size)
+
+    if args == ((),):
+        args = ()
+
+    _Checkers = [compile_type_checker(_Arg, sample_size) for _Arg in args]
+    _Length = len(_Checkers)
+
+    def check_tuple(value: Any) -> Optional[TypeMismatch]:
+        if not isinstance(value, tuple) or len(value) != _Length:
+            return TypeMismatch(_Expected, value)
+
+        for _Index, _Checker in enumerate(_Checkers):
+            _Mismatch = _Checker(value[_Index])
+            if _Mismatch is not None:
+                return _Mismatch.at(f"[{_Index}]")
+
+        return None
+
+    return check_tuple
+
+
+def _compile_collection_checker(
+        type_hint: Any,
+        origin: type,
+        item_hint: Any,
+        sample_size: Optional[int]) -> TypeChecker:
+    _Expected = _describe(type_hint)
+    _ItemChecker = compile_type_checker(item_hint, sample_size)
+    _AcceptsArrays = origin.__module__ == collections.abc.__name__
+
+    if _ItemChecker is _accept_any:
+        return _compile_class_checker(origin, _Expected)
+
+    _ItemClass = item_hint if _is_plain_class(item_hint) else None
+
+    def check_collection(value: Any) -> Optional[TypeMismatch]:
+        if not isinstance(value, origin) and not (_AcceptsArrays and _is_numpy_array(value)):
+            return TypeMismatch(_Expected, value)
+
+        if _ItemClass is not None:
+            _ElementType = _get_buffer_element_type(value)
+            if _ElementType is not None:
+                if issubclass(_ElementType, _ItemClass) or not len(value):
+                    return None
+                return TypeMismatch(_describe(_ItemClass), value[0]).at("[0]")
+
+        if iter(value) is value:
+            return None
+
+        _Items, _Stride = _sample_items(value, sample_size)
+
+        if _ItemClass is not None:
+            if all(issubclass(_ItemType, _ItemClass) for _ItemType in set(map(type, _Items))):
+                return None
+            for _Index, _Item in enumerate(_Items):
+                if not isinstance(_Item, _ItemClass):
+                    return TypeMismatch(_describe(_ItemClass), _Item).at(f"[{_Index * _Stride}]")
+            return None
+
+        for _Index, _Item in enumerate(_Items):
+            _Mismatch = _ItemChecker(_Item)
+            if _Mismatch is not None:
+                return _Mismatch.at(f"[{_Index * _Stride}]")
+
+        return None
+
+    return check_collection
+
+
+def _compile_mapping_checker(
+        type_hint: Any,
+        origin: type,
+        args: Tuple[Any, ...],
+        sample_size: Optional[int]) -> TypeChecker:
+    _Expected = _describe(type_hint)
+    _KeyChecker = compile_type_checker(args[0], sample_size)
+    _ValueChecker = compile_type_checker(args[1], sample_size)
+
+    if _KeyChecker is _accept_any and _ValueChecker is _accept_any:
+        return _compile_class_checker(origin, _Expected)
+
+    def check_mapping(value: Any) -> Optional[TypeMismatch]:
+        if not isinstance(value, origin):
+            return TypeMismatch(_Expected, value)
+
+        for _Key, _Value in value.items():
+            _Mismatch = _KeyChecker(_Key)
+            if _Mismatch is None:
+                _Mismatch = _ValueChecker(_Value)
+            if _Mismatch is not None:
+                return _Mismatch.at(f"[{_Key!r}]")
+
+        return None
+
+    return check_mapping
+
+
+def _compile_attribute_checker(type_hint: Any, sample_size: Optional[int]) -> TypeChecker:
+    _TypeChecker = compile_type_checker(type_hint, sample_size)
+
+    if _TypeChecker is _accept_any:
+        return _accept_any
+
+    def check_attribute(value: Any) -> Optional[TypeMismatch]:
+        if value is None:
+            return None
+        return _TypeChecker(value)
+
+    return check_attribute
+
+
+def _compile_column_checker(type_hint: Any, sample_size: Optional[int]) -> ColumnChecker:
+    _TypeChecker = compile_type_checker(type_hint, sample_size)
+
+    if _TypeChecker is _accept_any:
+        return _accept_any_column
+
+    _ItemClass = type_hint if _is_plain_class(type_hint) else None
+    _Expected = _describe(type_hint)
+
+    def check_column(column: Sequence[Any]) -> List[Tuple[int, TypeMismatch]]:
+        if _ItemClass is not None:
+            _ElementType = _get_buffer_element_type(column)
+            if _ElementType is not None:
+                if issubclass(_ElementType, _ItemClass):
+                    return []
+                return [(_Index, TypeMismatch(_Expected, _Value)) for _Index, _Value in enumerate(column)]
+
+            if all(issubclass(_ValueType, _ItemClass) or _ValueType is _NoneType or _ValueType is _Missing
+                   for _ValueType in set(map(type, column))):
+                return []
+
+        _Mismatches = []
+        for _Index, _Value in enumerate(column):
+            if _Value is None or _Value is MISSING:
+                continue
+            _Mismatch = _TypeChecker(_Value)
+            if _Mismatch is not None:
+                _Mismatches.append((_Index, _Mismatch))
+
+        return _Mismatches
+
+    return check_column
+
+
+def _accept_any_column(column: Sequence[Any]) -> List[Tuple[int, TypeMismatch]]:
+    return []
+
+
+def _sample_items(value: Any, sample_size: Optional[int]) -> Tuple[Any, int]:
+    '''
+    Summary
+    -------
+    Selects the elements of a collection to be checked. Sequences larger than the sample size are
+    sampled at an even stride, everything else is checked in full.
+
+    Returns
+    -------
+    The elements to check, and the stride used to map their position back to an index.
+
+    '''
+    if sample_size is None or not isinstance(value, collections.abc.Sequence) or len(value) <= sample_size:
+        return value, 1
+
+    _Stride = -(-len(value) // sample_size)
+    return value[::_Stride], _Stride
+
+
+def _get_buffer_element_type(value: Any) -> Optional[type]:
+    '''
+    Summary
+    -------
+    Gets the Python type of the elements of a homogeneous buffer from its type code or dtype,
+    without iterating over it.
+
+    Returns
+    -------
+    The element type of the buffer, or `None` if the value is not a homogeneous one-dimensional buffer.
+
+    '''
+    _ValueType = type(value)
+
+    if _ValueType is array.array:
+        return _BUFFER_FORMAT_TYPES.get(value.typecode)
+
+    if _ValueType is bytes or _ValueType is bytearray:
+        return int
+
+    if _ValueType is memoryview:
+        return _BUFFER_FORMAT_TYPES.get(value.format.lstrip("@=<>!")) if value.ndim == 1 else None
+
+    if _is_numpy_array(value) and value.ndim == 1:
+        return _NUMPY_KIND_TYPES.get(value.dtype.kind)
+
+    return None
+
+
+def _is_numpy_array(value: Any) -> bool:
+    _ValueType = type(value)
+    return _ValueType.__name__ == "ndarray" and _ValueType.__module__ == "numpy"
+
+
+def _has_default(input_port_type: type, attr_name: str) -> bool:
+    if attr_name in getattr(input_port_type, "_field_defaults", {}):
+        return True
+    return (hasattr(input_port_type, attr_name)
+            and not isinstance(getattr(input_port_type, attr_name), types.MemberDescriptorType))
+
+
+def _is_plain_class(type_hint: Any) -> bool:
+    return isinstance(type_hint, type) and not _is_nested_input_port(type_hint)
+
+
+def _find_nested_input_port(type_hint: Any) -> Optional[Tuple[type, Optional[type]]]:
+    if hasattr(type_hint, "__metadata__"):
+        return _find_nested_input_port(type_hint.__origin__)
+
+    if isinstance(type_hint, type):
+        return (type_hint, None) if _is_nested_input_port(type_hint) else None
+
+    _Origin = getattr(type_hint, "__origin__", None)
+    _Args = tuple(getattr(type_hint, "__args__", None) or ())
+
+    if _Origin is typing.Union or type(type_hint).__name__ == "UnionType":
+        _Args = tuple(_Arg for _Arg in _Args if _Arg is not _NoneType)
+        return _find_nested_input_port(_Args[0]) if len(_Args) == 1 else None
+
+    if (isinstance(_Origin, type) and issubclass(_Origin, collections.abc.Sequence)
+            and not issubclass(_Origin, (str, bytes))
+            and (len(_Args) == 1 or (_Origin is tuple and len(_Args) == 2 and _Args[1] is Ellipsis))
+            and isinstance(_Args[0], type) and _is_nested_input_port(_Args[0])):
+        return _Args[0], tuple if _Origin is tuple else list
+
+    return None
+
+
+def _is_nested_input_port(cls: type) -> bool:
+    from .pipeline import InputPort
+    return issubclass(cls, InputPort) and cls is not InputPort
@@ -0,0 +1,463 @@
+import asyncio
+import concurrent.futures
+import functools
+import itertools
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+from multiprocessing.connection import Connection
+from typing import (Any, Awaitable, Dict, List, Mapping, Optional, Set,
+                    Tuple, TypeVar)
+
+from .engine import PipelineFactory
+from .invokers import InvocationRecording
+from .outputs import IOutputPort
+from .pipeline import InputPort, PipeConfiguration
+from .services import IUseCaseInvoker
+
+__all__ = ["PreforkUseCaseInvoker", "SyncUseCaseInvoker"]
+
+T = TypeVar("T")
+
+_Logger = logging.getLogger(__name__)
+
+
+class _Worker:
+    '''
+    A forked worker process, and the invocations waiting on it. Messages to the worker are sent from
+    a dedicated thread, so that a full pipe cannot block the event loop that reads its responses.
+    '''
+
+    __slots__ = ("process", "connection", "pending", "sender")
+
+    def __init__(self, process: Any, connection: Connection) -> None:
+        self.process = process
+        self.connection = connection
+        self.pending: Dict[int, 'asyncio.Future[InvocationRecording]'] = {}
+        self.sender = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="clapy-prefork-sender")
+
+    def send_async(self, message: Any) -> 'asyncio.Future[None]':
+        return asyncio.get_running_loop().run_in_executor(self.sender, self.connection.send, message)
+
+
+def _log_cancellation_send_failure(future: 'asyncio.Future[None]') -> None:
+    if not future.cancelled() and future.exception() is not None:
+        _Logger.error("Could not send a cancellation to a prefork worker.", exc_info=future.exception())
+
+
+class PreforkUseCaseInvoker(IUseCaseInvoker):
+    '''
+    A use case invoker that spreads invocations across forked worker processes, to use every CPU
+    core from a single application. The parent process configures its services, use case registry
+    and pipeline plans once, and each worker inherits them copy-on-write when it is forked.
+
+    Input ports are sent to the least busy worker, which invokes the use case with the
+    `usecase_invoker` it inherited. The worker records the output port calls made by the pipeline,
+    and they are replayed to the caller's output port in the parent. Input ports, output port types
+    and the arguments of output port calls must therefore be picklable, and pipes must only call
+    the asynchronous methods of the output port. Pipeline configurations are matched by identity
+    to one of the `pipeline_configurations`, as they cannot be sent between processes. Cancelling
+    an invocation also cancels it in its worker process. If a worker process exits unexpectedly,
+    the invocations waiting on it raise a `RuntimeError` and it receives no further invocations.
+
+    Only supported on platforms that can fork processes.
+    '''
+
+    def __init__(
+            self,
+            usecase_invoker: IUseCaseInvoker,
+            pipeline_configurations: Mapping[str, List[PipeConfiguration]],
+            worker_count: Optional[int] = None,
+            pipeline_factory: Optional[PipelineFactory] = None):
+        if not usecase_invoker or pipeline_configurations is None:
+            raise ValueError(f"Constructor parameters cannot be 'None' for {PreforkUseCaseInvoker.__name__}.")
+        self._usecase_invoker = usecase_invoker
+        self._pipeline_configurations = dict(pipeline_configurations)
+        self._worker_count = worker_count or os.cpu_count() or 1
+        self._pipeline_factory = pipeline_factory
+        self._workers: List[_Worker] = []
+        self._request_ids = itertools.count()
+
+    def start(self) -> None:
+        '''
+        Summary
+        -------
+        Warms up the pipeline factory, if provided, then forks the worker processes. Call before
+        starting the event loop of the parent process, and after all services have been registered.
+
+        '''
+        if self._workers:
+            raise RuntimeError(f"The {PreforkUseCaseInvoker.__name__} has already been started.")
+
+        if self._pipeline_factory is not None:
+            self._pipeline_factory.warm_up(self._pipeline_configurations.values())
+
+        _Context = multiprocessing.get_context("fork")
+
+        for _ in range(self._worker_count):
+            _ParentConnection, _WorkerConnection = _Context.Pipe()
+            _Process = _Context.Process(target=self._run_worker, args=(_WorkerConnection,), daemon=True)
+            _Process.start()
+            _WorkerConnection.close()
+            self._workers.append(_Worker(_Process, _ParentConnection))
+
+    async def close_async(self) -> None:
+        '''Stops the worker processes once they have finished their invocations in progress.'''
+        _Loop = asyncio.get_running_loop()
+
+        for _Worker in self._workers:
+            await _Worker.send_async(None)
+
+        for _Worker in self._workers:
+            await _Loop.run_in_executor(None, _Worker.process.join)
+            _Loop.remove_reader(_Worker.connection.fileno())
+            _Worker.connection.close()
+            _Worker.sender.shutdown()
+
+        self._workers = []
+
+    async def invoke_usecase_async(
+            self,
+            input_port: InputPort,
+            output_port: IOutputPort,
+            pipeline_configuration: List[PipeConfiguration]) -> bool:
+        '''
+        Summary
+        -------
+        Performs the invocation of a use case in the least busy worker process, then replays the
+        outputs of the invocation to the output port.
+
+        Parameters
+        ----------
+        `input_port` The input port of the use case to be invoked\n
+        `output_port` The output port of the use case to be invoked\n
+        `pipeline_configuration` One of the pipeline configurations the invoker was constructed with.
+
+        Exceptions
+        ----------
+        Raises a `ValueError` if the pipeline configuration is not one the invoker was constructed with.\n
+        Raises the exception raised by the invocation in the worker process, if any.
+
+        Returns
+        -------
+        True if pipes exhausted and no pipe failures occurred.
+
+        '''
+        if not self._workers:
+            raise RuntimeError(f"The {PreforkUseCaseInvoker.__name__} has no running worker processes. "
+                               "It must be started before invoking use cases.")
+
+        _ConfigurationName = next((_Name for _Name, _Configuration in self._pipeline_configurations.items()
+                                   if _Configuration is pipeline_configuration), None)
+        if _ConfigurationName is None:
+            raise ValueError(f"The pipeline configuration was not provided to the {PreforkUseCaseInvoker.__name__}.")
+
+        _Loop = asyncio.get_running_loop()
+        _Worker = min(self._workers, key=lambda _Worker: len(_Worker.pending))
+        _RequestId = next(self._request_ids)
+        _Future: 'asyncio.Future[InvocationRecording]' = _Loop.create_future()
+
+        if not _Worker.pending:
+            _Loop.add_reader(_Worker.connection.fileno(), self._receive_response, _Worker)
+        _Worker.pending[_RequestId] = _Future
+
+        try:
+            await _Worker.send_async((_RequestId, input_port, type(output_port), _ConfigurationName))
+            _Recording = await _Future
+        except asyncio.CancelledError:
+            if self._forget_request(_Worker, _RequestId) and _Worker in self._workers:
+                _Worker.send_async((_RequestId, None, None, None)).add_done_callback(_log_cancellation_send_failure)
+            raise
+        except Exception:
+            self._forget_request(_Worker, _RequestId)
+            raise
+
+        return await _Recording.replay_async(output_port)
+
+    def _forget_request(self, worker: _Worker, request_id: int) -> bool:
+        _Future = worker.pending.pop(request_id, None)
+        if _Future is not None and not worker.pending:
+            asyncio.get_running_loop().remove_reader(worker.connection.fileno())
+        return _Future is not None
+
+    def _receive_response(self, worker: _Worker) -> None:
+        try:
+            _RequestId, _Recording, _Exception = worker.connection.recv()
+        except (EOFError, OSError):
+            self._remove_dead_worker(worker)
+            return
+
+        _Future = worker.pending.get(_RequestId)
+        if _Future is None:
+            return # The invocation was cancelled, and its response is no longer awaited.
+
+        self._forget_request(worker, _RequestId)
+        if _Future.cancelled():
+            return
+        if _Exception is not None:
+            _Future.set_exception(_Exception)
+        else:
+            _Future.set_result(_Recording)
+
+    def _remove_dead_worker(self, worker: _Worker) -> None:
+        asyncio.get_running_loop().remove_reader(worker.connection.fileno())
+        self._workers.remove(worker)
+        worker.connection.close()
+        worker.sender.shutdown(wait=False)
+
+        _Pending, worker.pending = worker.pending, {}
+        for _Future in _Pending.values():
+            _Future.set_exception(RuntimeError(
+                f"The worker process {worker.process.pid} of the {PreforkUseCaseInvoker.__name__} exited unexpectedly."))
+
+    def _run_worker(self, connection: Connection) -> None:
+        '''The entry point of a forked worker process.'''
+        for _Worker in self._workers:
+            _Worker.connection.close()
+
+        # The worker may have been forked from within a running event loop, which the forked thread
+        # still considers to be running. The worker's own loop is therefore run on a new thread.
+        _Thread = threading.Thread(target=self._run_worker_loop, args=(connection,), name="clapy-prefork-worker")
+        _Thread.start()
+        _Thread.join()
+
+    def _run_worker_loop(self, connection: Connection) -> None:
+        _Loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_Loop)
+
+        try:
+            _Loop.run_until_complete(self._serve_async(connection))
+        finally:
+            _Loop.close()
+            connection.close()
+
+    async def _serve_async(self, connection: Connection) -> None:
+        _Loop = asyncio.get_running_loop()
+        _IsClosing = _Loop.create_future()
+        _RunningTasks: Dict[int, 'asyncio.Task[None]'] = {}
+
+        def receive_request() -> None:
+            try:
+                _Request = connection.recv()
+            except (EOFError, OSError):
+                _Request = None # The parent process has exited.
+
+            if _Request is None:
+                _Loop.remove_reader(connection.fileno())
+                _IsClosing.set_result(None)
+                return
+
+            _RequestId, _InputPort = _Request[0], _Request[1]
+            if _InputPort is None:
+                _CancelledTask = _RunningTasks.get(_RequestId)
+                if _CancelledTask is not None:
+                    _CancelledTask.cancel()
+                return
+
+            _Task = _Loop.create_task(self._invoke_request_async(connection, *_Request))
+            _RunningTasks[_RequestId] = _Task
+            _Task.add_done_callback(functools.partial(end_request, _RequestId))
+
+        def end_request(request_id: int, task: 'asyncio.Task[None]') -> None:
+            del _RunningTasks[request_id]
+            if task.cancelled():
+                connection.send((request_id, None, None))
+
+        _Loop.add_reader(connection.fileno(), receive_request)
+        await _IsClosing
+
+        if _RunningTasks:
+            await asyncio.wait(list(_RunningTasks.values()))
+
+    async def _invoke_request_async(
+            self,
+            connection: Connection,
+            request_id: int,
+            input_port: InputPort,
+            output_port_type: type,
+            configuration_name: str) -> None:
+        _RecordingOutputPort, _Recording = InvocationRecording.record(object.__new__(output_port_type), forward=False)
+
+        try:
+            _Recording.result = await self._usecase_invoker.invoke_usecase_async(
+                input_port, _RecordingOutputPort, self._pipeline_configurations[configuration_name])
+            _Response: Tuple[int, Optional[InvocationRecording], Optional[BaseException]] = (request_id, _Recording, None)
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            _Response = (request_id, None, ex)
+
+        try:
+            connection.send(_Response)
+        except (pickle.PicklingError, TypeError, AttributeError) as ex:
+            connection.send((request_id, None, RuntimeError(f"Could not send the result of the invocation: {ex}")))
+
+
+class SyncUseCaseInvoker:
+    '''
+    A thread-safe, synchronous facade over a use case invoker, for applications that run on threads
+    rather than an event loop (such as WSGI applications). Invocations are sent to long-lived event
+    loops running on background threads, and the calling thread blocks until they finish, so pools
+    and other asynchronous resources created on a loop survive across invocations.
+
+    Context variables set by the calling thread, such as with `invocation_priority`, are copied to
+    the invocation. The output port is called from the thread of the loop running the invocation
+    while the calling thread waits. With more than one loop, invocations are spread across the
+    loops in turn, so the services they share must be thread-safe, and resources bound to a loop
+    cannot be shared between loops.
+
+    Example
+    -------
+    _SyncUseCaseInvoker = SyncUseCaseInvoker(_UseCaseInvoker)\n
+    _SyncUseCaseInvoker.start()\n
+    _SyncUseCaseInvoker.invoke_usecase(GreetInputPort(name="Ben"), _Presenter, PipelineConfiguration.DEFAULT.value)
+    '''
+
+    def __init__(self, usecase_invoker: IUseCaseInvoker, loop_count: int = 1):
+        if not usecase_invoker:
+            raise ValueError(f"Constructor parameters cannot be 'None' for {SyncUseCaseInvoker.__name__}.")
+        if loop_count < 1:
+            raise ValueError(f"The loop count of a {SyncUseCaseInvoker.__name__} must be at least 1.")
+        self._usecase_invoker = usecase_invoker
+        self._loop_count = loop_count
+        self._loops: List[asyncio.AbstractEventLoop] = []
+        self._threads: List[threading.Thread] = []
+        self._loop_indexes = itertools.count()
+        self._pending: Set['concurrent.futures.Future[Any]'] = set()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        '''
+        Summary
+        -------
+        Starts the event loops and their threads.
+
+        '''
+        with self._lock:
+            if self._loops:
+                raise RuntimeError(f"The {SyncUseCaseInvoker.__name__} has already been started.")
+
+            for _Index in range(self._loop_count):
+                _Loop = asyncio.new_event_loop()
+                _Thread = threading.Thread(target=self._run_loop, args=(_Loop,), name=f"clapy-loop-{_Index}", daemon=True)
+                _Thread.start()
+                self._loops.append(_Loop)
+                self._threads.append(_Thread)
+
+    def close(self) -> None:
+        '''
+        Summary
+        -------
+        Stops the event loops once they have finished their invocations in progress. Invocations
+        made once the invoker is closing raise a `RuntimeError`.
+
+        '''
+        with self._lock:
+            _Loops, self._loops = self._loops, []
+            _Threads, self._threads = self._threads, []
+            _Pending = list(self._pending)
+
+        concurrent.futures.wait(_Pending)
+
+        for _Loop in _Loops:
+            _Loop.call_soon_threadsafe(_Loop.stop)
+
+        for _Thread in _Threads:
+            _Thread.join()
+
+    def invoke_usecase(
+            self,
+            input_port: InputPort,
+            output_port: IOutputPort,
+            pipeline_configuration: List[PipeConfiguration],
+            timeout: Optional[float] = None) -> bool:
+        '''
+        Summary
+        -------
+        Performs the invocation of a use case on one of the event loops, blocking until it finishes.
+
+        Parameters
+        ----------
+        `input_port` The input port of the use case to be invoked\n
+        `output_port` The output port of the use case to be invoked\n
+        `pipeline_configuration` The configuration used to determine priority and inclusion of
+        use case pipes.\n
+        `timeout` An optional number of seconds to wait, after which the invocation is cancelled.
+
+        Exceptions
+        ----------
+        Raises a `concurrent.futures.TimeoutError` if the invocation did not finish within the timeout.\n
+        Raises the exception raised by the invocation, if any.
+
+        Returns
+        -------
+        True if pipes exhausted and no pipe failures occurred.
+
+        '''
+        return self.run(self._usecase_invoker.invoke_usecase_async(input_port, output_port, pipeline_configuration), timeout)
+
+    def run(self, awaitable: Awaitable[T], timeout: Optional[float] = None) -> T:
+        '''
+        Summary
+        -------
+        Runs an awaitable on one of the event loops, blocking until it finishes. Useful to create and
+        release the asynchronous resources used by services, such as connection pools.
+
+        Parameters
+        ----------
+        `awaitable` The awaitable to run.\n
+        `timeout` An optional number of seconds to wait, after which the awaitable is cancelled.
+
+        Exceptions
+        ----------
+        Raises a `RuntimeError` if the invoker is not started, or if called from one of its event loops.\n
+        Raises a `concurrent.futures.TimeoutError` if the awaitable did not finish within the timeout.\n
+        Raises the exception raised by the awaitable, if any.
+
+        Returns
+        -------
+        The result of the awaitable.
+
+        '''
+        with self._lock:
+            if not self._loops:
+                if asyncio.iscoroutine(awaitable):
+                    awaitable.close()
+                raise RuntimeError(f"The {SyncUseCaseInvoker.__name__} must be started before running awaitables.")
+            if threading.current_thread() in self._threads:
+                if asyncio.iscoroutine(awaitable):
+                    awaitable.close()
+                raise RuntimeError(f"The {SyncUseCaseInvoker.__name__} cannot be called from one of its event loops.")
+
+            _Loop = self._loops[next(self._loop_indexes) % len(self._loops)]
+            _Future = asyncio.run_coroutine_threadsafe(self._await_async(awaitable), _Loop)
+            self._pending.add(_Future)
+
+        _Future.add_done_callback(self._forget_pending)
+
+        try:
+            return _Future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            _Future.cancel()
+            raise
+
+    def _forget_pending(self, future: 'concurrent.futures.Future[Any]') -> None:
+        with self._lock:
+            self._pending.discard(future)
+
+    @staticmethod
+    async def _await_async(awaitable: Awaitable[T]) -> T:
+        return await awaitable
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        '''The entry point of an event loop thread.'''
+        asyncio.set_event_loop(loop)
+
+        try:
+            loop.run_forever()
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
@@ -0,0 +1,45 @@
+from typing import List
+
+from src.clapy.metrics import IMetricsRecorder
+from src.clapy.services import IPipelineFactory, IServiceProvider
+
+
+class ConstructingServiceProvider(IServiceProvider):
+
+    def __init__(self):
+        self.resolved_types: List[type] = []
+
+    def get_service(self, service: type) -> object:
+        self.resolved_types.append(service)
+        return service()
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RecordingMetricsRecorder(IMetricsRecorder):
+
+    def __init__(self):
+        self.events: List[tuple] = []
+        self.measurements: List[tuple] = []
+
+    def increment(self, name, tags) -> None:
+        self.events.append((name, dict(tags)))
+
+    def observe(self, name, value, tags) -> None:
+        self.measurements.append((name, dict(tags)))
+
+
+class PipesPipelineFactory(IPipelineFactory):
+
+    def __init__(self, pipes: list):
+        self.pipes = pipes
+
+    async def create_pipeline_async(self, input_port, pipeline_configuration):
+        return list(self.pipes)
@@ -0,0 +1,287 @@
+import array
+import asyncio
+from typing import List
+
+import pytest
+
+from sample.use_cases.greet.greet_input_port import GreetInputPort
+from sample.use_cases.greet.greet_interactor import GreetInteractor
+from sample.use_cases.greet.igreet_output_port import IGreetOutputPort
+from src.clapy.batching import BatchedInvocation, BatchPipe, InputPortBatch
+from src.clapy.engine import Engine, PipelineFactory, UseCaseInvoker
+from src.clapy.outputs import IOutputPort, IValidationOutputPort, ValidationResult
+from src.clapy.pipeline import (EntityExistenceChecker, InputPort,
+                                InputTypeValidator, Interactor,
+                                PipeConfiguration, PipeConfigurationOption,
+                                RequiredInputValidator)
+from src.clapy.services import IPipelineFactory
+from tests.unit.fakes import ConstructingServiceProvider
+
+
+class ImportInputPort(InputPort):
+    name: str
+    score: float
+
+
+class ImportPresenter(IOutputPort, IValidationOutputPort):
+
+    def __init__(self):
+        self.validation_failures: List[ValidationResult] = []
+        self.imported_names: List[str] = []
+
+    async def present_validation_failure_async(self, validation_failure: ValidationResult) -> None:
+        self.validation_failures.append(validation_failure)
+
+
+class ImportInteractor(Interactor):
+
+    async def execute_async(self, input_port: ImportInputPort, output_port: ImportPresenter) -> None:
+        output_port.imported_names.append(input_port.name)
+
+
+class BatchPipelineFactory(IPipelineFactory):
+
+    def __init__(self):
+        self.created_pipeline_count = 0
+
+    async def create_pipeline_async(self, input_port, pipeline_configuration):
+        self.created_pipeline_count += 1
+        return [RequiredInputValidator(), InputTypeValidator(), ImportInteractor()]
+
+
+class ImportExistenceChecker(EntityExistenceChecker, BatchPipe):
+
+    batch_window = 0.01
+    max_batch_size = 3
+    batch_sizes: List[int] = []
+    exception: Exception = None
+
+    async def execute_async(self, input_port: ImportInputPort, output_port: ImportPresenter) -> None:
+        await super().execute_async(input_port, output_port)
+
+    async def execute_batch_async(self, invocations: List[BatchedInvocation]) -> None:
+        type(self).batch_sizes.append(len(invocations))
+        if self.exception:
+            raise self.exception
+        for _Invocation in invocations:
+            _Invocation.pipe.has_failures = _Invocation.input_port.name == "Missing"
+
+
+_PipelineConfiguration = [
+    PipeConfiguration(RequiredInputValidator, PipeConfigurationOption.INSERT),
+    PipeConfiguration(InputTypeValidator, PipeConfigurationOption.INSERT),
+    PipeConfiguration(Interactor)]
+
+
+# ---------------- InputPortBatch tests ----------------
+
+def test__InputPortBatch__ColumnsOfDifferentLengths__RaisesValueError():
+    # Act and Assert
+    with pytest.raises(ValueError):
+        InputPortBatch(ImportInputPort, {"name": ["Ben"], "score": [1.0, 2.0]})
+
+
+def test__get_row__RowHasMissingValue__MaterialisesInputPortWithoutValue():
+    # Arrange
+    _Batch = InputPortBatch(ImportInputPort, {
+        "name": ["Ben", InputPortBatch.MISSING],
+        "score": array.array("d", [1.5, 2.5])})
+
+    # Act
+    _Row = _Batch.get_row(1)
+
+    # Assert
+    assert isinstance(_Row, ImportInputPort)
+    assert not hasattr(_Row, "name")
+    assert _Row.score == 2.5
+
+
+def test__get_row__NumpyColumn__ConvertsValuesToPythonTypes():
+    # Arrange
+    numpy = pytest.importorskip("numpy")
+    _Batch = InputPortBatch(ImportInputPort, {"score": numpy.array([1.5, 2.5])})
+
+    # Act
+    _Row = _Batch.get_row(0)
+
+    # Assert
+    assert type(_Row.score) is float
+
+
+def test__iter_rows__IndicesProvided__MaterialisesOnlyRequestedRows():
+    # Arrange
+    _Batch = InputPortBatch(ImportInputPort, {"name": ["Ben", "Bob", "Bud"]})
+
+    # Act
+    _Names = [_Row.name for _Row in _Batch.iter_rows([0, 2])]
+
+    # Assert
+    assert _Names == ["Ben", "Bud"]
+
+# end InputPortBatch tests
+
+
+# ---------------- invoke_batch_async tests ----------------
+
+@pytest.mark.asyncio
+async def test__invoke_batch_async__SomeRowsInvalid__OnlyExecutesValidRows():
+    # Arrange
+    _Batch = InputPortBatch(ImportInputPort, {
+        "name": ["Ben", InputPortBatch.MISSING, "Bud", 4],
+        "score": [1.0, 2.0, "3", 4.0]})
+    _PipelineFactory = BatchPipelineFactory()
+    _Presenter = ImportPresenter()
+
+    # Act
+    _Results = await UseCaseInvoker(_PipelineFactory).invoke_batch_async(_Batch, _Presenter, _PipelineConfiguration)
+
+    # Assert
+    assert _Results == [True, False, False, False]
+    assert _Presenter.imported_names == ["Ben"]
+    assert [_Failure.errors for _Failure in _Presenter.validation_failures] == [
+        {"name": ["'name' must have a value."]},
+        {"score": ["'score' must be of type 'float'."]},
+        {"name": ["'name' must be of type 'str'."]}]
+    assert _PipelineFactory.created_pipeline_count == 2
+
+
+@pytest.mark.asyncio
+async def test__invoke_batch_async__EmptyBatch__ReturnsNoResults():
+    # Arrange
+    _Batch = InputPortBatch(ImportInputPort, {"name": [], "score": []})
+
+    # Act
+    _Results = await UseCaseInvoker(BatchPipelineFactory()).invoke_batch_async(
+        _Batch, ImportPresenter(), _PipelineConfiguration)
+
+    # Assert
+    assert _Results == []
+
+
+class RejectingExistenceChecker(EntityExistenceChecker):
+
+    async def execute_async(self, input_port: ImportInputPort, output_port: ImportPresenter) -> None:
+        self.has_failures = input_port.name == "Missing"
+
+
+class ReorderingPipelineFactory(IPipelineFactory):
+
+    def __init__(self):
+        self.created_pipeline_count = 0
+
+    async def create_pipeline_async(self, input_port, pipeline_configuration):
+        self.created_pipeline_count += 1
+        if self.created_pipeline_count == 1:
+            return [RequiredInputValidator(), RejectingExistenceChecker(), ImportInteractor()]
+        return [RejectingExistenceChecker(), RequiredInputValidator(), ImportInteractor()]
+
+
+@pytest.mark.asyncio
+async def test__invoke_batch_async__RowPipelinesReordered__SkipsOnlyBatchValidatedPipes():
+    # Arrange
+    _Batch = InputPortBatch(ImportInputPort, {"name": ["Ben", "Missing"], "score": [1.0, 2.0]})
+    _Presenter = ImportPresenter()
+
+    # Act
+    _Results = await UseCaseInvoker(ReorderingPipelineFactory()).invoke_batch_async(_Batch, _Presenter, [
+        PipeConfiguration(RequiredInputValidator, PipeConfigurationOption.INSERT, is_order_independent=True),
+        PipeConfiguration(EntityExistenceChecker, is_order_independent=True),
+        PipeConfiguration(Interactor)])
+
+    # Assert
+    assert _Results == [True, False]
+    assert _Presenter.imported_names == ["Ben"]
+
+
+class GreetPresenter(IGreetOutputPort):
+
+    def __init__(self):
+        self.greetings: List[str] = []
+
+    async def present_greeting_async(self, greeting: str) -> None:
+        self.greetings.append(greeting)
+
+    async def present_missing_names_warning_async(self) -> bool:
+        return True
+
+    async def present_validation_failure_async(self, validation_failure: ValidationResult) -> None:
+        pass
+
+
+@pytest.mark.asyncio
+async def test__invoke_batch_async__PipesValidatedBatch__DoesNotResolveThemForEachRow():
+    # Arrange
+    _ServiceProvider = ConstructingServiceProvider()
+    _PipelineFactory = PipelineFactory(_ServiceProvider, Engine.construct_usecase_registry(["sample/use_cases"]))
+    _Batch = InputPortBatch(GreetInputPort, {"name": ["Ben Bud", "Bud Ben"]})
+    _Presenter = GreetPresenter()
+
+    # Act
+    _Results = await UseCaseInvoker(_PipelineFactory).invoke_batch_async(_Batch, _Presenter, [
+        PipeConfiguration(RequiredInputValidator, PipeConfigurationOption.INSERT),
+        PipeConfiguration(InputTypeValidator, PipeConfigurationOption.INSERT),
+        PipeConfiguration(Interactor)])
+
+    # Assert
+    assert _Results == [True, True]
+    assert _Presenter.greetings == ["Hello Ben Bud!", "Hello Bud Ben!"]
+    assert _ServiceProvider.resolved_types == [
+        RequiredInputValidator, InputTypeValidator, GreetInteractor, GreetInteractor, GreetInteractor]
+
+# end invoke_batch_async tests
+
+
+# ---------------- BatchPipe tests ----------------
+
+@pytest.mark.asyncio
+async def test__BatchPipe__ConcurrentInvocations__ExecutesOneBatchPerWindowOrMaxSize():
+    # Arrange
+    class WindowedExistenceChecker(ImportExistenceChecker):
+        batch_sizes: List[int] = []
+
+    _Pipes = [WindowedExistenceChecker() for _ in range(5)]
+    _Names = ["Ben", "Missing", "Bob", "Bud", "Missing"]
+
+    # Act
+    await asyncio.gather(*(_Pipe.execute_async(ImportInputPort(name=_Name), ImportPresenter())
+                           for _Pipe, _Name in zip(_Pipes, _Names)))
+
+    # Assert
+    assert WindowedExistenceChecker.batch_sizes == [3, 2]
+    assert [_Pipe.has_failures for _Pipe in _Pipes] == [False, True, False, False, True]
+
+
+@pytest.mark.asyncio
+async def test__BatchPipe__BatchRaises__RaisesToEveryInvocation():
+    # Arrange
+    class FailingExistenceChecker(ImportExistenceChecker):
+        batch_sizes: List[int] = []
+        exception = ConnectionError("Database unavailable.")
+
+    # Act
+    _Results = await asyncio.gather(*(FailingExistenceChecker().execute_async(ImportInputPort(name="Ben"), ImportPresenter())
+                                      for _ in range(2)), return_exceptions=True)
+
+    # Assert
+    assert FailingExistenceChecker.batch_sizes == [2]
+    assert all(isinstance(_Result, ConnectionError) for _Result in _Results)
+
+
+@pytest.mark.asyncio
+async def test__BatchPipe__InvocationCancelledBeforeFlush__ExcludedFromBatch():
+    # Arrange
+    class CancellingExistenceChecker(ImportExistenceChecker):
+        batch_sizes: List[int] = []
+
+    _CancelledTask = asyncio.ensure_future(CancellingExistenceChecker().execute_async(ImportInputPort(name="Ben"), ImportPresenter()))
+    _Task = asyncio.ensure_future(CancellingExistenceChecker().execute_async(ImportInputPort(name="Bob"), ImportPresenter()))
+    await asyncio.sleep(0)
+
+    # Act
+    _CancelledTask.cancel()
+    await _Task
+
+    # Assert
+    assert CancellingExistenceChecker.batch_sizes == [1]
+
+# end BatchPipe tests
@@ -0,0 +1,151 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from src.clapy.context import InvocationContext, invocation_properties
+from src.clapy.engine import UseCaseInvoker
+from src.clapy.outputs import IOutputPort
+from src.clapy.pipeline import (EntityExistenceChecker, InputPort, Interactor,
+                                PipeConfiguration)
+from tests.unit.fakes import PipesPipelineFactory
+
+
+class LookupInputPort(InputPort):
+    name: str
+
+
+class LookupRepository:
+
+    def __init__(self):
+        self.load_count = 0
+
+    async def get_async(self, name: str) -> str:
+        self.load_count += 1
+        await asyncio.sleep(0)
+        return name.upper()
+
+
+class LookupExistenceChecker(EntityExistenceChecker):
+
+    def __init__(self, repository: LookupRepository):
+        self.repository = repository
+
+    async def execute_async(self, input_port: LookupInputPort, output_port: IOutputPort) -> None:
+        await InvocationContext.current().memo_async(
+            ("entity", input_port.name), lambda: self.repository.get_async(input_port.name))
+
+
+class LookupInteractor(Interactor):
+
+    def __init__(self, repository: LookupRepository):
+        self.repository = repository
+        self.entities: List[str] = []
+
+    async def execute_async(self, input_port: LookupInputPort, output_port: IOutputPort) -> None:
+        self.entities.append(await InvocationContext.current().memo_async(
+            ("entity", input_port.name), lambda: self.repository.get_async(input_port.name)))
+
+
+_PipelineConfiguration = [PipeConfiguration(EntityExistenceChecker), PipeConfiguration(Interactor)]
+
+
+# ---------------- InvocationContext tests ----------------
+
+@pytest.mark.asyncio
+async def test__memo_async__ConcurrentCallersForKey__CreatesValueOnce():
+    # Arrange
+    _Repository = LookupRepository()
+
+    # Act
+    async with InvocationContext(LookupInputPort(name="Ben")) as _Context:
+        _Entities = await asyncio.gather(*[_Context.memo_async("entity", lambda: _Repository.get_async("Ben"))
+                                           for _ in range(3)])
+
+    # Assert
+    assert _Entities == ["BEN", "BEN", "BEN"]
+    assert _Repository.load_count == 1
+
+
+@pytest.mark.asyncio
+async def test__memo_async__FactoryRaisesException__DoesNotMemoiseFailure():
+    # Arrange
+    _Repository = LookupRepository()
+
+    async def fail_async() -> str:
+        raise ConnectionError("Database unavailable.")
+
+    # Act
+    async with InvocationContext(LookupInputPort(name="Ben")) as _Context:
+        with pytest.raises(ConnectionError):
+            await _Context.memo_async("entity", fail_async)
+        _Entity = await _Context.memo_async("entity", lambda: _Repository.get_async("Ben"))
+
+    # Assert
+    assert _Entity == "BEN"
+
+
+@pytest.mark.asyncio
+async def test__close_async__CleanupCallbackRaisesException__CallsEveryCallbackInReverseOrderThenRaises():
+    # Arrange
+    _Events: List[str] = []
+    _Context = InvocationContext(LookupInputPort(name="Ben"))
+
+    async def release_async(name: str) -> None:
+        _Events.append(name)
+        if name == "connection":
+            raise ConnectionError("Connection already closed.")
+
+    _Context.add_cleanup(lambda: release_async("lock"))
+    _Context.add_cleanup(lambda: release_async("connection"))
+
+    # Act and Assert
+    with pytest.raises(ConnectionError):
+        await _Context.close_async()
+
+    assert _Events == ["connection", "lock"]
+
+
+def test__current__OutsideInvocation__RaisesLookupError():
+    # Act and Assert
+    with pytest.raises(LookupError):
+        InvocationContext.current()
+
+# end InvocationContext tests
+
+
+# ---------------- UseCaseInvoker invocation context tests ----------------
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__PipesMemoiseEntity__LoadsEntityOncePerInvocation():
+    # Arrange
+    _Repository = LookupRepository()
+    _Interactor = LookupInteractor(_Repository)
+    _Invoker = UseCaseInvoker(PipesPipelineFactory([LookupExistenceChecker(_Repository), _Interactor]))
+
+    # Act
+    for _ in range(2):
+        await _Invoker.invoke_usecase_async(LookupInputPort(name="Ben"), IOutputPort(), _PipelineConfiguration)
+
+    # Assert
+    assert _Interactor.entities == ["BEN", "BEN"]
+    assert _Repository.load_count == 2
+    with pytest.raises(LookupError):
+        InvocationContext.current()
+
+# end UseCaseInvoker invocation context tests
+
+
+# ---------------- invocation_properties tests ----------------
+
+def test__invocation_properties__Nested__MergesEnclosingProperties():
+    # Act
+    with invocation_properties(is_internal=True, tenant="sales"):
+        with invocation_properties(tenant="support"):
+            _Properties = InvocationContext(LookupInputPort(name="Ben")).properties
+
+    # Assert
+    assert _Properties == {"is_internal": True, "tenant": "support"}
+    assert InvocationContext(LookupInputPort(name="Ben")).properties == {}
+
+# end invocation_properties tests
@@ -1,4 +1,8 @@
+import concurrent.futures
+import time
+
 import pytest
+from dependency_injector import providers
 
 from src.clapy.dependency_injection import DependencyInjectorServiceProvider
 
@@ -40,4 +44,24 @@ def test__get_service__ServiceDoesNotExist__RaisesLookupError(mocker, mock_servi
 
 # ---------------- register_service tests ----------------
 
+def test__register_service__ThreadSafeSingleton__ConstructsSingletonOnceAcrossThreads():
+    # Arrange
+    class SlowService:
+        construction_count = 0
+
+        def __init__(self):
+            time.sleep(0.01)
+            SlowService.construction_count += 1
+
+    service_provider = DependencyInjectorServiceProvider(thread_safe=True)
+    service_provider.register_service(providers.Singleton, SlowService)
+
+    # Act
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(lambda _: service_provider.get_service(SlowService), range(8)))
+
+    # Assert
+    assert SlowService.construction_count == 1
+    assert all(result is results[0] for result in results)
+
 # end register_service tests
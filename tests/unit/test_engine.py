@@ -1,3 +1,429 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import List
+
+import pytest
+
+from sample.pipeline.name_checker import NameChecker
+from sample.use_cases.greet.greet_input_port import GreetInputPort
+from sample.use_cases.greet.greet_interactor import GreetInteractor
+from sample.use_cases.greet.greet_name_checker import GreetNameChecker
+from src.clapy.context import InvocationContext, invocation_properties
+from src.clapy.engine import Engine, PipelineFactory, UseCaseInvoker
+from src.clapy.exceptions import PipeConfigurationError
+from src.clapy.metrics import LatencyWindow, PipeStatistics
+from src.clapy.outputs import IOutputPort
+from src.clapy.pipeline import (EntityExistenceChecker, InputPort, Interactor,
+                                PipeConfiguration, PipeConfigurationOption,
+                                RequiredInputValidator)
+from src.clapy.services import IPipelineFactory
+from src.clapy.validation import ValidationPlan
+from tests.unit.fakes import (ConstructingServiceProvider, PipesPipelineFactory,
+                              RecordingMetricsRecorder)
+
+
+class LookupInputPort(InputPort):
+    name: str
+
+
+class LookupPresenter(IOutputPort):
+
+    def __init__(self):
+        self.found_names: List[str] = []
+
+    async def present_found_async(self, name: str) -> None:
+        self.found_names.append(name)
+
+
+class LookupExistenceChecker(EntityExistenceChecker):
+
+    is_idempotent = True
+    delays: List[float] = []
+    attempt_count = 0
+
+    async def execute_async(self, input_port: LookupInputPort, output_port: LookupPresenter) -> None:
+        type(self).attempt_count += 1
+        _Delay = self.delays.pop(0) if self.delays else 0
+        await asyncio.sleep(_Delay)
+        self.has_failures = _Delay > 0
+        await output_port.present_found_async(input_port.name)
+
+
+class LookupPipelineFactory(IPipelineFactory):
+
+    def __init__(self, pipe_type: type):
+        self.pipe_type = pipe_type
+
+    async def create_pipeline_async(self, input_port, pipeline_configuration):
+        return [self.pipe_type()]
+
+
+_PipelineConfiguration = [
+    PipeConfiguration(EntityExistenceChecker, hedge_percentile=95),
+    PipeConfiguration(Interactor)]
+
+
+# ---------------- UseCaseInvoker hedging tests ----------------
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__HedgedPipeSlow__KeepsOutputsOfFirstAttemptToFinish():
+    # Arrange
+    class SlowExistenceChecker(LookupExistenceChecker):
+        delays: List[float] = []
+        attempt_count = 0
+
+    _Invoker = UseCaseInvoker(LookupPipelineFactory(SlowExistenceChecker))
+    for _ in range(20):
+        await _Invoker.invoke_usecase_async(LookupInputPort(name="Ben"), LookupPresenter(), _PipelineConfiguration)
+    SlowExistenceChecker.attempt_count = 0
+    SlowExistenceChecker.delays = [5.0]
+    _Presenter = LookupPresenter()
+
+    # Act
+    _Result = await asyncio.wait_for(
+        _Invoker.invoke_usecase_async(LookupInputPort(name="Bob"), _Presenter, _PipelineConfiguration), timeout=1)
+
+    # Assert
+    assert _Result
+    assert SlowExistenceChecker.attempt_count == 2
+    assert _Presenter.found_names == ["Bob"]
+
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__HedgeFinishesFirst__RecordsLatencyFromStartOfFirstAttempt():
+    # Arrange
+    class SlowExistenceChecker(LookupExistenceChecker):
+        delays: List[float] = []
+        attempt_count = 0
+
+    _Invoker = UseCaseInvoker(LookupPipelineFactory(SlowExistenceChecker))
+    _Latencies = _Invoker._pipe_latencies[SlowExistenceChecker] = LatencyWindow(min_samples=1)
+    _Latencies.add(0.05)
+    SlowExistenceChecker.delays = [5.0]
+
+    # Act
+    await asyncio.wait_for(
+        _Invoker.invoke_usecase_async(LookupInputPort(name="Bob"), LookupPresenter(), _PipelineConfiguration), timeout=1)
+
+    # Assert
+    assert SlowExistenceChecker.attempt_count == 2
+    assert len(_Latencies) == 2
+    assert _Latencies.percentile(0) >= 0.05
+
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__HedgedPipeNotIdempotent__RaisesPipeConfigurationError():
+    # Arrange
+    class NonIdempotentExistenceChecker(LookupExistenceChecker):
+        is_idempotent = False
+
+    _Invoker = UseCaseInvoker(LookupPipelineFactory(NonIdempotentExistenceChecker))
+
+    # Act and Assert
+    with pytest.raises(PipeConfigurationError):
+        await _Invoker.invoke_usecase_async(LookupInputPort(name="Ben"), LookupPresenter(), _PipelineConfiguration)
+
+
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__FirstAttemptFinishesCancelled__KeepsOutputsOfHedge():
+    # Arrange
+    class CancelledExistenceChecker(LookupExistenceChecker):
+        attempt_count = 0
+
+        async def execute_async(self, input_port: LookupInputPort, output_port: LookupPresenter) -> None:
+            type(self).attempt_count += 1
+            if self.attempt_count == 1:
+                await asyncio.sleep(0.1)
+                raise asyncio.CancelledError()
+            await asyncio.sleep(0.2)
+            await output_port.present_found_async(input_port.name)
+
+    _Invoker = UseCaseInvoker(LookupPipelineFactory(CancelledExistenceChecker))
+    _Invoker._pipe_latencies[CancelledExistenceChecker] = LatencyWindow(min_samples=1)
+    _Invoker._pipe_latencies[CancelledExistenceChecker].add(0.05)
+    _Presenter = LookupPresenter()
+
+    # Act
+    _Result = await asyncio.wait_for(
+        _Invoker.invoke_usecase_async(LookupInputPort(name="Bob"), _Presenter, _PipelineConfiguration), timeout=1)
+
+    # Assert
+    assert _Result
+    assert CancelledExistenceChecker.attempt_count == 2
+    assert _Presenter.found_names == ["Bob"]
+
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__HedgeFinishesFirst__AwaitsCancelledFirstAttempt():
+    # Arrange
+    class SlowExistenceChecker(LookupExistenceChecker):
+        delays: List[float] = []
+        attempt_count = 0
+        cancelled_count = 0
+
+        async def execute_async(self, input_port: LookupInputPort, output_port: LookupPresenter) -> None:
+            try:
+                await super().execute_async(input_port, output_port)
+            except asyncio.CancelledError:
+                await asyncio.sleep(0.05)
+                type(self).cancelled_count += 1
+                raise
+
+    _Invoker = UseCaseInvoker(LookupPipelineFactory(SlowExistenceChecker))
+    _Invoker._pipe_latencies[SlowExistenceChecker] = LatencyWindow(min_samples=1)
+    _Invoker._pipe_latencies[SlowExistenceChecker].add(0.05)
+    SlowExistenceChecker.delays = [5.0]
+
+    # Act
+    await asyncio.wait_for(
+        _Invoker.invoke_usecase_async(LookupInputPort(name="Bob"), LookupPresenter(), _PipelineConfiguration), timeout=1)
+
+    # Assert
+    assert SlowExistenceChecker.cancelled_count == 1
+
+# end UseCaseInvoker hedging tests
+
+
+# ---------------- UseCaseInvoker cancellation tests ----------------
+
+class ScopedExistenceChecker(EntityExistenceChecker):
+
+    def __init__(self):
+        self.events: List[str] = []
+
+    async def execute_async(self, input_port: LookupInputPort, output_port: LookupPresenter) -> None:
+        self.events.append("executed")
+        await asyncio.sleep(10)
+
+    async def cleanup_async(self, input_port: LookupInputPort, output_port: LookupPresenter) -> None:
+        self.events.append("cleaned up")
+
+
+class RecordingInteractor(Interactor):
+
+    def __init__(self):
+        self.is_executed = False
+
+    async def execute_async(self, input_port: LookupInputPort, output_port: LookupPresenter) -> None:
+        self.is_executed = True
+
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__InvocationCancelled__CleansUpAndSkipsLaterPipesAndReportsOutcome():
+    # Arrange
+    _ExistenceChecker = ScopedExistenceChecker()
+    _Interactor = RecordingInteractor()
+    _MetricsRecorder = RecordingMetricsRecorder()
+    _Invoker = UseCaseInvoker(PipesPipelineFactory([_ExistenceChecker, _Interactor]), metrics_recorder=_MetricsRecorder)
+    _Task = asyncio.ensure_future(_Invoker.invoke_usecase_async(
+        LookupInputPort(name="Ben"), LookupPresenter(), [PipeConfiguration(EntityExistenceChecker), PipeConfiguration(Interactor)]))
+    await asyncio.sleep(0)
+
+    # Act
+    _Task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await _Task
+
+    # Assert
+    assert _ExistenceChecker.events == ["executed", "cleaned up"]
+    assert not _Interactor.is_executed
+    assert _MetricsRecorder.events == [("clapy.invocation", {"usecase": LookupInputPort.__module__, "outcome": "cancelled"})]
+    assert [_Name for _Name, _ in _MetricsRecorder.measurements] == ["clapy.invocation_duration"]
+
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__InvocationCompletes__ReportsSuccessOutcome():
+    # Arrange
+    _MetricsRecorder = RecordingMetricsRecorder()
+    _Invoker = UseCaseInvoker(PipesPipelineFactory([RecordingInteractor()]), metrics_recorder=_MetricsRecorder)
+
+    # Act
+    await _Invoker.invoke_usecase_async(LookupInputPort(name="Ben"), LookupPresenter(), [PipeConfiguration(Interactor)])
+
+    # Assert
+    assert [_Tags["outcome"] for _, _Tags in _MetricsRecorder.events] == ["success"]
+
+# end UseCaseInvoker cancellation tests
+
+
+# ---------------- PipelineFactory tests ----------------
+
+@pytest.mark.asyncio
+async def test__create_pipeline_async__WarmedUp__ResolvesPlannedPipesInOrder():
+    # Arrange
+    _PipelineConfiguration = [
+        PipeConfiguration(RequiredInputValidator, PipeConfigurationOption.INSERT),
+        PipeConfiguration(NameChecker),
+        PipeConfiguration(Interactor)]
+    _ServiceProvider = ConstructingServiceProvider()
+    _PipelineFactory = PipelineFactory(_ServiceProvider, Engine.construct_usecase_registry(["sample/use_cases"]))
+
+    # Act
+    _PipelineFactory.warm_up([_PipelineConfiguration])
+    _Pipeline = await _PipelineFactory.create_pipeline_async(GreetInputPort(), _PipelineConfiguration)
+
+    # Assert
+    assert [type(_Pipe).__name__ for _Pipe in _Pipeline] == ["RequiredInputValidator", "GreetNameChecker", "GreetInteractor"]
+    assert _ServiceProvider.resolved_types == [type(_Pipe) for _Pipe in _Pipeline]
+    assert (GreetInputPort, None) in ValidationPlan._Plans
+
+
+@pytest.mark.asyncio
+async def test__create_pipeline_async__UnregisteredInputPort__RaisesKeyError():
+    # Arrange
+    _PipelineFactory = PipelineFactory(ConstructingServiceProvider(), {"sample.use_cases.greet.greet_input_port": []})
+
+    # Act and Assert
+    with pytest.raises(KeyError):
+        await _PipelineFactory.create_pipeline_async(LookupInputPort(), [PipeConfiguration(Interactor)])
+
+
+def test__create_pipeline_async__CalledFromThreadsWithOwnEventLoops__SharesOnePlan():
+    # Arrange
+    _PipelineConfiguration = [PipeConfiguration(NameChecker), PipeConfiguration(Interactor)]
+    _PipelineFactory = PipelineFactory(ConstructingServiceProvider(), Engine.construct_usecase_registry(["sample/use_cases"]))
+    _Barrier = threading.Barrier(8)
+
+    def create_pipeline() -> list:
+        _Barrier.wait()
+        return asyncio.run(_PipelineFactory.create_pipeline_async(GreetInputPort(name="Ben"), _PipelineConfiguration))
+
+    # Act
+    with concurrent.futures.ThreadPoolExecutor(8) as _Executor:
+        _Pipelines = list(_Executor.map(lambda _: create_pipeline(), range(8)))
+
+    # Assert
+    assert all([type(_Pipe).__name__ for _Pipe in _Pipeline] == ["GreetNameChecker", "GreetInteractor"]
+               for _Pipeline in _Pipelines)
+    assert len(_PipelineFactory._pipeline_plans) == 1
+
+# end PipelineFactory tests
+
+
+# ---------------- PipelineFactory reordering tests ----------------
+
+@pytest.mark.asyncio
+async def test__create_pipeline_async__OrderIndependentPipesRanked__ReordersPlanInBackground():
+    # Arrange
+    _PipelineConfiguration = [
+        PipeConfiguration(RequiredInputValidator, PipeConfigurationOption.INSERT, is_order_independent=True),
+        PipeConfiguration(NameChecker, is_order_independent=True),
+        PipeConfiguration(Interactor)]
+    _PipeStatistics = PipeStatistics(min_observations=1)
+    _PipelineFactory = PipelineFactory(
+        ConstructingServiceProvider(), Engine.construct_usecase_registry(["sample/use_cases"]), _PipeStatistics)
+    _PipelineFactory.reorder_interval = 2
+    _PipeStatistics.record(RequiredInputValidator, 0.001, False)
+    _PipeStatistics.record(GreetNameChecker, 0.001, True)
+
+    # Act
+    _PlannedPipeline = await _PipelineFactory.create_pipeline_async(GreetInputPort(), _PipelineConfiguration)
+    await asyncio.sleep(0)
+    _ReorderedPipeline = await _PipelineFactory.create_pipeline_async(GreetInputPort(), _PipelineConfiguration)
+
+    # Assert
+    assert [type(_Pipe) for _Pipe in _PlannedPipeline] == [RequiredInputValidator, GreetNameChecker, GreetInteractor]
+    assert [type(_Pipe) for _Pipe in _ReorderedPipeline] == [GreetNameChecker, RequiredInputValidator, GreetInteractor]
+
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__OrderIndependentPipe__RecordsPipeStatistics():
+    # Arrange
+    _PipeStatistics = PipeStatistics(min_observations=1)
+    _Invoker = UseCaseInvoker(LookupPipelineFactory(LookupExistenceChecker), pipe_statistics=_PipeStatistics)
+    _PipelineConfiguration = [PipeConfiguration(EntityExistenceChecker, is_order_independent=True)]
+
+    # Act
+    await _Invoker.invoke_usecase_async(LookupInputPort(name="Ben"), LookupPresenter(), _PipelineConfiguration)
+
+    # Assert
+    assert _PipeStatistics.observation_count == 1
+    assert _PipeStatistics.get_rank(LookupExistenceChecker) == float("inf")
+
+
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__PipelineFactoryHasPipeStatistics__RecordsIntoFactoryStatistics():
+    # Arrange
+    _PipeStatistics = PipeStatistics(min_observations=1)
+    _Invoker = UseCaseInvoker(PipelineFactory(
+        ConstructingServiceProvider(), Engine.construct_usecase_registry(["sample/use_cases"]), _PipeStatistics))
+
+    # Act
+    await _Invoker.invoke_usecase_async(GreetInputPort(name="Ben"), IOutputPort(), [
+        PipeConfiguration(RequiredInputValidator, PipeConfigurationOption.INSERT, is_order_independent=True)])
+
+    # Assert
+    assert _PipeStatistics.get_rank(RequiredInputValidator) == float("inf")
+
+
+def test__UseCaseInvoker__PipeStatisticsDifferFromPipelineFactory__RaisesValueError():
+    # Arrange
+    _PipelineFactory = PipelineFactory(ConstructingServiceProvider(), Engine.construct_usecase_registry(["sample/use_cases"]))
+
+    # Act and Assert
+    with pytest.raises(ValueError):
+        UseCaseInvoker(_PipelineFactory, pipe_statistics=PipeStatistics())
+
+# end PipelineFactory reordering tests
+
+
+# ---------------- PipelineFactory predicate tests ----------------
+
+_PredicatedPipelineConfiguration = [
+    PipeConfiguration(NameChecker, predicate=lambda input_port, context: not context.properties.get("is_internal")),
+    PipeConfiguration(Interactor)]
+
+
+@pytest.mark.asyncio
+async def test__create_pipeline_async__PredicateReturnsFalse__SkipsPipeWithoutResolvingIt():
+    # Arrange
+    _ServiceProvider = ConstructingServiceProvider()
+    _PipelineFactory = PipelineFactory(_ServiceProvider, Engine.construct_usecase_registry(["sample/use_cases"]))
+
+    # Act
+    with invocation_properties(is_internal=True):
+        async with InvocationContext(GreetInputPort(name="Ben")):
+            _Pipeline = await _PipelineFactory.create_pipeline_async(GreetInputPort(name="Ben"), _PredicatedPipelineConfiguration)
+
+    # Assert
+    assert [type(_Pipe) for _Pipe in _Pipeline] == [GreetInteractor]
+    assert _ServiceProvider.resolved_types == [GreetInteractor]
+
+
+@pytest.mark.asyncio
+async def test__create_pipeline_async__PredicateReturnsTrue__IncludesPipe():
+    # Arrange
+    _PipelineFactory = PipelineFactory(ConstructingServiceProvider(), Engine.construct_usecase_registry(["sample/use_cases"]))
+
+    # Act
+    _Pipeline = await _PipelineFactory.create_pipeline_async(GreetInputPort(name="Ben"), _PredicatedPipelineConfiguration)
+
+    # Assert
+    assert [_Pipe.__class__.__name__ for _Pipe in _Pipeline] == ["GreetNameChecker", "GreetInteractor"]
+
+
+@pytest.mark.asyncio
+async def test__create_pipeline_async__ConfigurationsDifferOnlyByPredicate__SharePlanAndApplyOwnPredicate():
+    # Arrange
+    _PipelineFactory = PipelineFactory(ConstructingServiceProvider(), Engine.construct_usecase_registry(["sample/use_cases"]))
+
+    # Act
+    _Pipelines = [await _PipelineFactory.create_pipeline_async(
+                      GreetInputPort(name="Ben"),
+                      [PipeConfiguration(NameChecker, predicate=lambda input_port, context, _Include=_Include: _Include),
+                       PipeConfiguration(Interactor)])
+                  for _Include in [True, False, True]]
+
+    # Assert
+    assert [len(_Pipeline) for _Pipeline in _Pipelines] == [2, 1, 2]
+    assert len(_PipelineFactory._pipeline_plans) == 1
+
+# end PipelineFactory predicate tests
+
+
 # from unittest.mock import Mock
 
 # import pytest
@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+_RepositoryRoot = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _get_imported_modules(statement: str):
+    _Process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=_RepositoryRoot,
+        capture_output=True,
+        text=True,
+        check=True)
+
+    return [_Line.rsplit("|", 1)[-1].strip()
+            for _Line in _Process.stderr.splitlines()
+            if _Line.startswith("import time:") and "|" in _Line]
+
+
+# ---------------- lazy import tests ----------------
+
+def test__import__PackageImported__DoesNotImportSubmodules():
+    # Act
+    _Modules = _get_imported_modules("import src.clapy")
+
+    # Assert
+    assert "src.clapy" in _Modules
+    assert not any(_Module.startswith("dependency_injector") for _Module in _Modules)
+    assert not any(_Module.startswith("src.clapy.") for _Module in _Modules)
+
+
+def test__import__PipelineTypesAccessed__DoesNotImportDependencyInjector():
+    # Arrange
+    _Statement = "import sys, src.clapy; src.clapy.InputPort; src.clapy.UseCaseInvoker; print(*sys.modules)"
+
+    # Act
+    _Process = subprocess.run([sys.executable, "-c", _Statement], cwd=_RepositoryRoot,
+                              capture_output=True, text=True, check=True)
+    _Modules = _Process.stdout.split()
+
+    # Assert
+    assert "src.clapy.pipeline" in _Modules
+    assert "src.clapy.engine" in _Modules
+    assert not any(_Module.startswith("dependency_injector") for _Module in _Modules)
+
+
+def test__getattr__PublicNameAccessed__ReturnsObjectFromSubmodule():
+    # Arrange
+    import src.clapy
+    from src.clapy.pipeline import InputPort
+
+    # Act
+    _Actual = src.clapy.InputPort
+
+    # Assert
+    assert _Actual is InputPort
+    assert "InputPort" in vars(src.clapy)
+
+
+def test__getattr__UnknownName__RaisesAttributeError():
+    # Arrange
+    import src.clapy
+
+    # Act and Assert
+    with pytest.raises(AttributeError):
+        src.clapy.NotAClapyName
+
+
+def test__dir__PackageInspected__ListsAllPublicNames():
+    # Arrange
+    import src.clapy
+
+    # Act
+    _Names = dir(src.clapy)
+
+    # Assert
+    assert set(src.clapy.__all__) <= set(_Names)
+
+# end lazy import tests
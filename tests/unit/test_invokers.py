@@ -0,0 +1,394 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from src.clapy.invokers import (CachingUseCaseInvoker, InvocationCache,
+                                InvocationPriority, InvocationRecording,
+                                PrioritySchedulingUseCaseInvoker,
+                                SingleFlightUseCaseInvoker, invocation_priority)
+from src.clapy.outputs import IOutputPort, IValidationOutputPort, ValidationResult
+from src.clapy.pipeline import InputPort, PipeConfiguration, RequiredInputValidator
+from src.clapy.services import IUseCaseInvoker
+from tests.unit.fakes import FakeClock
+
+
+class QueryInputPort(InputPort):
+    name: str
+    tags: List[str] = []
+
+
+class UncachedInputPort(InputPort):
+    name: str
+
+
+class QueryPresenter(IOutputPort, IValidationOutputPort):
+
+    def __init__(self):
+        self.greetings: List[str] = []
+
+    async def present_greeting_async(self, greeting: str) -> None:
+        self.greetings.append(greeting)
+
+    async def present_validation_failure_async(self, validation_failure: ValidationResult) -> None:
+        pass
+
+
+class GreetingUseCaseInvoker(IUseCaseInvoker):
+
+    def __init__(self):
+        self.invocation_count = 0
+
+    async def invoke_usecase_async(self, input_port, output_port, pipeline_configuration) -> bool:
+        self.invocation_count += 1
+        if not getattr(input_port, "name", None):
+            return False
+        await output_port.present_greeting_async(f"Hello {input_port.name}!")
+        return True
+
+
+class SlowGreetingUseCaseInvoker(GreetingUseCaseInvoker):
+
+    def __init__(self, exception: Exception = None):
+        super().__init__()
+        self.exception = exception
+        self.was_cancelled = False
+
+    async def invoke_usecase_async(self, input_port, output_port, pipeline_configuration) -> bool:
+        try:
+            await asyncio.sleep(0.01)
+        except asyncio.CancelledError:
+            self.was_cancelled = True
+            raise
+        if self.exception:
+            raise self.exception
+        return await super().invoke_usecase_async(input_port, output_port, pipeline_configuration)
+
+
+class BlockingUseCaseInvoker(IUseCaseInvoker):
+
+    def __init__(self):
+        self.started_names: List[str] = []
+        self.release = asyncio.Event()
+
+    async def invoke_usecase_async(self, input_port, output_port, pipeline_configuration) -> bool:
+        self.started_names.append(input_port.name)
+        await self.release.wait()
+        return True
+
+
+_PipelineConfiguration = [PipeConfiguration(RequiredInputValidator)]
+
+
+# ---------------- InvocationRecording tests ----------------
+
+@pytest.mark.asyncio
+async def test__record__OutputPortCalled__ForwardsAndRecordsCall():
+    # Arrange
+    _Presenter = QueryPresenter()
+    _RecordingPresenter, _Recording = InvocationRecording.record(_Presenter)
+
+    # Act
+    await _RecordingPresenter.present_greeting_async("Hello Ben!")
+
+    # Assert
+    assert isinstance(_RecordingPresenter, QueryPresenter)
+    assert issubclass(type(_RecordingPresenter), IValidationOutputPort)
+    assert _Presenter.greetings == ["Hello Ben!"]
+    assert _Recording.calls == [("present_greeting_async", ("Hello Ben!",), {})]
+
+
+@pytest.mark.asyncio
+async def test__replay_async__RecordedCalls__ReplaysCallsToOutputPort():
+    # Arrange
+    _RecordingPresenter, _Recording = InvocationRecording.record(QueryPresenter())
+    await _RecordingPresenter.present_greeting_async("Hello Ben!")
+    _Recording.result = True
+    _Presenter = QueryPresenter()
+
+    # Act
+    _Result = await _Recording.replay_async(_Presenter)
+
+    # Assert
+    assert _Result
+    assert _Presenter.greetings == ["Hello Ben!"]
+
+
+@pytest.mark.asyncio
+async def test__record__NotForwarding__OnlyRecordsCall():
+    # Arrange
+    _Presenter = QueryPresenter()
+    _RecordingPresenter, _Recording = InvocationRecording.record(_Presenter, forward=False)
+
+    # Act
+    await _RecordingPresenter.present_greeting_async("Hello Ben!")
+
+    # Assert
+    assert _Presenter.greetings == []
+    assert len(_Recording.calls) == 1
+
+# end InvocationRecording tests
+
+
+# ---------------- InvocationCache tests ----------------
+
+def test__InvocationCache__TimeToLiveElapsed__ExpiresRecording():
+    # Arrange
+    _Clock = FakeClock()
+    _Cache = InvocationCache(time_to_live=10, clock=_Clock)
+    _Cache.set("usecase", "key", InvocationRecording())
+
+    # Act
+    _Clock.now += 10
+
+    # Assert
+    assert _Cache.get("usecase", "key") is None
+    assert len(_Cache) == 0
+
+
+def test__InvocationCache__MaxSizeExceeded__EvictsLeastRecentlyUsedRecording():
+    # Arrange
+    _Cache = InvocationCache(max_size=2)
+    _Cache.set("usecase", 1, InvocationRecording())
+    _Cache.set("usecase", 2, InvocationRecording())
+    _Cache.get("usecase", 1)
+
+    # Act
+    _Cache.set("usecase", 3, InvocationRecording())
+
+    # Assert
+    assert _Cache.get("usecase", 1) is not None
+    assert _Cache.get("usecase", 2) is None
+    assert _Cache.get("usecase", 3) is not None
+
+
+def test__invalidate__UsecaseKeyProvided__OnlyRemovesRecordingsOfUsecase():
+    # Arrange
+    _Cache = InvocationCache()
+    _Cache.set("first", 1, InvocationRecording())
+    _Cache.set("second", 1, InvocationRecording())
+
+    # Act
+    _Cache.invalidate("first")
+
+    # Assert
+    assert _Cache.get("first", 1) is None
+    assert _Cache.get("second", 1) is not None
+
+# end InvocationCache tests
+
+
+# ---------------- CachingUseCaseInvoker tests ----------------
+
+@pytest.mark.asyncio
+async def test__CachingUseCaseInvoker__EqualInputsInvokedTwice__ReplaysRecordedOutputs():
+    # Arrange
+    _Inner = GreetingUseCaseInvoker()
+    _Invoker = CachingUseCaseInvoker(_Inner, InvocationCache(), [QueryInputPort])
+    _Presenter = QueryPresenter()
+
+    # Act
+    await _Invoker.invoke_usecase_async(QueryInputPort(name="Ben", tags=["a"]), QueryPresenter(), _PipelineConfiguration)
+    _Result = await _Invoker.invoke_usecase_async(QueryInputPort(name="Ben", tags=["a"]), _Presenter, _PipelineConfiguration)
+
+    # Assert
+    assert _Result
+    assert _Presenter.greetings == ["Hello Ben!"]
+    assert _Inner.invocation_count == 1
+
+
+@pytest.mark.asyncio
+async def test__CachingUseCaseInvoker__DifferentInputs__InvokesUsecaseForEach():
+    # Arrange
+    _Inner = GreetingUseCaseInvoker()
+    _Invoker = CachingUseCaseInvoker(_Inner, InvocationCache(), [QueryInputPort])
+
+    # Act
+    await _Invoker.invoke_usecase_async(QueryInputPort(name="Ben", tags=[1]), QueryPresenter(), _PipelineConfiguration)
+    await _Invoker.invoke_usecase_async(QueryInputPort(name="Ben", tags=[True]), QueryPresenter(), _PipelineConfiguration)
+
+    # Assert
+    assert _Inner.invocation_count == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("input_port", [
+    UncachedInputPort(name="Ben"),
+    QueryInputPort(),
+    QueryInputPort(name="Ben", tags=[bytearray()])])
+async def test__CachingUseCaseInvoker__UncacheableInvocation__InvokesUsecaseEachTime(input_port):
+    # Arrange
+    _Inner = GreetingUseCaseInvoker()
+    _Invoker = CachingUseCaseInvoker(_Inner, InvocationCache(), [QueryInputPort])
+
+    # Act
+    await _Invoker.invoke_usecase_async(input_port, QueryPresenter(), _PipelineConfiguration)
+    await _Invoker.invoke_usecase_async(input_port, QueryPresenter(), _PipelineConfiguration)
+
+    # Assert
+    assert _Inner.invocation_count == 2
+
+# end CachingUseCaseInvoker tests
+
+
+# ---------------- SingleFlightUseCaseInvoker tests ----------------
+
+@pytest.mark.asyncio
+async def test__SingleFlightUseCaseInvoker__EqualConcurrentInvocations__SharesOneInvocation():
+    # Arrange
+    _Inner = SlowGreetingUseCaseInvoker()
+    _Invoker = SingleFlightUseCaseInvoker(_Inner, [QueryInputPort])
+    _Presenters = [QueryPresenter() for _ in range(3)]
+
+    # Act
+    _Results = await asyncio.gather(*(_Invoker.invoke_usecase_async(QueryInputPort(name="Ben"), _Presenter, _PipelineConfiguration)
+                                      for _Presenter in _Presenters))
+
+    # Assert
+    assert _Results == [True, True, True]
+    assert [_Presenter.greetings for _Presenter in _Presenters] == [["Hello Ben!"]] * 3
+    assert _Inner.invocation_count == 1
+
+
+@pytest.mark.asyncio
+async def test__SingleFlightUseCaseInvoker__SharedInvocationRaises__RaisesToEveryCaller():
+    # Arrange
+    _Invoker = SingleFlightUseCaseInvoker(SlowGreetingUseCaseInvoker(LookupError("Not found.")), [QueryInputPort])
+
+    # Act
+    _Results = await asyncio.gather(*(_Invoker.invoke_usecase_async(QueryInputPort(name="Ben"), QueryPresenter(), _PipelineConfiguration)
+                                      for _ in range(2)), return_exceptions=True)
+
+    # Assert
+    assert all(isinstance(_Result, LookupError) for _Result in _Results)
+
+
+@pytest.mark.asyncio
+async def test__SingleFlightUseCaseInvoker__OneCallerCancelled__OtherCallersReceiveOutputs():
+    # Arrange
+    _Inner = SlowGreetingUseCaseInvoker()
+    _Invoker = SingleFlightUseCaseInvoker(_Inner, [QueryInputPort])
+    _CancelledPresenter = QueryPresenter()
+    _Presenter = QueryPresenter()
+    _CancelledTask = asyncio.ensure_future(
+        _Invoker.invoke_usecase_async(QueryInputPort(name="Ben"), _CancelledPresenter, _PipelineConfiguration))
+    _Task = asyncio.ensure_future(_Invoker.invoke_usecase_async(QueryInputPort(name="Ben"), _Presenter, _PipelineConfiguration))
+    await asyncio.sleep(0)
+
+    # Act
+    _CancelledTask.cancel()
+    _Result = await _Task
+
+    # Assert
+    assert _Result
+    assert _CancelledTask.cancelled()
+    assert _CancelledPresenter.greetings == []
+    assert _Presenter.greetings == ["Hello Ben!"]
+    assert not _Inner.was_cancelled
+
+
+@pytest.mark.asyncio
+async def test__SingleFlightUseCaseInvoker__EveryCallerCancelled__CancelsSharedInvocation():
+    # Arrange
+    _Inner = SlowGreetingUseCaseInvoker()
+    _Invoker = SingleFlightUseCaseInvoker(_Inner, [QueryInputPort])
+    _Task = asyncio.ensure_future(_Invoker.invoke_usecase_async(QueryInputPort(name="Ben"), QueryPresenter(), _PipelineConfiguration))
+    await asyncio.sleep(0)
+
+    # Act
+    _Task.cancel()
+    await asyncio.gather(_Task, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    # Assert
+    assert _Inner.was_cancelled
+    assert await _Invoker.invoke_usecase_async(QueryInputPort(name="Ben"), QueryPresenter(), _PipelineConfiguration)
+
+# end SingleFlightUseCaseInvoker tests
+
+
+# ---------------- PrioritySchedulingUseCaseInvoker tests ----------------
+
+async def _invoke_with_priority(invoker: IUseCaseInvoker, name: str, priority: InvocationPriority) -> bool:
+    with invocation_priority(priority):
+        return await invoker.invoke_usecase_async(QueryInputPort(name=name), QueryPresenter(), _PipelineConfiguration)
+
+
+@pytest.mark.asyncio
+async def test__PrioritySchedulingUseCaseInvoker__BulkShareReached__LeavesSlotsForInteractiveWork():
+    # Arrange
+    _Inner = BlockingUseCaseInvoker()
+    _Invoker = PrioritySchedulingUseCaseInvoker(_Inner, max_concurrency=4, priority_shares={InvocationPriority.BULK: 0.5})
+    _Tasks = [asyncio.ensure_future(_invoke_with_priority(_Invoker, f"bulk{_Index}", InvocationPriority.BULK))
+              for _Index in range(4)]
+    await asyncio.sleep(0)
+
+    # Act
+    _Tasks.append(asyncio.ensure_future(_invoke_with_priority(_Invoker, "interactive", InvocationPriority.INTERACTIVE)))
+    await asyncio.sleep(0)
+
+    # Assert
+    assert _Inner.started_names == ["bulk0", "bulk1", "interactive"]
+    _Inner.release.set()
+    assert await asyncio.gather(*_Tasks) == [True] * 5
+
+
+@pytest.mark.asyncio
+async def test__PrioritySchedulingUseCaseInvoker__SlotReleased__GrantsSlotToHighestPriorityWaiter():
+    # Arrange
+    _Inner = BlockingUseCaseInvoker()
+    _Invoker = PrioritySchedulingUseCaseInvoker(_Inner, max_concurrency=1)
+    _Tasks = [asyncio.ensure_future(_invoke_with_priority(_Invoker, _Name, _Priority)) for _Name, _Priority in [
+        ("first", InvocationPriority.NORMAL),
+        ("bulk", InvocationPriority.BULK),
+        ("normal", InvocationPriority.NORMAL),
+        ("interactive", InvocationPriority.INTERACTIVE)]]
+    await asyncio.sleep(0)
+
+    # Act
+    _Inner.release.set()
+    await asyncio.gather(*_Tasks)
+
+    # Assert
+    assert _Inner.started_names == ["first", "interactive", "normal", "bulk"]
+
+
+@pytest.mark.asyncio
+async def test__PrioritySchedulingUseCaseInvoker__WaitingInvocationCancelled__DoesNotHoldSlot():
+    # Arrange
+    _Inner = BlockingUseCaseInvoker()
+    _Invoker = PrioritySchedulingUseCaseInvoker(_Inner, max_concurrency=1)
+    _RunningTask = asyncio.ensure_future(_invoke_with_priority(_Invoker, "running", InvocationPriority.NORMAL))
+    _CancelledTask = asyncio.ensure_future(_invoke_with_priority(_Invoker, "cancelled", InvocationPriority.NORMAL))
+    await asyncio.sleep(0)
+
+    # Act
+    _CancelledTask.cancel()
+    _Inner.release.set()
+    await _RunningTask
+
+    # Assert
+    assert await _invoke_with_priority(_Invoker, "next", InvocationPriority.BULK)
+    assert _Inner.started_names == ["running", "next"]
+
+
+@pytest.mark.asyncio
+async def test__PrioritySchedulingUseCaseInvoker__SlotReleasedBeforeCancelledWaiterResumes__RaisesCancelledError():
+    # Arrange
+    _Inner = BlockingUseCaseInvoker()
+    _Invoker = PrioritySchedulingUseCaseInvoker(_Inner, max_concurrency=1)
+    _RunningTask = asyncio.ensure_future(_invoke_with_priority(_Invoker, "running", InvocationPriority.NORMAL))
+    _CancelledTask = asyncio.ensure_future(_invoke_with_priority(_Invoker, "cancelled", InvocationPriority.NORMAL))
+    await asyncio.sleep(0)
+
+    # Act
+    _Inner.release.set()
+    _CancelledTask.cancel()
+
+    # Assert
+    with pytest.raises(asyncio.CancelledError):
+        await _CancelledTask
+    assert await _RunningTask
+    assert await _invoke_with_priority(_Invoker, "next", InvocationPriority.NORMAL)
+
+# end PrioritySchedulingUseCaseInvoker tests
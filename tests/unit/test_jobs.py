@@ -0,0 +1,222 @@
+from typing import List
+
+import pytest
+
+from src.clapy.jobs import JobWorker, SqliteJobQueue
+from src.clapy.outputs import IOutputPort
+from src.clapy.pipeline import InputPort, Interactor, PipeConfiguration
+from src.clapy.services import IUseCaseInvoker
+from tests.unit.fakes import FakeClock
+
+
+class ImportJobInputPort(InputPort):
+    name: str
+    tags: List[str] = []
+
+
+class ImportJobPresenter(IOutputPort):
+
+    def __init__(self):
+        self.imported_names: List[str] = []
+
+    async def present_imported_async(self, name: str) -> None:
+        self.imported_names.append(name)
+
+
+class ImportUseCaseInvoker(IUseCaseInvoker):
+
+    def __init__(self, failing_names: List[str] = []):
+        self.failing_names = failing_names
+        self.invoked_input_ports: List[InputPort] = []
+
+    async def invoke_usecase_async(self, input_port, output_port, pipeline_configuration) -> bool:
+        self.invoked_input_ports.append(input_port)
+        if input_port.name in self.failing_names:
+            raise ConnectionError("Database unavailable.")
+        await output_port.present_imported_async(input_port.name)
+        return True
+
+
+class ClockAdvancingUseCaseInvoker(ImportUseCaseInvoker):
+
+    def __init__(self, job_queue: SqliteJobQueue, clock: 'FakeClock', seconds_per_invocation: float):
+        super().__init__()
+        self.job_queue = job_queue
+        self.clock = clock
+        self.seconds_per_invocation = seconds_per_invocation
+        self.job_counts: List[int] = []
+
+    async def invoke_usecase_async(self, input_port, output_port, pipeline_configuration) -> bool:
+        self.job_counts.append(self.job_queue.count())
+        self.clock.now += self.seconds_per_invocation
+        return await super().invoke_usecase_async(input_port, output_port, pipeline_configuration)
+
+
+_PipelineConfigurations = {"Import": [PipeConfiguration(Interactor)]}
+
+
+@pytest.fixture
+def job_queue(tmp_path):
+    _JobQueue = SqliteJobQueue(str(tmp_path / "jobs.db"), max_attempts=2, retry_delay=0)
+    yield _JobQueue
+    _JobQueue.close()
+
+
+# ---------------- SqliteJobQueue tests ----------------
+
+def test__reserve__JobEnqueued__ReturnsJobThatRecreatesInputPort(job_queue):
+    # Arrange
+    job_queue.enqueue(ImportJobInputPort(name="Ben", tags=["a"]), "Import")
+
+    # Act
+    _Jobs = job_queue.reserve(10)
+
+    # Assert
+    assert len(_Jobs) == 1
+    assert _Jobs[0].configuration_name == "Import"
+    assert _Jobs[0].attempts == 1
+    _InputPort = _Jobs[0].create_input_port()
+    assert isinstance(_InputPort, ImportJobInputPort)
+    assert (_InputPort.name, _InputPort.tags) == ("Ben", ["a"])
+
+
+def test__reserve__JobReserved__HidesJobUntilVisibilityTimeoutElapses(tmp_path):
+    # Arrange
+    _Clock = FakeClock()
+    _JobQueue = SqliteJobQueue(str(tmp_path / "jobs.db"), visibility_timeout=30, clock=_Clock)
+    _JobQueue.enqueue(ImportJobInputPort(name="Ben"), "Import")
+    _JobQueue.reserve(10)
+
+    # Act
+    _HiddenJobs = _JobQueue.reserve(10)
+    _Clock.now += 30
+    _VisibleJobs = _JobQueue.reserve(10)
+
+    # Assert
+    assert _HiddenJobs == []
+    assert [_Job.attempts for _Job in _VisibleJobs] == [2]
+    _JobQueue.close()
+
+
+def test__enqueue__ValueNotJsonSerialisable__RaisesTypeError(job_queue):
+    # Act and Assert
+    with pytest.raises(TypeError):
+        job_queue.enqueue(ImportJobInputPort(name=object()), "Import")
+
+    assert job_queue.count() == 0
+
+
+def test__fail__MaxAttemptsReached__MarksJobAsDead(job_queue):
+    # Arrange
+    job_queue.enqueue(ImportJobInputPort(name="Ben"), "Import")
+
+    # Act
+    job_queue.fail(job_queue.reserve(1)[0], "First failure")
+    job_queue.fail(job_queue.reserve(1)[0], "Second failure")
+
+    # Assert
+    assert job_queue.reserve(1) == []
+    assert job_queue.count() == 0
+    assert job_queue.count(is_dead=True) == 1
+
+
+def test__reserve__FinalAttemptExpired__MarksJobAsDead(tmp_path):
+    # Arrange
+    _Clock = FakeClock()
+    _JobQueue = SqliteJobQueue(str(tmp_path / "jobs.db"), visibility_timeout=30, max_attempts=2, clock=_Clock)
+    _JobQueue.enqueue(ImportJobInputPort(name="Ben"), "Import")
+    _JobQueue.reserve(1)
+    _Clock.now += 30
+    _JobQueue.reserve(1)
+    _Clock.now += 30
+
+    # Act
+    _Jobs = _JobQueue.reserve(1)
+
+    # Assert
+    assert _Jobs == []
+    assert _JobQueue.count() == 0
+    assert _JobQueue.count(is_dead=True) == 1
+    _JobQueue.close()
+
+
+def test__complete__JobReservedAgainAfterVisibilityTimeout__LeavesJobForNewReservation(tmp_path):
+    # Arrange
+    _Clock = FakeClock()
+    _JobQueue = SqliteJobQueue(str(tmp_path / "jobs.db"), visibility_timeout=30, clock=_Clock)
+    _JobQueue.enqueue(ImportJobInputPort(name="Ben"), "Import")
+    _StaleJob = _JobQueue.reserve(1)[0]
+    _Clock.now += 30
+    _Job = _JobQueue.reserve(1)[0]
+
+    # Act
+    _JobQueue.complete([_StaleJob])
+    _JobQueue.fail(_StaleJob, "Stale failure")
+    _Clock.now += 1
+    _JobsAfterStaleCalls = _JobQueue.reserve(1)
+    _CountAfterStaleCalls = _JobQueue.count()
+    _JobQueue.complete([_Job])
+
+    # Assert
+    assert _JobsAfterStaleCalls == []
+    assert _CountAfterStaleCalls == 1
+    assert _JobQueue.count() == 0
+    _JobQueue.close()
+
+# end SqliteJobQueue tests
+
+
+# ---------------- JobWorker tests ----------------
+
+@pytest.mark.asyncio
+async def test__run_async__JobsQueued__InvokesEachJobAndCompletesIt(job_queue):
+    # Arrange
+    job_queue.enqueue_many([(ImportJobInputPort(name=_Name), "Import") for _Name in ["Ben", "Bob", "Bud"]])
+    _Presenter = ImportJobPresenter()
+    _Worker = JobWorker(job_queue, ImportUseCaseInvoker(), _PipelineConfigurations, lambda _: _Presenter,
+                        concurrency=2, poll_interval=0.01)
+
+    # Act
+    await _Worker.run_async(stop_when_empty=True)
+
+    # Assert
+    assert sorted(_Presenter.imported_names) == ["Ben", "Bob", "Bud"]
+    assert job_queue.count() == 0
+
+
+@pytest.mark.asyncio
+async def test__run_async__InvocationRaises__RetriesJobUntilDead(job_queue):
+    # Arrange
+    job_queue.enqueue(ImportJobInputPort(name="Ben"), "Import")
+    _Invoker = ImportUseCaseInvoker(failing_names=["Ben"])
+    _Worker = JobWorker(job_queue, _Invoker, _PipelineConfigurations, lambda _: ImportJobPresenter(), poll_interval=0.01)
+
+    # Act
+    await _Worker.run_async(stop_when_empty=True)
+    await _Worker.run_async(stop_when_empty=True)
+
+    # Assert
+    assert len(_Invoker.invoked_input_ports) == 2
+    assert job_queue.count(is_dead=True) == 1
+
+
+@pytest.mark.asyncio
+async def test__run_async__CompletedJobNearsVisibilityTimeout__CommitsBeforeJobBecomesVisible(tmp_path):
+    # Arrange
+    _Clock = FakeClock()
+    _JobQueue = SqliteJobQueue(str(tmp_path / "jobs.db"), visibility_timeout=30, clock=_Clock)
+    _JobQueue.enqueue_many([(ImportJobInputPort(name=str(_Index)), "Import") for _Index in range(3)])
+    _Invoker = ClockAdvancingUseCaseInvoker(_JobQueue, _Clock, seconds_per_invocation=29)
+    _Worker = JobWorker(_JobQueue, _Invoker, _PipelineConfigurations, lambda _: ImportJobPresenter(),
+                        concurrency=1, poll_interval=0.01)
+
+    # Act
+    await _Worker.run_async(stop_when_empty=True)
+
+    # Assert
+    assert [_InputPort.name for _InputPort in _Invoker.invoked_input_ports] == ["0", "1", "2"]
+    assert _Invoker.job_counts == [3, 2, 1]
+    assert _JobQueue.count() == 0
+    _JobQueue.close()
+
+# end JobWorker tests
@@ -0,0 +1,108 @@
+import concurrent.futures
+import threading
+from typing import List
+
+from src.clapy.metrics import LatencyWindow, PipeStatistics, TokenBucket
+from src.clapy.pipeline import Interactor, RequiredInputValidator
+from tests.unit.fakes import FakeClock
+
+
+# ---------------- LatencyWindow tests ----------------
+
+def test__percentile__FewerThanMinSamples__ReturnsNone():
+    # Arrange
+    _Window = LatencyWindow(size=10, min_samples=3)
+    _Window.add(0.5)
+
+    # Act
+    _Percentile = _Window.percentile(50)
+
+    # Assert
+    assert _Percentile is None
+
+
+def test__percentile__WindowFull__EstimatesFromMostRecentLatencies():
+    # Arrange
+    _Window = LatencyWindow(size=4, min_samples=1)
+    for _Latency in [9.0, 1.0, 2.0, 3.0, 4.0]:
+        _Window.add(_Latency)
+
+    # Act
+    _Percentiles = [_Window.percentile(_Percentile) for _Percentile in [25, 50, 100]]
+
+    # Assert
+    assert _Percentiles == [1.0, 2.0, 4.0]
+
+
+def test__percentile__AddedFromThreads__EstimatesWhileLatenciesAreAdded():
+    # Arrange
+    _Window = LatencyWindow(size=64, min_samples=1)
+    _Barrier = threading.Barrier(4)
+
+    def add_and_estimate(latency: float) -> List[float]:
+        _Barrier.wait()
+        _Percentiles = []
+        for _ in range(2000):
+            _Window.add(latency)
+            _Percentiles.append(_Window.percentile(100))
+        return _Percentiles
+
+    # Act
+    with concurrent.futures.ThreadPoolExecutor(4) as _Executor:
+        _Percentiles = [_Percentile for _ThreadPercentiles in _Executor.map(add_and_estimate, [1.0, 2.0, 3.0, 4.0])
+                        for _Percentile in _ThreadPercentiles]
+
+    # Assert
+    assert set(_Percentiles) <= {1.0, 2.0, 3.0, 4.0}
+    assert len(_Window) == 64
+
+# end LatencyWindow tests
+
+
+# ---------------- TokenBucket tests ----------------
+
+def test__try_acquire__BucketEmpty__RefillsAtRate():
+    # Arrange
+    _Clock = FakeClock()
+    _Bucket = TokenBucket(rate=2, capacity=2, clock=_Clock)
+
+    # Act
+    _Acquired = [_Bucket.try_acquire() for _ in range(3)]
+    _Clock.now += 0.5
+    _AcquiredAfterRefill = _Bucket.try_acquire()
+
+    # Assert
+    assert _Acquired == [True, True, False]
+    assert _AcquiredAfterRefill
+
+# end TokenBucket tests
+
+# ---------------- PipeStatistics tests ----------------
+
+def test__get_rank__FewerThanMinObservations__ReturnsNone():
+    # Arrange
+    _PipeStatistics = PipeStatistics(min_observations=2)
+    _PipeStatistics.record(Interactor, 0.1, False)
+
+    # Act
+    _Rank = _PipeStatistics.get_rank(Interactor)
+
+    # Assert
+    assert _Rank is None
+
+
+def test__get_rank__PipesObserved__RanksByExecutionTimePerFailure():
+    # Arrange
+    _PipeStatistics = PipeStatistics(smoothing=0.5, min_observations=2)
+    for _HasFailures in [True, False]:
+        _PipeStatistics.record(RequiredInputValidator, 0.2, _HasFailures)
+        _PipeStatistics.record(Interactor, 0.1, False)
+
+    # Act
+    _Ranks = (_PipeStatistics.get_rank(RequiredInputValidator), _PipeStatistics.get_rank(Interactor))
+
+    # Assert
+    assert _Ranks == (0.4, float("inf"))
+    assert _PipeStatistics.observation_count == 4
+
+# end PipeStatistics tests
@@ -0,0 +1,61 @@
+from src.clapy.outputs import ValidationResult
+
+
+# ---------------- add_error_code tests ----------------
+
+def test__add_error_code__ErrorsNotRead__StoresStructuredErrorWithoutMessage():
+    # Arrange
+    _ValidationResult = ValidationResult()
+
+    # Act
+    _ValidationResult.add_error_code("name", "required")
+
+    # Assert
+    assert _ValidationResult.has_errors
+    assert _ValidationResult.error_codes == [("name", "required", {})]
+    assert _ValidationResult._errors is None
+
+
+def test__add_error_code__ErrorsRead__RendersMessagesFromTemplates():
+    # Arrange
+    _ValidationResult = ValidationResult()
+    _ValidationResult.add_error("name", "Custom message.")
+
+    # Act
+    _ValidationResult.add_error_code("name", "required")
+    _ValidationResult.add_error_code("age", "required")
+
+    # Assert
+    assert _ValidationResult.errors == {
+        "name": ["Custom message.", "'name' must have a value."],
+        "age": ["'age' must have a value."]}
+
+
+def test__add_error_code__TemplatesOverriddenOnSubclass__RendersWithSubclassTemplates():
+    # Arrange
+    class TranslatedValidationResult(ValidationResult):
+        message_templates = {"required": "'{property}' doit avoir une valeur."}
+
+    _ValidationResult = TranslatedValidationResult()
+
+    # Act
+    _ValidationResult.add_error_code("name", "required")
+
+    # Assert
+    assert _ValidationResult.errors == {"name": ["'name' doit avoir une valeur."]}
+
+
+def test__add_error_code__ErrorsAssigned__ReplacesUnrenderedErrorCodes():
+    # Arrange
+    _ValidationResult = ValidationResult()
+    _ValidationResult.add_error_code("name", "required")
+
+    # Act
+    _ValidationResult.errors = {"age": ["Custom message."]}
+    _ValidationResult.add_error_code("tags", "required")
+
+    # Assert
+    assert _ValidationResult.errors == {"age": ["Custom message."], "tags": ["'tags' must have a value."]}
+    assert _ValidationResult.error_codes == [("tags", "required", {})]
+
+# end add_error_code tests
@@ -0,0 +1,457 @@
+from typing import List, Optional
+
+import pytest
+
+from src.clapy.batching import InputPortBatch
+from src.clapy.engine import UseCaseInvoker
+from src.clapy.outputs import IOutputPort, IValidationOutputPort, ValidationResult
+from src.clapy.pipeline import (InputPort, InputTypeValidator,
+                                PipeConfiguration, RequiredInputValidator,
+                                SlottedInputPort)
+from tests.unit.fakes import PipesPipelineFactory
+
+
+class ValidatorInputPort(InputPort):
+    name: str
+    tags: List[str]
+    age: int = 0
+
+
+class SlottedValidatorInputPort(SlottedInputPort):
+    name: str
+    tags: List[str]
+    age: int = 0
+
+
+class AddressInputPort(InputPort):
+    street: str
+    postcode: int
+
+
+class ContactInputPort(InputPort):
+    name: str
+    address: Optional[AddressInputPort] = None
+    previous_addresses: List[AddressInputPort] = []
+
+
+class UncheckableMeta(type):
+
+    def __instancecheck__(cls, instance):
+        raise RuntimeError("Cannot check instances.")
+
+    def __subclasscheck__(cls, subclass):
+        raise RuntimeError("Cannot check subclasses.")
+
+
+class Uncheckable(metaclass=UncheckableMeta):
+    pass
+
+
+class UncheckableInputPort(InputPort):
+    value: Uncheckable
+
+
+class ValidationPresenter(IOutputPort, IValidationOutputPort):
+
+    def __init__(self):
+        self.validation_failures: List[ValidationResult] = []
+
+    async def present_validation_failure_async(self, validation_failure: ValidationResult) -> None:
+        self.validation_failures.append(validation_failure)
+
+
+# ---------------- RequiredInputValidator tests ----------------
+
+@pytest.mark.asyncio
+async def test__RequiredInputValidator__AllRequiredInputsProvided__HasNoFailures():
+    # Arrange
+    _Validator = RequiredInputValidator()
+    _Presenter = ValidationPresenter()
+
+    # Act
+    await _Validator.execute_async(ValidatorInputPort(name="Ben", tags=["a"]), _Presenter)
+
+    # Assert
+    assert not _Validator.has_failures
+    assert _Presenter.validation_failures == []
+
+
+@pytest.mark.asyncio
+async def test__RequiredInputValidator__RequiredInputsMissing__PresentsErrorForEachMissingInput():
+    # Arrange
+    _Validator = RequiredInputValidator()
+    _Presenter = ValidationPresenter()
+
+    # Act
+    await _Validator.execute_async(ValidatorInputPort(), _Presenter)
+
+    # Assert
+    assert _Validator.has_failures
+    assert _Presenter.validation_failures[0].errors == {
+        "name": ["'name' must have a value."],
+        "tags": ["'tags' must have a value."]}
+
+
+@pytest.mark.asyncio
+async def test__RequiredInputValidator__SlottedInputPortMissingRequiredInputs__PresentsErrorForEachMissingInput():
+    # Arrange
+    _Validator = RequiredInputValidator()
+    _Presenter = ValidationPresenter()
+
+    # Act
+    await _Validator.execute_async(SlottedValidatorInputPort(tags=[]), _Presenter)
+
+    # Assert
+    assert _Validator.has_failures
+    assert _Presenter.validation_failures[0].errors == {"name": ["'name' must have a value."]}
+
+@pytest.mark.asyncio
+async def test__RequiredInputValidator__FailFastEnabled__StopsAtFirstMissingInput():
+    # Arrange
+    class FailFastRequiredInputValidator(RequiredInputValidator):
+        fail_fast = True
+
+    _Validator = FailFastRequiredInputValidator()
+    _Presenter = ValidationPresenter()
+
+    # Act
+    await _Validator.execute_async(ValidatorInputPort(), _Presenter)
+
+    # Assert
+    assert _Validator.has_failures
+    assert _Presenter.validation_failures[0].errors == {"name": ["'name' must have a value."]}
+
+
+def test__RequiredInputValidator__ValidateBatch__ReturnsResultForEachRowMissingInputs():
+    # Arrange
+    _Batch = InputPortBatch(ValidatorInputPort, {"name": ["Ben", InputPortBatch.MISSING]})
+
+    # Act
+    _Results = RequiredInputValidator().validate_batch(_Batch)
+
+    # Assert
+    assert _Results[0].errors == {"tags": ["'tags' must have a value."]}
+    assert _Results[1].errors == {
+        "name": ["'name' must have a value."],
+        "tags": ["'tags' must have a value."]}
+
+# end RequiredInputValidator tests
+
+
+# ---------------- InputTypeValidator tests ----------------
+
+@pytest.mark.asyncio
+async def test__InputTypeValidator__InputsMatchTypeHints__HasNoFailures():
+    # Arrange
+    _Validator = InputTypeValidator()
+    _Presenter = ValidationPresenter()
+
+    # Act
+    await _Validator.execute_async(ValidatorInputPort(name="Ben", tags=["a", "b"], age=3), _Presenter)
+
+    # Assert
+    assert not _Validator.has_failures
+    assert _Presenter.validation_failures == []
+
+
+@pytest.mark.asyncio
+async def test__InputTypeValidator__InputDoesNotMatchTypeHint__PresentsTypeError():
+    # Arrange
+    _Validator = InputTypeValidator()
+    _Presenter = ValidationPresenter()
+
+    # Act
+    await _Validator.execute_async(ValidatorInputPort(name=1, tags=["a"]), _Presenter)
+
+    # Assert
+    assert _Validator.has_failures
+    assert list(_Presenter.validation_failures[0].errors) == ["name"]
+
+
+@pytest.mark.asyncio
+async def test__InputTypeValidator__NestedValueDoesNotMatchTypeHint__ReportsPathToValue():
+    # Arrange
+    _Validator = InputTypeValidator()
+    _Presenter = ValidationPresenter()
+
+    # Act
+    await _Validator.execute_async(ValidatorInputPort(name="Ben", tags=["a", 2]), _Presenter)
+
+    # Assert
+    assert _Presenter.validation_failures[0].errors == {"tags": ["'tags[1]' must be of type 'str'."]}
+
+
+@pytest.mark.asyncio
+async def test__InputTypeValidator__InputsMissing__SkipsMissingInputs():
+    # Arrange
+    _Validator = InputTypeValidator()
+    _Presenter = ValidationPresenter()
+
+    # Act
+    await _Validator.execute_async(ValidatorInputPort(), _Presenter)
+
+    # Assert
+    assert not _Validator.has_failures
+
+@pytest.mark.asyncio
+async def test__InputTypeValidator__FailFastEnabled__StopsAtFirstMismatchingInput():
+    # Arrange
+    class FailFastInputTypeValidator(InputTypeValidator):
+        fail_fast = True
+
+    _Validator = FailFastInputTypeValidator()
+    _Presenter = ValidationPresenter()
+
+    # Act
+    await _Validator.execute_async(ValidatorInputPort(name=1, tags=[1]), _Presenter)
+
+    # Assert
+    assert _Validator.has_failures
+    assert [_Property for _Property, _, _ in _Presenter.validation_failures[0].error_codes] == ["name"]
+
+
+def test__InputTypeValidator__ValidateBatch__ReturnsResultForEachMismatchingRow():
+    # Arrange
+    _Batch = InputPortBatch(ValidatorInputPort, {
+        "name": ["Ben", 2, "Bud"],
+        "tags": [["a"], ["b"], [3]]})
+
+    # Act
+    _Results = InputTypeValidator().validate_batch(_Batch)
+
+    # Assert
+    assert _Results[0] is None
+    assert _Results[1].errors == {"name": ["'name' must be of type 'str'."]}
+    assert _Results[2].errors == {"tags": ["'tags[0]' must be of type 'str'."]}
+
+
+def test__InputTypeValidator__ValidateBatchCheckerRaises__LogsErrorAndSkipsColumn(caplog):
+    # Arrange
+    _Batch = InputPortBatch(UncheckableInputPort, {"value": [1, 2]})
+
+    # Act
+    _ValidationResults = InputTypeValidator().validate_batch(_Batch)
+
+    # Assert
+    assert _ValidationResults == [None, None]
+    assert [_Record.levelname for _Record in caplog.records] == ["ERROR"]
+    assert "'value' column" in caplog.records[0].getMessage()
+
+# end InputTypeValidator tests
+
+
+# ---------------- InputPort tests ----------------
+
+def test__InputPort__ConstructedDirectly__StoresKeywordArguments():
+    # Act
+    _InputPort = InputPort(name="Ben", age=5)
+
+    # Assert
+    assert type(_InputPort) is InputPort
+    assert (_InputPort.name, _InputPort.age) == ("Ben", 5)
+    assert _InputPort.has_been_set("name")
+
+# end InputPort tests
+
+
+# ---------------- SlottedInputPort tests ----------------
+
+def test__SlottedInputPort__Constructed__StoresAttributesWithoutInstanceDictionary():
+    # Act
+    _InputPort = SlottedValidatorInputPort(name="Ben", tags=["a"])
+
+    # Assert
+    assert not hasattr(_InputPort, "__dict__")
+    assert (_InputPort.name, _InputPort.tags, _InputPort.age) == ("Ben", ["a"], 0)
+    assert isinstance(_InputPort, InputPort)
+
+
+def test__SlottedInputPort__RequiredAttributeNotProvided__AttributeIsUnset():
+    # Act
+    _InputPort = SlottedValidatorInputPort()
+
+    # Assert
+    assert not hasattr(_InputPort, "name")
+    assert _InputPort.age == 0
+
+
+def test__SlottedInputPort__UnknownAttributeProvided__RaisesTypeError():
+    # Act and Assert
+    with pytest.raises(TypeError):
+        SlottedValidatorInputPort(nickname="Benny")
+
+
+def test__SlottedInputPort__Subclassed__InheritsFieldsAndOverridesDefaults():
+    # Arrange
+    class DerivedInputPort(SlottedValidatorInputPort):
+        nickname: str
+        age = 5
+
+    # Act
+    _InputPort = DerivedInputPort(name="Ben", nickname="Benny")
+
+    # Assert
+    assert DerivedInputPort._fields == ("name", "tags", "age", "nickname")
+    assert (_InputPort.name, _InputPort.nickname, _InputPort.age) == ("Ben", "Benny", 5)
+
+# end SlottedInputPort tests
+
+
+# ---------------- from_mapping tests ----------------
+
+@pytest.mark.parametrize("input_port_type", [ValidatorInputPort, SlottedValidatorInputPort])
+def test__from_mapping__ValidMapping__ReturnsPopulatedInputPortWithoutValidationResult(input_port_type):
+    # Act
+    _InputPort, _ValidationResult = input_port_type.from_mapping({"name": "Ben", "tags": ["a"], "unknown": 1})
+
+    # Assert
+    assert _ValidationResult is None
+    assert (_InputPort.name, _InputPort.tags, _InputPort.age) == ("Ben", ["a"], 0)
+
+
+@pytest.mark.parametrize("input_port_type", [ValidatorInputPort, SlottedValidatorInputPort])
+def test__from_mapping__MissingAndMismatchingInputs__ReturnsValidationResultWithAllErrors(input_port_type):
+    # Act
+    _, _ValidationResult = input_port_type.from_mapping({"tags": ["a", 2]})
+
+    # Assert
+    assert _ValidationResult.errors == {
+        "name": ["'name' must have a value."],
+        "tags": ["'tags[1]' must be of type 'str'."]}
+
+
+def test__from_mapping__NestedInputPortMappings__ConstructsNestedInputPorts():
+    # Act
+    _InputPort, _ValidationResult = ContactInputPort.from_mapping({
+        "name": "Ben",
+        "address": {"street": "High Street", "postcode": 3000},
+        "previous_addresses": [{"street": "Low Street", "postcode": 3001}]})
+
+    # Assert
+    assert _ValidationResult is None
+    assert isinstance(_InputPort.address, AddressInputPort)
+    assert (_InputPort.address.street, _InputPort.address.postcode) == ("High Street", 3000)
+    assert [_Address.street for _Address in _InputPort.previous_addresses] == ["Low Street"]
+
+
+def test__from_mapping__NestedInputPortMappingsInvalid__ReportsErrorsUnderAttributePath():
+    # Act
+    _, _ValidationResult = ContactInputPort.from_mapping({
+        "name": "Ben",
+        "address": {"street": "High Street", "postcode": "3000"},
+        "previous_addresses": [{"street": "Low Street", "postcode": 3001}, {"postcode": 3002}]})
+
+    # Assert
+    assert _ValidationResult.errors == {
+        "address.postcode": ["'address.postcode' must be of type 'int'."],
+        "previous_addresses[1].street": ["'previous_addresses[1].street' must have a value."]}
+
+# end from_mapping tests
+
+
+# ---------------- from_json tests ----------------
+
+def test__from_json__ValidJsonObject__ReturnsPopulatedInputPort():
+    # Act
+    _InputPort, _ValidationResult = ValidatorInputPort.from_json(b'{"name": "Ben", "tags": [], "age": 3}')
+
+    # Assert
+    assert _ValidationResult is None
+    assert (_InputPort.name, _InputPort.tags, _InputPort.age) == ("Ben", [], 3)
+
+
+@pytest.mark.parametrize("data", [b"{", b"[1, 2]", b"\xff"])
+def test__from_json__InvalidJsonObject__ReturnsValidationResultWithSummary(data):
+    # Act
+    _, _ValidationResult = ValidatorInputPort.from_json(data)
+
+    # Assert
+    assert _ValidationResult.errors is None
+    assert _ValidationResult.summary
+
+# end from_json tests
+
+
+# ---------------- has_been_set tests ----------------
+
+@pytest.mark.parametrize("input_port_type", [ValidatorInputPort, SlottedValidatorInputPort])
+def test__has_been_set__AttributeProvidedOnConstruction__ReturnsTrue(input_port_type):
+    # Act
+    _InputPort = input_port_type(name="Ben", age=0)
+
+    # Assert
+    assert _InputPort.has_been_set("name")
+    assert _InputPort.has_been_set("age")
+    assert not _InputPort.has_been_set("tags")
+
+
+@pytest.mark.parametrize("input_port_type", [ValidatorInputPort, SlottedValidatorInputPort])
+def test__has_been_set__AttributeHoldsDefaultValue__ReturnsFalse(input_port_type):
+    # Act
+    _InputPort = input_port_type()
+
+    # Assert
+    assert _InputPort.age == 0
+    assert not _InputPort.has_been_set("age")
+
+
+@pytest.mark.parametrize("input_port_type", [ValidatorInputPort, SlottedValidatorInputPort])
+def test__has_been_set__AttributeAssignedThenDeleted__TracksAssignment(input_port_type):
+    # Arrange
+    _InputPort = input_port_type()
+
+    # Act
+    _InputPort.age = 5
+    _AfterAssignment = _InputPort.has_been_set("age")
+    del _InputPort.age
+
+    # Assert
+    assert _AfterAssignment
+    assert not _InputPort.has_been_set("age")
+
+# end has_been_set tests
+
+
+# ---------------- SynchronousPipe tests ----------------
+
+class AuditedRequiredInputValidator(RequiredInputValidator):
+
+    def __init__(self):
+        self.is_audited = False
+
+    async def execute_async(self, input_port: InputPort, output_port: IOutputPort) -> None:
+        self.is_audited = True
+        await super().execute_async(input_port, output_port)
+
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__SynchronousPipeFails__AwaitsReturnedOutputPortCall():
+    # Arrange
+    _Presenter = ValidationPresenter()
+    _Invoker = UseCaseInvoker(PipesPipelineFactory([RequiredInputValidator(), InputTypeValidator()]))
+
+    # Act
+    _Result = await _Invoker.invoke_usecase_async(ValidatorInputPort(name=1), _Presenter, [
+        PipeConfiguration(RequiredInputValidator), PipeConfiguration(InputTypeValidator, should_ignore_failures=True)])
+
+    # Assert
+    assert not _Result
+    assert [_Failure.summary for _Failure in _Presenter.validation_failures] == [
+        "Required inputs are missing values.", "Types of inputs are mismatching input port's defined attribute types."]
+
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__SynchronousPipeOverridesExecuteAsync__ExecutesOverride():
+    # Arrange
+    _Validator = AuditedRequiredInputValidator()
+    _Invoker = UseCaseInvoker(PipesPipelineFactory([_Validator]))
+
+    # Act
+    _Result = await _Invoker.invoke_usecase_async(
+        ValidatorInputPort(name="Ben", tags=[]), ValidationPresenter(), [PipeConfiguration(RequiredInputValidator)])
+
+    # Assert
+    assert _Result
+    assert _Validator.is_audited
+
+# end SynchronousPipe tests
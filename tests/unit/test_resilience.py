@@ -0,0 +1,333 @@
+import asyncio
+import functools
+from typing import List
+
+import pytest
+
+from src.clapy.exceptions import ServiceUnavailableError
+from src.clapy.outputs import IOutputPort, IServiceUnavailableOutputPort
+from src.clapy.pipeline import InputPort, Interactor, PipeConfiguration
+from src.clapy.resilience import (AdaptiveConcurrencyLimiter, CircuitBreaker,
+                                  CircuitBreakingUseCaseInvoker, CircuitState,
+                                  DegradingUseCaseInvoker)
+from src.clapy.services import IUseCaseInvoker
+from tests.unit.fakes import FakeClock, RecordingMetricsRecorder
+
+
+class LookupInputPort(InputPort):
+    name: str
+
+
+class LookupPresenter(IOutputPort, IServiceUnavailableOutputPort):
+
+    def __init__(self):
+        self.retry_afters: List[float] = []
+
+    async def present_service_unavailable_async(self, retry_after: float) -> None:
+        self.retry_afters.append(retry_after)
+
+
+class LookupUseCaseInvoker(IUseCaseInvoker):
+
+    def __init__(self):
+        self.is_failing = False
+        self.invocation_count = 0
+        self.release_event = None
+
+    async def invoke_usecase_async(self, input_port, output_port, pipeline_configuration) -> bool:
+        self.invocation_count += 1
+        if self.release_event is not None:
+            await self.release_event.wait()
+        if self.is_failing:
+            raise ConnectionError("Database unavailable.")
+        return True
+
+
+_PipelineConfiguration = [PipeConfiguration(Interactor)]
+
+
+# ---------------- CircuitBreaker tests ----------------
+
+def test__release__FailureRateReachesThreshold__OpensCircuit():
+    # Arrange
+    _CircuitBreaker = CircuitBreaker(failure_rate_threshold=0.5, min_calls=4, clock=FakeClock())
+
+    # Act
+    for _IsFailure in [False, True, False, True]:
+        _Permit = _CircuitBreaker.try_acquire()
+        assert _Permit is not None
+        _CircuitBreaker.release(_Permit, 0.1, _IsFailure)
+
+    # Assert
+    assert _CircuitBreaker.state is CircuitState.OPEN
+    assert _CircuitBreaker.try_acquire() is None
+
+
+def test__release__SlowCallRateReachesThreshold__OpensCircuit():
+    # Arrange
+    _CircuitBreaker = CircuitBreaker(slow_call_duration=1.0, slow_call_rate_threshold=0.5, min_calls=2, clock=FakeClock())
+
+    # Act
+    for _Duration in [0.1, 2.0]:
+        _CircuitBreaker.release(_CircuitBreaker.try_acquire(), _Duration)
+
+    # Assert
+    assert _CircuitBreaker.state is CircuitState.OPEN
+
+
+def test__try_acquire__OpenDurationElapsed__AllowsTrialCallsThenCloses():
+    # Arrange
+    _Clock = FakeClock()
+    _CircuitBreaker = CircuitBreaker(min_calls=1, open_duration=10, trial_call_count=1, clock=_Clock)
+    _CircuitBreaker.release(_CircuitBreaker.try_acquire(), 0.1, is_failure=True)
+    _Clock.now += 10
+
+    # Act
+    _FirstTrialPermit = _CircuitBreaker.try_acquire()
+    _SecondTrialPermit = _CircuitBreaker.try_acquire()
+    _CircuitBreaker.release(_FirstTrialPermit, 0.1)
+
+    # Assert
+    assert _FirstTrialPermit is not None
+    assert _SecondTrialPermit is None
+    assert _CircuitBreaker.state is CircuitState.CLOSED
+
+
+def test__release__TrialCallFails__ReopensCircuit():
+    # Arrange
+    _Clock = FakeClock()
+    _CircuitBreaker = CircuitBreaker(min_calls=1, open_duration=10, clock=_Clock)
+    _CircuitBreaker.release(_CircuitBreaker.try_acquire(), 0.1, is_failure=True)
+    _Clock.now += 10
+    _TrialPermit = _CircuitBreaker.try_acquire()
+
+    # Act
+    _CircuitBreaker.release(_TrialPermit, 0.1, is_failure=True)
+
+    # Assert
+    assert _CircuitBreaker.state is CircuitState.OPEN
+    assert _CircuitBreaker.retry_after == 10
+
+
+def test__release__CallAllowedBeforeCircuitHalfOpened__IsNotCountedAsTrialCall():
+    # Arrange
+    _Clock = FakeClock()
+    _CircuitBreaker = CircuitBreaker(min_calls=1, open_duration=10, clock=_Clock)
+    _SlowPermit = _CircuitBreaker.try_acquire()
+    _CircuitBreaker.release(_CircuitBreaker.try_acquire(), 0.1, is_failure=True)
+    _Clock.now += 10
+    _TrialPermit = _CircuitBreaker.try_acquire()
+
+    # Act
+    _CircuitBreaker.release(_SlowPermit, 0.1, is_failure=True)
+    _StateAfterStaleRelease = _CircuitBreaker.state
+    _CircuitBreaker.release(_TrialPermit, 0.1)
+
+    # Assert
+    assert _StateAfterStaleRelease is CircuitState.HALF_OPEN
+    assert _CircuitBreaker.state is CircuitState.CLOSED
+
+# end CircuitBreaker tests
+
+
+# ---------------- AdaptiveConcurrencyLimiter tests ----------------
+
+def test__try_acquire__LimitReached__RejectsCall():
+    # Arrange
+    _ConcurrencyLimiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+
+    # Act
+    _Acquired = [_ConcurrencyLimiter.try_acquire() for _ in range(3)]
+
+    # Assert
+    assert _Acquired == [True, True, False]
+
+
+def test__release__CallSlowOrSuccessful__DecreasesMultiplicativelyAndIncreasesAdditively():
+    # Arrange
+    _ConcurrencyLimiter = AdaptiveConcurrencyLimiter(initial_limit=10, target_latency=1.0, backoff_ratio=0.5)
+
+    # Act
+    _ConcurrencyLimiter.try_acquire()
+    _ConcurrencyLimiter.release(2.0)
+    _LimitAfterSlowCall = _ConcurrencyLimiter.limit
+    _ConcurrencyLimiter.try_acquire()
+    _ConcurrencyLimiter.release(0.5)
+
+    # Assert
+    assert _LimitAfterSlowCall == 5
+    assert _ConcurrencyLimiter.limit == 5.2
+    assert _ConcurrencyLimiter.in_flight == 0
+
+# end AdaptiveConcurrencyLimiter tests
+
+
+# ---------------- CircuitBreakingUseCaseInvoker tests ----------------
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__CircuitOpen__PresentsServiceUnavailableWithoutInvoking():
+    # Arrange
+    _Clock = FakeClock()
+    _InnerInvoker = LookupUseCaseInvoker()
+    _InnerInvoker.is_failing = True
+    _Invoker = CircuitBreakingUseCaseInvoker(
+        _InnerInvoker, functools.partial(CircuitBreaker, min_calls=2, open_duration=5, clock=_Clock), clock=_Clock)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await _Invoker.invoke_usecase_async(LookupInputPort(name="Ben"), LookupPresenter(), _PipelineConfiguration)
+    _Presenter = LookupPresenter()
+
+    # Act
+    _Result = await _Invoker.invoke_usecase_async(LookupInputPort(name="Ben"), _Presenter, _PipelineConfiguration)
+
+    # Assert
+    assert not _Result
+    assert _InnerInvoker.invocation_count == 2
+    assert _Presenter.retry_afters == [5]
+    assert _Invoker.get_circuit_breaker(LookupInputPort.__module__).state is CircuitState.OPEN
+
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__RejectedAndOutputPortNotSupported__RaisesServiceUnavailableError():
+    # Arrange
+    _InnerInvoker = LookupUseCaseInvoker()
+    _InnerInvoker.release_event = asyncio.Event()
+    _Invoker = CircuitBreakingUseCaseInvoker(
+        _InnerInvoker, concurrency_limiter_factory=functools.partial(AdaptiveConcurrencyLimiter, initial_limit=1))
+    _Task = asyncio.ensure_future(_Invoker.invoke_usecase_async(LookupInputPort(name="Ben"), LookupPresenter(), _PipelineConfiguration))
+    await asyncio.sleep(0)
+
+    # Act and Assert
+    with pytest.raises(ServiceUnavailableError):
+        await _Invoker.invoke_usecase_async(LookupInputPort(name="Bob"), IOutputPort(), _PipelineConfiguration)
+
+    _InnerInvoker.release_event.set()
+    assert await _Task
+
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__InvocationCancelled__ReleasesWithoutRecordingOutcome():
+    # Arrange
+    _InnerInvoker = LookupUseCaseInvoker()
+    _InnerInvoker.release_event = asyncio.Event()
+    _Invoker = CircuitBreakingUseCaseInvoker(
+        _InnerInvoker, functools.partial(CircuitBreaker, min_calls=1),
+        functools.partial(AdaptiveConcurrencyLimiter, initial_limit=1))
+    _Task = asyncio.ensure_future(_Invoker.invoke_usecase_async(LookupInputPort(name="Ben"), LookupPresenter(), _PipelineConfiguration))
+    await asyncio.sleep(0)
+
+    # Act
+    _Task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await _Task
+
+    # Assert
+    assert _Invoker.get_circuit_breaker(LookupInputPort.__module__).state is CircuitState.CLOSED
+    assert _Invoker._concurrency_limiters[LookupInputPort.__module__].in_flight == 0
+
+# end CircuitBreakingUseCaseInvoker tests
+
+
+# ---------------- DegradingUseCaseInvoker tests ----------------
+
+class ConfigurationRecordingUseCaseInvoker(IUseCaseInvoker):
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.duration = 0.0
+        self.pipeline_configurations: List[list] = []
+
+    async def invoke_usecase_async(self, input_port, output_port, pipeline_configuration) -> bool:
+        self.pipeline_configurations.append(pipeline_configuration)
+        self.clock.now += self.duration
+        return True
+
+
+_FullConfiguration = [PipeConfiguration(Interactor)]
+_LightConfiguration = [PipeConfiguration(Interactor)]
+
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__LatencyExceedsThreshold__SwitchesToLighterConfigurationThenBack():
+    # Arrange
+    _Clock = FakeClock()
+    _InnerInvoker = ConfigurationRecordingUseCaseInvoker(_Clock)
+    _MetricsRecorder = RecordingMetricsRecorder()
+    _Invoker = DegradingUseCaseInvoker(
+        _InnerInvoker, [[_FullConfiguration, _LightConfiguration]], degrade_latency=1.0,
+        min_switch_interval=10, metrics_recorder=_MetricsRecorder, clock=_Clock)
+
+    async def invoke_many(duration: float, count: int) -> None:
+        _InnerInvoker.duration = duration
+        for _ in range(count):
+            await _Invoker.invoke_usecase_async(LookupInputPort(name="Ben"), LookupPresenter(), _FullConfiguration)
+
+    # Act
+    await invoke_many(2.0, 21)
+    _LevelUnderLoad = _Invoker.get_level(LookupInputPort.__module__, _FullConfiguration)
+    _Clock.now += 10
+    await invoke_many(0.1, 21)
+
+    # Assert
+    assert _LevelUnderLoad == 1
+    assert _InnerInvoker.pipeline_configurations[20] is _LightConfiguration
+    assert _InnerInvoker.pipeline_configurations[-1] is _FullConfiguration
+    assert [_Tags["to_level"] for _, _Tags in _MetricsRecorder.events] == ["1", "0"]
+
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__InFlightExceedsThreshold__SwitchesToLighterConfiguration():
+    # Arrange
+    _InnerInvoker = LookupUseCaseInvoker()
+    _InnerInvoker.release_event = asyncio.Event()
+    _Invoker = DegradingUseCaseInvoker(_InnerInvoker, [[_FullConfiguration, _LightConfiguration]], degrade_in_flight=2)
+    _Tasks = [asyncio.ensure_future(_Invoker.invoke_usecase_async(LookupInputPort(name="Ben"), LookupPresenter(), _FullConfiguration))
+              for _ in range(3)]
+    await asyncio.sleep(0)
+
+    # Act
+    _Level = _Invoker.get_level(LookupInputPort.__module__, _FullConfiguration)
+
+    # Assert
+    assert _Level == 1
+    _InnerInvoker.release_event.set()
+    await asyncio.gather(*_Tasks)
+
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__InFlightDropsBelowRecoveryThreshold__SwitchesBackToFullConfiguration():
+    # Arrange
+    _Clock = FakeClock()
+    _InnerInvoker = LookupUseCaseInvoker()
+    _InnerInvoker.release_event = asyncio.Event()
+    _Invoker = DegradingUseCaseInvoker(_InnerInvoker, [[_FullConfiguration, _LightConfiguration]], degrade_in_flight=2, clock=_Clock)
+    _Tasks = [asyncio.ensure_future(_Invoker.invoke_usecase_async(LookupInputPort(name="Ben"), LookupPresenter(), _FullConfiguration))
+              for _ in range(3)]
+    await asyncio.sleep(0)
+    _LevelUnderLoad = _Invoker.get_level(LookupInputPort.__module__, _FullConfiguration)
+    _InnerInvoker.release_event.set()
+    await asyncio.gather(*_Tasks)
+    _Clock.now += 10
+
+    # Act
+    await _Invoker.invoke_usecase_async(LookupInputPort(name="Ben"), LookupPresenter(), _FullConfiguration)
+
+    # Assert
+    assert _LevelUnderLoad == 1
+    assert _Invoker.get_level(LookupInputPort.__module__, _FullConfiguration) == 0
+
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__ConfigurationNotInLadder__InvokesWithConfiguration():
+    # Arrange
+    _Clock = FakeClock()
+    _InnerInvoker = ConfigurationRecordingUseCaseInvoker(_Clock)
+    _Invoker = DegradingUseCaseInvoker(_InnerInvoker, [[_FullConfiguration, _LightConfiguration]], degrade_in_flight=0)
+
+    # Act
+    await _Invoker.invoke_usecase_async(LookupInputPort(name="Ben"), LookupPresenter(), _PipelineConfiguration)
+
+    # Assert
+    assert _InnerInvoker.pipeline_configurations == [_PipelineConfiguration]
+
+# end DegradingUseCaseInvoker tests
@@ -0,0 +1,209 @@
+import array
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import pytest
+
+from src.clapy.pipeline import InputPort
+from src.clapy.validation import (MISSING, ValidationPlan, compile_column_checker,
+                                  compile_type_checker, find_missing_rows)
+
+
+class PlanInputPort(InputPort):
+    name: str
+    tags: List[str]
+    age: int = 0
+
+
+class DerivedPlanInputPort(PlanInputPort):
+    nickname: str
+
+
+class LineItem(InputPort):
+    price: float
+
+
+# ---------------- for_input_port tests ----------------
+
+def test__for_input_port__CalledTwice__ReturnsCachedPlan():
+    # Act
+    _First = ValidationPlan.for_input_port(PlanInputPort)
+    _Second = ValidationPlan.for_input_port(PlanInputPort)
+
+    # Assert
+    assert _First is _Second
+
+
+def test__for_input_port__AttributesWithAndWithoutDefaults__OnlyAttributesWithoutDefaultsAreRequired():
+    # Act
+    _Plan = ValidationPlan.for_input_port(PlanInputPort)
+
+    # Assert
+    assert _Plan.required_fields == ("name", "tags")
+
+
+def test__for_input_port__InheritedInputPort__IncludesBaseAttributes():
+    # Act
+    _Plan = ValidationPlan.for_input_port(DerivedPlanInputPort)
+
+    # Assert
+    assert set(_Plan.type_hints) == {"name", "tags", "age", "nickname"}
+    assert [_AttrName for _AttrName, _ in _Plan.type_checkers] == list(_Plan.type_hints)
+
+
+def test__for_input_port__InputPortWithoutAnnotations__ReturnsEmptyPlan():
+    # Act
+    _Plan = ValidationPlan.for_input_port(InputPort)
+
+    # Assert
+    assert _Plan.type_hints == {}
+    assert _Plan.required_fields == ()
+
+# end for_input_port tests
+
+
+# ---------------- compile_type_checker tests ----------------
+
+@pytest.mark.parametrize("type_hint, value", [
+    (List[int], [1]),
+    (List[int], [1, 2, 3]),
+    (Optional[int], None),
+    (Union[int, List[str]], ["a"]),
+    (Dict[str, List[int]], {"a": [1, 2]}),
+    (Tuple[int, str], (1, "a")),
+    (Tuple[int, ...], (1, 2, 3)),
+    (List[LineItem], [LineItem(price=1.0)]),
+])
+def test__compile_type_checker__ValueMatchesTypeHint__ReturnsNone(type_hint, value):
+    # Act
+    _Mismatch = compile_type_checker(type_hint)(value)
+
+    # Assert
+    assert _Mismatch is None
+
+
+@pytest.mark.parametrize("type_hint, value, expected_path", [
+    (List[int], [1, "2"], "items[1]"),
+    (Optional[int], "1", "items"),
+    (Dict[str, List[int]], {"a": [1, "2"]}, "items['a'][1]"),
+    (Tuple[int, str], (1, 2), "items[1]"),
+    (Tuple[int, str], (1, "a", 2), "items"),
+    (List[LineItem], [LineItem(price=1.0), LineItem(price="free")], "items[1].price"),
+])
+def test__compile_type_checker__NestedValueDoesNotMatchTypeHint__ReturnsPathToValue(type_hint, value, expected_path):
+    # Act
+    _Mismatch = compile_type_checker(type_hint)(value)
+
+    # Assert
+    assert _Mismatch.format_path("items") == expected_path
+
+
+def test__compile_type_checker__SameTypeHint__ReturnsCachedChecker():
+    # Act and Assert
+    assert compile_type_checker(List[LineItem]) is compile_type_checker(List[LineItem])
+
+
+@pytest.mark.parametrize("type_hint, value", [
+    (Sequence[float], array.array("d", [1.0, 2.0])),
+    (Sequence[int], array.array("q", [1, 2])),
+    (Sequence[int], b"bytes"),
+    (Sequence[int], memoryview(b"bytes")),
+])
+def test__compile_type_checker__BufferElementTypeMatchesTypeHint__ReturnsNone(type_hint, value):
+    # Act
+    _Mismatch = compile_type_checker(type_hint)(value)
+
+    # Assert
+    assert _Mismatch is None
+
+
+def test__compile_type_checker__BufferElementTypeDoesNotMatchTypeHint__ReturnsMismatch():
+    # Act
+    _Mismatch = compile_type_checker(Sequence[int])(array.array("d", [1.0, 2.0]))
+
+    # Assert
+    assert _Mismatch.format_message("values") == "'values[0]' must be of type 'int'."
+
+
+def test__compile_type_checker__NumpyArray__ChecksDtype():
+    # Arrange
+    numpy = pytest.importorskip("numpy")
+    _Checker = compile_type_checker(Sequence[float])
+
+    # Act and Assert
+    assert _Checker(numpy.zeros(10, dtype=numpy.float64)) is None
+    assert _Checker(numpy.array(["a"])) is not None
+
+
+def test__compile_type_checker__SampleSizeSmallerThanSequence__OnlyChecksSampledElements():
+    # Arrange
+    _Values = [1.0] * 1000
+    _Values[1] = "unsampled"
+    _Values[500] = "sampled"
+
+    # Act
+    _Mismatch = compile_type_checker(List[float], collection_sample_size=10)(_Values)
+
+    # Assert
+    assert _Mismatch.format_path("values") == "values[500]"
+
+# end compile_type_checker tests
+
+
+# ---------------- compile_column_checker tests ----------------
+
+def test__compile_column_checker__ListColumnOfMatchingValues__ReturnsNoMismatches():
+    # Act
+    _Mismatches = compile_column_checker(int)([1, None, 3, MISSING])
+
+    # Assert
+    assert _Mismatches == []
+
+
+def test__compile_column_checker__ListColumnWithMismatchingValues__ReturnsEachMismatchingRow():
+    # Act
+    _Mismatches = compile_column_checker(List[int])([[1], ["2"], [3], "4"])
+
+    # Assert
+    assert [(_Row, _Mismatch.format_path("values")) for _Row, _Mismatch in _Mismatches] == [
+        (1, "values[0]"), (3, "values")]
+
+
+def test__compile_column_checker__ArrayColumn__ChecksTypeCode():
+    # Arrange
+    _Checker = compile_column_checker(float)
+
+    # Act and Assert
+    assert _Checker(array.array("d", [1.0, 2.0])) == []
+    assert [_Row for _Row, _ in _Checker(array.array("q", [1, 2]))] == [0, 1]
+
+
+def test__compile_column_checker__NumpyColumn__ChecksDtype():
+    # Arrange
+    numpy = pytest.importorskip("numpy")
+    _Checker = compile_column_checker(str)
+
+    # Act and Assert
+    assert _Checker(numpy.array(["a", "b"])) == []
+    assert len(_Checker(numpy.zeros(3))) == 3
+
+# end compile_column_checker tests
+
+
+# ---------------- find_missing_rows tests ----------------
+
+def test__find_missing_rows__ListColumn__ReturnsRowsWithoutValues():
+    # Act
+    _Rows = find_missing_rows(["a", MISSING, None, MISSING])
+
+    # Assert
+    assert _Rows == [1, 3]
+
+
+def test__find_missing_rows__ArrayColumn__ReturnsNoRows():
+    # Act
+    _Rows = find_missing_rows(array.array("i", [1, 2, 3]))
+
+    # Assert
+    assert _Rows == []
+
+# end find_missing_rows tests
@@ -0,0 +1,344 @@
+import asyncio
+import concurrent.futures
+import multiprocessing
+import os
+import threading
+from typing import List
+
+import pytest
+
+from sample.pipeline.name_checker import NameChecker
+from sample.use_cases.greet.greet_input_port import GreetInputPort
+from src.clapy.engine import Engine, PipelineFactory, UseCaseInvoker
+from src.clapy.invokers import (InvocationPriority, _InvocationPriority,
+                                invocation_priority)
+from src.clapy.outputs import IOutputPort
+from src.clapy.pipeline import (InputPort, Interactor, PipeConfiguration,
+                                PipeConfigurationOption,
+                                RequiredInputValidator)
+from src.clapy.services import IUseCaseInvoker
+from src.clapy.workers import PreforkUseCaseInvoker, SyncUseCaseInvoker
+from tests.unit.fakes import ConstructingServiceProvider
+
+requires_fork = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="Forking processes is not supported.")
+
+
+class ReportInputPort(InputPort):
+    name: str
+
+
+class ReportPresenter(IOutputPort):
+
+    def __init__(self):
+        self.reports: List[tuple] = []
+
+    async def present_report_async(self, name: str, process_id: int) -> None:
+        self.reports.append((name, process_id))
+
+
+class ReportUseCaseInvoker(IUseCaseInvoker):
+
+    def __init__(self, cancellation_path: str = None):
+        self.cancellation_path = cancellation_path
+
+    async def invoke_usecase_async(self, input_port, output_port, pipeline_configuration) -> bool:
+        if input_port.name == "Fail":
+            raise ConnectionError("Database unavailable.")
+        if input_port.name == "Exit":
+            os._exit(1)
+        if input_port.name == "Slow":
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                open(self.cancellation_path, "w").close()
+                raise
+        await output_port.present_report_async(input_port.name, os.getpid())
+        return True
+
+
+_PipelineConfigurations = {"Report": [PipeConfiguration(Interactor)]}
+
+
+# ---------------- PreforkUseCaseInvoker tests ----------------
+
+@requires_fork
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__WorkersStarted__ReplaysOutputsFromWorkerProcess():
+    # Arrange
+    _Invoker = PreforkUseCaseInvoker(ReportUseCaseInvoker(), _PipelineConfigurations, worker_count=2)
+    _Invoker.start()
+    _Presenter = ReportPresenter()
+
+    # Act
+    try:
+        _Results = [await _Invoker.invoke_usecase_async(ReportInputPort(name=_Name), _Presenter, _PipelineConfigurations["Report"])
+                    for _Name in ["Ben", "Bob"]]
+    finally:
+        await _Invoker.close_async()
+
+    # Assert
+    assert _Results == [True, True]
+    assert [_Name for _Name, _ in _Presenter.reports] == ["Ben", "Bob"]
+    assert all(_ProcessId != os.getpid() for _, _ProcessId in _Presenter.reports)
+
+
+@requires_fork
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__InvocationRaises__RaisesInParentProcess():
+    # Arrange
+    _Invoker = PreforkUseCaseInvoker(ReportUseCaseInvoker(), _PipelineConfigurations, worker_count=1)
+    _Invoker.start()
+
+    # Act and Assert
+    try:
+        with pytest.raises(ConnectionError):
+            await _Invoker.invoke_usecase_async(ReportInputPort(name="Fail"), ReportPresenter(), _PipelineConfigurations["Report"])
+    finally:
+        await _Invoker.close_async()
+
+
+@requires_fork
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__InvocationCancelled__CancelsInvocationInWorkerProcess(tmp_path):
+    # Arrange
+    _CancellationPath = str(tmp_path / "cancelled")
+    _Invoker = PreforkUseCaseInvoker(ReportUseCaseInvoker(_CancellationPath), _PipelineConfigurations, worker_count=1)
+    _Invoker.start()
+    _Task = asyncio.ensure_future(_Invoker.invoke_usecase_async(
+        ReportInputPort(name="Slow"), ReportPresenter(), _PipelineConfigurations["Report"]))
+    await asyncio.sleep(0.05)
+
+    # Act
+    try:
+        _Task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await _Task
+        _Result = await _Invoker.invoke_usecase_async(ReportInputPort(name="Ben"), ReportPresenter(), _PipelineConfigurations["Report"])
+    finally:
+        await _Invoker.close_async()
+
+    # Assert
+    assert _Result
+    assert os.path.exists(_CancellationPath)
+
+
+class UnsendableConnection:
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def send(self, message) -> None:
+        raise BrokenPipeError("The pipe is closed.")
+
+    def fileno(self) -> int:
+        return self.connection.fileno()
+
+
+@requires_fork
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__CancellationCannotBeSent__LogsFailure(caplog):
+    # Arrange
+    _Invoker = PreforkUseCaseInvoker(ReportUseCaseInvoker(), _PipelineConfigurations, worker_count=1)
+    _Invoker.start()
+    _Worker = _Invoker._workers[0]
+    _Connection = _Worker.connection
+    _Task = asyncio.ensure_future(_Invoker.invoke_usecase_async(
+        ReportInputPort(name="Slow"), ReportPresenter(), _PipelineConfigurations["Report"]))
+    await asyncio.sleep(0.05)
+
+    # Act
+    try:
+        _Worker.connection = UnsendableConnection(_Connection)
+        _Task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await _Task
+        await asyncio.sleep(0.05)
+    finally:
+        _Worker.connection = _Connection
+        await _Worker.send_async((0, None, None, None))
+        await _Invoker.close_async()
+
+    # Assert
+    assert "Could not send a cancellation to a prefork worker." in caplog.messages
+
+
+@requires_fork
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__WorkerProcessExits__RaisesRuntimeErrorAndStopsUsingWorker():
+    # Arrange
+    _Invoker = PreforkUseCaseInvoker(ReportUseCaseInvoker(), _PipelineConfigurations, worker_count=1)
+    _Invoker.start()
+
+    # Act and Assert
+    try:
+        with pytest.raises(RuntimeError, match="exited unexpectedly"):
+            await _Invoker.invoke_usecase_async(ReportInputPort(name="Exit"), ReportPresenter(), _PipelineConfigurations["Report"])
+        with pytest.raises(RuntimeError, match="no running worker processes"):
+            await _Invoker.invoke_usecase_async(ReportInputPort(name="Ben"), ReportPresenter(), _PipelineConfigurations["Report"])
+    finally:
+        await _Invoker.close_async()
+
+
+@requires_fork
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__RequestsAndResponsesFillPipes__CompletesEveryInvocation():
+    # Arrange
+    _Invoker = PreforkUseCaseInvoker(ReportUseCaseInvoker(), _PipelineConfigurations, worker_count=1)
+    _Invoker.start()
+    _Presenter = ReportPresenter()
+    _Names = [str(_Index) * 2 ** 18 for _Index in range(8)]
+
+    # Act
+    try:
+        _Results = await asyncio.wait_for(asyncio.gather(*[
+            _Invoker.invoke_usecase_async(ReportInputPort(name=_Name), _Presenter, _PipelineConfigurations["Report"])
+            for _Name in _Names]), timeout=10)
+    finally:
+        await _Invoker.close_async()
+
+    # Assert
+    assert _Results == [True] * 8
+    assert sorted(_Name for _Name, _ in _Presenter.reports) == _Names
+
+
+@pytest.mark.asyncio
+async def test__invoke_usecase_async__UnknownPipelineConfiguration__RaisesValueError():
+    # Arrange
+    _Invoker = PreforkUseCaseInvoker(ReportUseCaseInvoker(), _PipelineConfigurations)
+    _Invoker._workers = [object()]
+
+    # Act and Assert
+    with pytest.raises(ValueError):
+        await _Invoker.invoke_usecase_async(ReportInputPort(name="Ben"), ReportPresenter(), [PipeConfiguration(Interactor)])
+
+# end PreforkUseCaseInvoker tests
+
+
+# ---------------- SyncUseCaseInvoker tests ----------------
+
+class LoopRecordingUseCaseInvoker(IUseCaseInvoker):
+
+    def __init__(self):
+        self.loops: List[asyncio.AbstractEventLoop] = []
+        self.priorities: List[InvocationPriority] = []
+
+    async def invoke_usecase_async(self, input_port, output_port, pipeline_configuration) -> bool:
+        self.loops.append(asyncio.get_running_loop())
+        self.priorities.append(_InvocationPriority.get())
+        if input_port.name == "Fail":
+            raise ConnectionError("Database unavailable.")
+        if input_port.name == "Exit":
+            os._exit(1)
+        if input_port.name == "Slow":
+            await asyncio.sleep(10)
+        await output_port.present_report_async(input_port.name, threading.get_ident())
+        return True
+
+
+def test__invoke_usecase__CalledFromThreads__ReusesBackgroundLoops():
+    # Arrange
+    _InnerInvoker = LoopRecordingUseCaseInvoker()
+    _Invoker = SyncUseCaseInvoker(_InnerInvoker, loop_count=2)
+    _Invoker.start()
+    _Presenters = [ReportPresenter() for _ in range(8)]
+
+    # Act
+    try:
+        with concurrent.futures.ThreadPoolExecutor(4) as _Executor:
+            _Results = list(_Executor.map(
+                lambda _Presenter: _Invoker.invoke_usecase(ReportInputPort(name="Ben"), _Presenter, _PipelineConfigurations["Report"]),
+                _Presenters))
+    finally:
+        _Invoker.close()
+
+    # Assert
+    assert _Results == [True] * 8
+    assert all(_Presenter.reports[0][0] == "Ben" for _Presenter in _Presenters)
+    assert len(set(_InnerInvoker.loops)) == 2
+    assert all(_Loop.is_closed() for _Loop in _InnerInvoker.loops)
+
+
+def test__invoke_usecase__PrioritySetByCaller__CopiesContextToInvocation():
+    # Arrange
+    _InnerInvoker = LoopRecordingUseCaseInvoker()
+    _Invoker = SyncUseCaseInvoker(_InnerInvoker)
+    _Invoker.start()
+
+    # Act
+    try:
+        with invocation_priority(InvocationPriority.BULK):
+            _Invoker.invoke_usecase(ReportInputPort(name="Ben"), ReportPresenter(), _PipelineConfigurations["Report"])
+    finally:
+        _Invoker.close()
+
+    # Assert
+    assert _InnerInvoker.priorities == [InvocationPriority.BULK]
+
+
+def test__invoke_usecase__InvocationRaises__RaisesInCallingThread():
+    # Arrange
+    _Invoker = SyncUseCaseInvoker(LoopRecordingUseCaseInvoker())
+    _Invoker.start()
+
+    # Act and Assert
+    try:
+        with pytest.raises(ConnectionError):
+            _Invoker.invoke_usecase(ReportInputPort(name="Fail"), ReportPresenter(), _PipelineConfigurations["Report"])
+    finally:
+        _Invoker.close()
+
+
+def test__invoke_usecase__TimeoutElapsed__CancelsInvocation():
+    # Arrange
+    _Invoker = SyncUseCaseInvoker(LoopRecordingUseCaseInvoker())
+    _Invoker.start()
+
+    # Act and Assert
+    try:
+        with pytest.raises(concurrent.futures.TimeoutError):
+            _Invoker.invoke_usecase(ReportInputPort(name="Slow"), ReportPresenter(), _PipelineConfigurations["Report"], timeout=0.05)
+    finally:
+        _Invoker.close()
+
+
+def test__invoke_usecase__NotStarted__RaisesRuntimeError():
+    # Arrange
+    _Invoker = SyncUseCaseInvoker(LoopRecordingUseCaseInvoker())
+
+    # Act and Assert
+    with pytest.raises(RuntimeError):
+        _Invoker.invoke_usecase(ReportInputPort(name="Ben"), ReportPresenter(), _PipelineConfigurations["Report"])
+
+
+class GreetPresenter(IOutputPort):
+
+    async def present_greeting_async(self, greeting: str) -> None:
+        pass
+
+    async def present_missing_names_warning_async(self) -> bool:
+        return True
+
+
+def test__invoke_usecase__SeveralLoopsShareUseCaseInvoker__InvokesFromEveryThread():
+    # Arrange
+    _PipelineConfiguration = [PipeConfiguration(RequiredInputValidator, PipeConfigurationOption.INSERT),
+                              PipeConfiguration(NameChecker), PipeConfiguration(Interactor)]
+    _UseCaseInvoker = UseCaseInvoker(PipelineFactory(
+        ConstructingServiceProvider(), Engine.construct_usecase_registry(["sample/use_cases"])))
+    _Invoker = SyncUseCaseInvoker(_UseCaseInvoker, loop_count=4)
+    _Invoker.start()
+
+    # Act
+    try:
+        with concurrent.futures.ThreadPoolExecutor(8) as _Executor:
+            _Results = list(_Executor.map(
+                lambda _Index: _Invoker.invoke_usecase(GreetInputPort(name=f"Ben {_Index}"), GreetPresenter(), _PipelineConfiguration),
+                range(64)))
+    finally:
+        _Invoker.close()
+
+    # Assert
+    assert _Results == [True] * 64
+
+# end SyncUseCaseInvoker tests